@@ -5,6 +5,7 @@ import numpy as np
 from gym import spaces
 
 from mtenv import MTEnv
+from mtenv.envs.bandit.bandit import get_finite_task_observations
 from mtenv.utils import seeding
 from mtenv.utils.types import ActionType, ObsType, StepReturnType
 
@@ -14,7 +15,7 @@ TaskStateType = int
 class FiniteMTBanditEnv(MTEnv):
     """Multitask Bandit Env where the task_state is sampled from a finite list of states"""
 
-    def __init__(self, n_tasks: int, n_arms: int):
+    def __init__(self, n_tasks: int, n_arms: int, cache_dir: Optional[str] = None):
         super().__init__(
             action_space=spaces.Discrete(n_arms),
             env_observation_space=spaces.Box(
@@ -24,12 +25,13 @@ class FiniteMTBanditEnv(MTEnv):
         )
         self.n_arms = n_arms
         self.n_tasks = n_tasks
-        self.observation_space["task_obs"].seed(0)
-        self.possible_task_observations = np.asarray(
-            [self.observation_space["task_obs"].sample() for _ in range(self.n_tasks)]
-        )
         # possible_task_observations is assumed to be part of the environment definition ie
         # everytime we instantiate the env, we get the same `possible_task_observations`.
+        # The (read-only) table is shared by all the instances, and by all the processes
+        # when `cache_dir` is set (it is then memory-mapped from a file of `cache_dir`).
+        self.possible_task_observations = get_finite_task_observations(
+            n_tasks=n_tasks, n_arms=n_arms, seed=0, cache_dir=cache_dir
+        )
         self._should_reset_env = True
 
     def reset(self, **kwargs: Dict[str, Any]) -> ObsType:
@@ -47,6 +49,7 @@ class FiniteMTBanditEnv(MTEnv):
         return self.np_random_task.randint(0, self.n_tasks)  # type: ignore[no-any-return, union-attr]
 
     def set_task_state(self, task_state: TaskStateType) -> None:
+        # The task observation is a view of a row of the shared table.
         self.task_state = task_state
         self.task_obs = self.possible_task_observations[task_state]
 
@@ -34,70 +34,108 @@ except ImportError:
     sp = None
 
 
-def _solve_dare(a, b, q, r):
-    """Solves the Discrete-time Algebraic Riccati Equation (DARE) by iteration.
+def _transpose(x):
+    """Transposes the last two dimensions of a (stack of) matrices."""
+    return np.swapaxes(x, -1, -2)
+
+
+def solve_dare_batch(a, b, q, r, tol=1e-12, max_iterations=100):
+    """Solves a batch of Discrete-time Algebraic Riccati Equations (DAREs).
 
     Algebraic Riccati Equation:
     ```none
-    P_{t-1} = Q + A' * P_{t} * A -
-              A' * P_{t} * B * (R + B' * P_{t} * B)^{-1} * B' * P_{t} * A
+    P = Q + A' * P * A - A' * P * B * (R + B' * P * B)^{-1} * B' * P * A
     ```
 
+    Uses the structure-preserving doubling algorithm (SDA), which converges
+    quadratically when (A, B) is stabilizable and (A, Q) is detectable, so
+    that a few tens of iterations (each made of batched matrix products and
+    solves) are enough.
+
     Args:
-      a: A 2 dimensional numpy array, transition matrix A.
-      b: A 2 dimensional numpy array, control matrix B.
-      q: A 2 dimensional numpy array, symmetric positive definite cost matrix.
-      r: A 2 dimensional numpy array, symmetric positive definite cost matrix
+      a: A numpy array of shape (..., n, n), transition matrices A.
+      b: A numpy array of shape (..., n, m), control matrices B.
+      q: A numpy array of shape (..., n, n), symmetric positive definite cost
+        matrices.
+      r: A numpy array of shape (..., m, m), symmetric positive definite cost
+        matrices.
+      tol: Relative tolerance on the change of P between two iterations.
+      max_iterations: Maximum number of doubling iterations.
 
     Returns:
-      A numpy array, a real symmetric matrix P which is the solution to DARE.
+      A numpy array of shape (..., n, n), the real symmetric matrices P which
+      are the solutions to the DAREs.
 
     Raises:
-      RuntimeError: If the computed P matrix is not symmetric and
+      RuntimeError: If a computed P matrix is not symmetric and
         positive-definite.
     """
-    p = np.eye(len(a))
-    for _ in range(1000000):
-        a_p = a.T.dot(p)  # A' * P_t
-        a_p_b = np.dot(a_p, b)  # A' * P_t * B
-        # Algebraic Riccati Equation.
-        p_next = (
-            q
-            + np.dot(a_p, a)
-            - a_p_b.dot(np.linalg.solve(b.T.dot(p.dot(b)) + r, a_p_b.T))
-        )
-        p_next += p_next.T
-        p_next *= 0.5
-        if np.abs(p - p_next).max() < 1e-12:
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    eye = np.eye(a.shape[-1])
+    # Doubling iterates, starting from A_0 = A, G_0 = B * R^{-1} * B' and
+    # H_0 = Q: H_k converges to P.
+    a_k = a
+    g_k = np.matmul(b, np.linalg.solve(r, _transpose(b)))
+    h_k = np.array(np.broadcast_to(q, a.shape), dtype=np.float64)
+    for _ in range(max_iterations):
+        w = eye + np.matmul(g_k, h_k)  # I + G_k * H_k
+        w_inv_a = np.linalg.solve(w, a_k)
+        w_inv_g = np.linalg.solve(w, g_k)
+        h_next = h_k + np.matmul(_transpose(a_k), np.matmul(h_k, w_inv_a))
+        g_k = g_k + np.matmul(a_k, np.matmul(w_inv_g, _transpose(a_k)))
+        a_k = np.matmul(a_k, w_inv_a)
+        h_next += _transpose(h_next)
+        h_next *= 0.5
+        change = np.abs(h_next - h_k).max(axis=(-1, -2))
+        scale = np.maximum(np.abs(h_next).max(axis=(-1, -2)), 1.0)
+        h_k = h_next
+        if np.all(change <= tol * scale):
             break
-        p = p_next
     else:
         logging.warning("DARE solver did not converge")
     try:
-        # Check that the result is symmetric and positive-definite.
-        np.linalg.cholesky(p_next)
+        # Check that the results are symmetric and positive-definite.
+        np.linalg.cholesky(h_k)
     except np.linalg.LinAlgError:
         raise RuntimeError(
             "ARE solver failed: P matrix is not symmetric and " "positive-definite."
         )
-    return p_next
+    return h_k
 
 
-def solve(env):
-    """Returns the optimal value and policy for LQR problem.
+def _solve_dare(a, b, q, r):
+    """Solves the Discrete-time Algebraic Riccati Equation (DARE).
+
+    Refer to `solve_dare_batch`.
 
     Args:
-      env: An instance of `control.EnvironmentV2` with LQR level.
+      a: A 2 dimensional numpy array, transition matrix A.
+      b: A 2 dimensional numpy array, control matrix B.
+      q: A 2 dimensional numpy array, symmetric positive definite cost matrix.
+      r: A 2 dimensional numpy array, symmetric positive definite cost matrix
 
     Returns:
-      p: A numpy array, the Hessian of the optimal total cost-to-go (value
-        function at state x) is V(x) = .5 * x' * p * x.
-      k: A numpy array which gives the optimal linear policy u = k * x.
-      beta: The maximum eigenvalue of (a + b * k). Under optimal policy, at
-        timestep n the state tends to 0 like beta^n.
+      A numpy array, a real symmetric matrix P which is the solution to DARE.
 
     Raises:
-      RuntimeError: If the controlled system is unstable.
+      RuntimeError: If the computed P matrix is not symmetric and
+        positive-definite.
+    """
+    return solve_dare_batch(a[None], b[None], q[None], r[None])[0]
+
+
+def get_matrices(env):
+    """Returns the matrices of the LQR problem of an environment.
+
+    Args:
+      env: An instance of `control.EnvironmentV2` with LQR level.
+
+    Returns:
+      a: A numpy array, the state transition matrix.
+      b: A numpy array, the control transition matrix.
+      q: A numpy array, the state cost Hessian.
+      r: A numpy array, the control cost Hessian.
     """
     n = env.physics.model.nq  # number of DoFs
     m = env.physics.model.nu  # number of controls
@@ -127,20 +165,75 @@ def solve(env):
 
     # Control cost Hessian r.
     r = env.task.control_cost_coef * np.eye(m)
+    return a, b, q, r
+
+
+def _optimal_policy(a, b, r, p):
+    """Returns the optimal linear policies and their convergence rates."""
+    b_t = _transpose(b)
+    k = -np.linalg.solve(
+        np.matmul(b_t, np.matmul(p, b)) + r, np.matmul(b_t, np.matmul(p, a))
+    )
+
+    # Under optimal policy, state tends to 0 like beta^n_timesteps
+    beta = np.abs(np.linalg.eigvals(a + np.matmul(b, k))).max(axis=-1)
+    if np.any(beta >= 1.0):
+        raise RuntimeError("Controlled system is unstable.")
+    return k, beta
+
+
+def solve(env):
+    """Returns the optimal value and policy for LQR problem.
+
+    Args:
+      env: An instance of `control.EnvironmentV2` with LQR level.
+
+    Returns:
+      p: A numpy array, the Hessian of the optimal total cost-to-go (value
+        function at state x) is V(x) = .5 * x' * p * x.
+      k: A numpy array which gives the optimal linear policy u = k * x.
+      beta: The maximum eigenvalue of (a + b * k). Under optimal policy, at
+        timestep n the state tends to 0 like beta^n.
+
+    Raises:
+      RuntimeError: If the controlled system is unstable.
+    """
+    a, b, q, r = get_matrices(env)
 
     if sp:
-        # Use scipy's faster DARE solver if available.
+        # Use scipy's Schur-based DARE solver if available.
         solve_dare = sp.solve_discrete_are
     else:
-        # Otherwise fall back on a slower internal implementation.
+        # Otherwise fall back on the internal doubling algorithm.
         solve_dare = _solve_dare
 
     # Solve the discrete algebraic Riccati equation.
     p = solve_dare(a, b, q, r)
-    k = -np.linalg.solve(b.T.dot(p.dot(b)) + r, b.T.dot(p.dot(a)))
+    k, beta = _optimal_policy(a, b, r, p)
+    return p, k, beta
 
-    # Under optimal policy, state tends to 0 like beta^n_timesteps
-    beta = np.abs(np.linalg.eigvals(a + b.dot(k))).max()
-    if beta >= 1.0:
-        raise RuntimeError("Controlled system is unstable.")
+
+def solve_batch(envs):
+    """Returns the optimal values and policies for a batch of LQR problems.
+
+    The DAREs of all the environments are solved at once (refer to
+    `solve_dare_batch`), eg for many random instances of `lqr.lqr_2_1`.
+
+    Args:
+      envs: A sequence of instances of `control.EnvironmentV2` with LQR
+        levels of the same size (number of bodies and of actuators).
+
+    Returns:
+      p: A numpy array of shape (len(envs), ...), the Hessians of the optimal
+        total costs-to-go (refer to `solve`).
+      k: A numpy array of shape (len(envs), ...), the optimal linear policies.
+      beta: A numpy array of shape (len(envs),), the maximum eigenvalues of
+        (a + b * k).
+
+    Raises:
+      RuntimeError: If a controlled system is unstable.
+    """
+    a, b, q, r = [np.stack(matrices) for matrices in zip(*map(get_matrices, envs))]
+    p = solve_dare_batch(a, b, q, r)
+    k, beta = _optimal_policy(a, b, r, p)
     return p, k, beta
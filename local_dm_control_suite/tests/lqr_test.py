@@ -57,6 +57,37 @@ class LqrTest(parameterized.TestCase):
             lqr_solver.sp = old_sp
         self.assertPolicyisOptimal(env, p, k, beta)
 
+    @parameterized.named_parameters(("lqr_2_1", lqr.lqr_2_1), ("lqr_6_2", lqr.lqr_6_2))
+    def test_lqr_optimal_policies_batch(self, make_env):
+        envs = [make_env(random=seed) for seed in range(4)]
+        p, k, beta = lqr_solver.solve_batch(envs)
+        self.assertLen(beta, len(envs))
+        for env, env_p, env_k, env_beta in zip(envs, p, k, beta):
+            expected_p, expected_k, expected_beta = lqr_solver.solve(env)
+            np.testing.assert_allclose(env_p, expected_p, rtol=1e-6)
+            np.testing.assert_allclose(env_k, expected_k, rtol=1e-6, atol=1e-9)
+            self.assertAlmostEqual(env_beta, expected_beta)
+        self.assertPolicyisOptimal(envs[0], p[0], k[0], beta[0])
+
+    @unittest.skipUnless(
+        condition=lqr_solver.sp,
+        reason="scipy is not available to compare the DARE solutions.",
+    )
+    def test_solve_dare_batch_matches_scipy(self):
+        random = np.random.RandomState(0)
+        n, m = 4, 2
+        a = random.randn(8, n, n)
+        b = random.randn(8, n, m)
+        q = np.eye(n) + np.zeros((8, n, n))
+        r = np.eye(m) + np.zeros((8, m, m))
+        p = lqr_solver.solve_dare_batch(a, b, q, r)
+        for i in range(8):
+            np.testing.assert_allclose(
+                p[i],
+                lqr_solver.sp.solve_discrete_are(a[i], b[i], q[i], r[i]),
+                rtol=1e-8,
+            )
+
     def assertPolicyisOptimal(self, env, p, k, beta):
         tolerance = 1e-3
         n_steps = int(math.ceil(math.log10(tolerance) / math.log10(beta)))
@@ -20,6 +20,9 @@ from __future__ import division
 from __future__ import print_function
 
 import collections
+import hashlib
+import os
+import tempfile
 
 from dm_control.mujoco.wrapper import mjbindings
 import numpy as np
@@ -99,13 +102,34 @@ _CMU_MOCAP_JOINT_ORDER = (
 Converted = collections.namedtuple("Converted", ["qpos", "qvel", "time"])
 
 
-def convert(file_name, physics, timestep):
+def _cache_path(cache_dir, file_name, index2joint, timestep):
+    """Returns the path of the cached conversion of a file."""
+    stat = os.stat(file_name)
+    key = repr(
+        (
+            os.path.abspath(file_name),
+            stat.st_size,
+            stat.st_mtime_ns,
+            sorted(index2joint.items()),
+            float(timestep),
+        )
+    )
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    base_name = os.path.splitext(os.path.basename(file_name))[0]
+    return os.path.join(cache_dir, "{}_{}.npz".format(base_name, digest))
+
+
+def convert(file_name, physics, timestep, cache_dir=None):
     """Converts the parsed .amc values into qpos and qvel values and resamples.
 
+    All the frames are converted at once, with vectorized numpy operations.
+
     Args:
       file_name: The .amc file to be parsed and converted.
       physics: The corresponding physics instance.
       timestep: Desired output interval between resampled frames.
+      cache_dir: Optional directory where the converted values are cached,
+        per file (and modification time), joints and timestep.
 
     Returns:
       A namedtuple with fields:
@@ -113,7 +137,6 @@ def convert(file_name, physics, timestep):
           `qvel`, a numpy array containing converted velocity variables.
           `time`, a numpy array containing the corresponding times.
     """
-    frame_values = parse(file_name)
     joint2index = {}
     for name in physics.named.data.qpos.axes.row.names:
         joint2index[name] = physics.named.data.qpos.axes.row.convert_key_item(name)
@@ -126,80 +149,81 @@ def convert(file_name, physics, timestep):
         for ii in indices:
             index2joint[ii] = joint
 
+    if cache_dir is not None:
+        cache_path = _cache_path(cache_dir, file_name, index2joint, timestep)
+        if os.path.exists(cache_path):
+            with np.load(cache_path) as cached:
+                return Converted(cached["qpos"], cached["qvel"], cached["time"])
+
+    frame_values = parse_frames(file_name)
+
     # Convert frame_values to qpos
     amcvals2qpos_transformer = Amcvals2qpos(index2joint, _CMU_MOCAP_JOINT_ORDER)
-    qpos_values = []
-    for frame_value in frame_values:
-        qpos_values.append(amcvals2qpos_transformer(frame_value))
-    qpos_values = np.stack(qpos_values)  # Time by nq
+    qpos_values = amcvals2qpos_transformer.convert_frames(frame_values)  # Time by nq
 
     # Interpolate/resample.
     # Note: interpolate quaternions rather than euler angles (slerp).
     # see https://en.wikipedia.org/wiki/Slerp
-    qpos_values_resampled = []
     time_vals = np.arange(0, len(frame_values) * MOCAP_DT - 1e-8, MOCAP_DT)
     time_vals_new = np.arange(0, len(frame_values) * MOCAP_DT, timestep)
     while time_vals_new[-1] > time_vals[-1]:
         time_vals_new = time_vals_new[:-1]
 
-    for i in range(qpos_values.shape[1]):
-        f = interpolate.splrep(time_vals, qpos_values[:, i])
-        qpos_values_resampled.append(interpolate.splev(time_vals_new, f))
+    # Cubic interpolating splines (as `interpolate.splrep`) of all the
+    # columns at once.
+    spline = interpolate.make_interp_spline(time_vals, qpos_values, k=3, axis=0)
+    qpos_values_resampled = spline(time_vals_new).T  # nq by ntime
 
-    qpos_values_resampled = np.stack(qpos_values_resampled)  # nq by ntime
-
-    qvel_list = []
-    for t in range(qpos_values_resampled.shape[1] - 1):
-        p_tp1 = qpos_values_resampled[:, t + 1]
-        p_t = qpos_values_resampled[:, t]
-        qvel = [
+    p_t = qpos_values_resampled[:, :-1]
+    p_tp1 = qpos_values_resampled[:, 1:]
+    qvel_values_resampled = np.concatenate(
+        [
             (p_tp1[:3] - p_t[:3]) / timestep,
-            mj_quat2vel(mj_quatdiff(p_t[3:7], p_tp1[3:7]), timestep),
+            quat2vel(quatdiff(p_t[3:7].T, p_tp1[3:7].T), timestep).T,
             (p_tp1[7:] - p_t[7:]) / timestep,
         ]
-        qvel_list.append(np.concatenate(qvel))
-
-    qvel_values_resampled = np.vstack(qvel_list).T
-
-    return Converted(qpos_values_resampled, qvel_values_resampled, time_vals_new)
+    )
+
+    converted = Converted(qpos_values_resampled, qvel_values_resampled, time_vals_new)
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file which is then renamed, so that concurrent
+        # processes never read a partial file.
+        with tempfile.NamedTemporaryFile(
+            dir=cache_dir, suffix=".npz", delete=False
+        ) as f:
+            np.savez(f, **converted._asdict())
+        os.replace(f.name, cache_path)
+    return converted
+
+
+def parse_frames(file_name):
+    """Parses the amc file format into an array of shape (frames, values)."""
+    with open(file_name, "r") as fid:
+        lines = fid.read().splitlines()
+    # Skip the header, up to the first frame.
+    try:
+        start = next(i for i, line in enumerate(lines) if line.strip() == "1")
+    except StopIteration:
+        return np.zeros((0, 0))
+    num_frames = 0
+    tokens = []
+    for line in lines[start:]:
+        line = line.strip()
+        if not line:
+            break
+        if line.isdigit():
+            num_frames += 1
+        else:
+            name_and_values = line.split(None, 1)
+            tokens.append(name_and_values[1] if len(name_and_values) > 1 else "")
+    values = np.array(" ".join(tokens).split(), dtype=np.float64)
+    return values.reshape(num_frames, -1)
 
 
 def parse(file_name):
     """Parses the amc file format."""
-    values = []
-    fid = open(file_name, "r")
-    line = fid.readline().strip()
-    frame_ind = 1
-    first_frame = True
-    while True:
-        # Parse first frame.
-        if first_frame and line[0] == str(frame_ind):
-            first_frame = False
-            frame_ind += 1
-            frame_vals = []
-            while True:
-                line = fid.readline().strip()
-                if not line or line == str(frame_ind):
-                    values.append(np.array(frame_vals, dtype=np.float))
-                    break
-                tokens = line.split()
-                frame_vals.extend(tokens[1:])
-        # Parse other frames.
-        elif line == str(frame_ind):
-            frame_ind += 1
-            frame_vals = []
-            while True:
-                line = fid.readline().strip()
-                if not line or line == str(frame_ind):
-                    values.append(np.array(frame_vals, dtype=np.float))
-                    break
-                tokens = line.split()
-                frame_vals.extend(tokens[1:])
-        else:
-            line = fid.readline().strip()
-            if not line:
-                break
-    return values
+    return list(parse_frames(file_name))
 
 
 class Amcvals2qpos(object):
@@ -233,16 +257,20 @@ class Amcvals2qpos(object):
 
     def __call__(self, amc_val):
         """Converts a `.amc` frame to MuJoCo qpos format."""
-        amc_val_rad = np.deg2rad(amc_val)
-        qpos = np.dot(self.amc2qpos_transform, amc_val_rad)
+        return self.convert_frames(np.asarray(amc_val)[None])[0]
 
-        # Root.
-        qpos[:3] = np.dot(self.root_xyz_ransform, amc_val[:3])
-        qpos_quat = euler2quat(amc_val[3], amc_val[4], amc_val[5])
-        qpos_quat = mj_quatprod(euler2quat(90, 0, 0), qpos_quat)
+    def convert_frames(self, amc_vals):
+        """Converts `.amc` frames (of shape (frames, values)) to MuJoCo qpos
+        format, all at once."""
+        amc_vals_rad = np.deg2rad(amc_vals)
+        qpos = np.dot(amc_vals_rad, self.amc2qpos_transform.T)
 
-        for i, ind in enumerate(self.qpos_root_quat_ind):
-            qpos[ind] = qpos_quat[i]
+        # Root.
+        qpos[:, self.qpos_root_xyz_ind] = np.dot(
+            amc_vals[:, :3], self.root_xyz_ransform.T
+        )
+        qpos_quat = euler2quat(amc_vals[:, 3], amc_vals[:, 4], amc_vals[:, 5])
+        qpos[:, self.qpos_root_quat_ind] = quatprod(euler2quat(90, 0, 0), qpos_quat)
 
         return qpos
 
@@ -258,7 +286,8 @@ def euler2quat(ax, ay, az):
       az: Yaw angle (deg).
 
     Returns:
-      A numpy array representing the rotation as a quaternion.
+      A numpy array representing the rotation as a quaternion (the angles can
+      be arrays, the quaternions are then stacked along the last axis).
     """
     r1 = az
     r2 = ay
@@ -276,7 +305,7 @@ def euler2quat(ax, ay, az):
     q2 = c1 * s2 * c3 + s1 * c2 * s3
     q3 = s1 * c2 * c3 - c1 * s2 * s3
 
-    return np.array([q0, q1, q2, q3])
+    return np.stack([q0, q1, q2, q3], axis=-1)
 
 
 def mj_quatprod(q, r):
@@ -299,3 +328,45 @@ def mj_quatneg(q):
 
 def mj_quatdiff(source, target):
     return mj_quatprod(mj_quatneg(source), np.ascontiguousarray(target))
+
+
+def quatprod(q, r):
+    """Multiplies (stacks of) quaternions, as `mju_mulQuat`."""
+    q = np.asarray(q)
+    r = np.asarray(r)
+    q0, q1, q2, q3 = np.moveaxis(q, -1, 0)
+    r0, r1, r2, r3 = np.moveaxis(r, -1, 0)
+    return np.stack(
+        [
+            q0 * r0 - q1 * r1 - q2 * r2 - q3 * r3,
+            q0 * r1 + q1 * r0 + q2 * r3 - q3 * r2,
+            q0 * r2 - q1 * r3 + q2 * r0 + q3 * r1,
+            q0 * r3 + q1 * r2 - q2 * r1 + q3 * r0,
+        ],
+        axis=-1,
+    )
+
+
+def quatneg(q):
+    """Conjugates (stacks of) quaternions, as `mju_negQuat`."""
+    return np.asarray(q) * np.array([1.0, -1.0, -1.0, -1.0])
+
+
+def quatdiff(source, target):
+    """Rotations from `source` to `target` (stacks of) quaternions."""
+    return quatprod(quatneg(source), target)
+
+
+def quat2vel(q, dt):
+    """Converts (stacks of) quaternions to angular velocities, as
+    `mju_quat2Vel`."""
+    q = np.asarray(q)
+    axis = q[..., 1:]
+    sin_a_2 = np.linalg.norm(axis, axis=-1)
+    speed = 2 * np.arctan2(sin_a_2, q[..., 0])
+    # When the axis-angle is larger than pi, the rotation is in the opposite
+    # direction.
+    speed = np.where(speed > np.pi, speed - 2 * np.pi, speed) / dt
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scale = np.where(sin_a_2 > 0, speed / sin_a_2, 0.0)
+    return axis * scale[..., None]
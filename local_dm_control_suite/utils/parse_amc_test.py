@@ -21,6 +21,8 @@ from __future__ import print_function
 
 import os
 
+import numpy as np
+
 # Internal dependencies.
 
 from absl.testing import absltest
@@ -63,6 +65,32 @@ class ParseAMCTest(absltest.TestCase):
         # Compare sizes of parsed objects for different timesteps
         self.assertEqual(converted.qpos.shape[1] * 2, converted2.qpos.shape[1])
 
+    def test_cached_conversion(self):
+        env = humanoid_CMU.stand()
+        cache_dir = self.create_tempdir().full_path
+        converted = parse_amc.convert(
+            _TEST_AMC_PATH, env.physics, env.control_timestep(), cache_dir=cache_dir
+        )
+        self.assertLen(os.listdir(cache_dir), 1)
+        cached = parse_amc.convert(
+            _TEST_AMC_PATH, env.physics, env.control_timestep(), cache_dir=cache_dir
+        )
+        for values, cached_values in zip(converted, cached):
+            np.testing.assert_array_equal(values, cached_values)
+
+    def test_batched_quaternion_ops_match_mjlib(self):
+        random = np.random.RandomState(0)
+        source = random.randn(10, 4)
+        source /= np.linalg.norm(source, axis=1, keepdims=True)
+        target = random.randn(10, 4)
+        target /= np.linalg.norm(target, axis=1, keepdims=True)
+        velocities = parse_amc.quat2vel(parse_amc.quatdiff(source, target), 0.1)
+        for i in range(10):
+            np.testing.assert_allclose(
+                velocities[i],
+                parse_amc.mj_quat2vel(parse_amc.mj_quatdiff(source[i], target[i]), 0.1),
+            )
+
 
 if __name__ == "__main__":
     absltest.main()
@@ -0,0 +1,2 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+from mtenv.benchmarks.throughput import benchmark_env  # noqa: F401
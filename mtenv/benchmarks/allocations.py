@@ -0,0 +1,112 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Memory allocation benchmarks (with `tracemalloc`) for the `step` method
+of the registered multitask environments."""
+
+import traceback
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from mtenv import MTEnv
+from mtenv.benchmarks.throughput import ResultType
+from mtenv.envs.registration import make
+
+
+def measure_step_allocations(
+    env: MTEnv, num_steps: int = 1000, seed: int = 1
+) -> Dict[str, float]:
+    """Measure the memory allocated by `env.step`.
+
+    The outputs of `step` are kept alive (as a training loop storing the
+    transitions would) so the snapshots (taken before and after the
+    steps) count the memory blocks that every step allocates for its
+    outputs. Environments which are done are reset.
+
+    Args:
+        env (MTEnv): environment to benchmark.
+        num_steps (int, optional): Defaults to 1000.
+        seed (int, optional): Defaults to 1.
+
+    Returns:
+        Dict[str, float]: number of memory blocks and bytes allocated (and
+        kept alive) per step, and peak of the traced memory (in bytes).
+    """
+    env.seed(seed)
+    env.seed_task(seed + 1)
+    env.action_space.seed(seed)
+    env.reset_task_state()
+    env.reset()
+    actions = [env.action_space.sample() for _ in range(num_steps)]
+    outputs: List[Any] = [None] * num_steps
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for index, action in enumerate(actions):
+            outputs[index] = env.step(action)
+            if outputs[index][2]:
+                env.reset()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    stats = after.filter_traces(filters).compare_to(
+        before.filter_traces(filters), "filename"
+    )
+    return {
+        "blocks_per_step": sum(stat.count_diff for stat in stats) / num_steps,
+        "bytes_per_step": sum(stat.size_diff for stat in stats) / num_steps,
+        "peak_traced_bytes": float(peak),
+    }
+
+
+def benchmark_step_allocations(
+    env_id: str,
+    num_steps: int = 1000,
+    env_kwargs: Optional[Dict[str, Any]] = None,
+    seed: int = 1,
+) -> ResultType:
+    """Construct a registered environment and measure the memory allocated
+    by its `step` method (see `measure_step_allocations`).
+
+    Errors (eg missing dependencies) are reported in the result instead
+    of being raised.
+
+    Returns:
+        ResultType: dictionary with the configuration, the status (`ok` or
+        `error`) and the metrics.
+    """
+    result: ResultType = {
+        "env_id": env_id,
+        "mode": "allocations",
+        "env_kwargs": env_kwargs or {},
+        "num_steps": num_steps,
+    }
+    env = None
+    try:
+        env = make(env_id, **(env_kwargs or {}))
+        result.update(measure_step_allocations(env, num_steps=num_steps, seed=seed))
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    finally:
+        if env is not None:
+            env.close()
+    return result
+
+
+def summarize_allocations(results: List[ResultType]) -> str:
+    """Format the results as a (human readable) table."""
+    lines = [f"{'env_id':<60} {'blocks/step':>12} {'bytes/step':>12}"]
+    for result in results:
+        if result["status"] != "ok":
+            lines.append(f"{result['env_id']:<60} {result['error']}")
+            continue
+        lines.append(
+            f"{result['env_id']:<60} {result['blocks_per_step']:>12.2f} "
+            f"{result['bytes_per_step']:>12.1f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,191 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Command line interface to run the benchmarks."""
+
+import argparse
+import datetime
+import fnmatch
+import json
+import platform
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+import gym
+import numpy as np
+
+import mtenv
+from mtenv.benchmarks.allocations import (
+    benchmark_step_allocations,
+    summarize_allocations,
+)
+from mtenv.benchmarks.throughput import (
+    MODES,
+    ResultType,
+    benchmark_env,
+    benchmark_env_in_subprocess,
+    summarize,
+)
+from mtenv.benchmarks.task_switch import benchmark_task_switch, summarize_task_switch
+from mtenv.envs.registration import mtenv_registry
+
+SUITES = ("throughput", "task_switch", "allocations")
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="mtenv-benchmark",
+        description="Measure steps/sec, resets/sec, task-switch latency, "
+        "per-step allocations and peak RSS of the registered multitask "
+        "environments.",
+    )
+    parser.add_argument(
+        "--suite",
+        default="throughput",
+        choices=SUITES,
+        help="`throughput` benchmarks each environment in every mode while "
+        "`task_switch` measures the latency of switching to the same task and "
+        "to a new task (grouped by environment family) and `allocations` counts "
+        "the memory blocks allocated by each step.",
+    )
+    parser.add_argument(
+        "--env-ids",
+        nargs="+",
+        default=["*"],
+        help="ids (or glob patterns) of the registered environments to benchmark.",
+    )
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--num-envs", type=int, default=4)
+    parser.add_argument("--num-steps", type=int, default=1000)
+    parser.add_argument("--num-resets", type=int, default=20)
+    parser.add_argument("--num-task-switches", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--env-kwargs",
+        type=json.loads,
+        default=None,
+        help="arguments (as a JSON object) to construct the environments, eg "
+        "'{\"reuse_obs\": true}'.",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=600.0,
+        help="time limit (in seconds) for each benchmark.",
+    )
+    parser.add_argument(
+        "--no-isolation",
+        action="store_true",
+        help="run the benchmarks in the current process instead of one fresh "
+        "process per benchmark (the peak RSS then accumulates across benchmarks).",
+    )
+    parser.add_argument(
+        "--output", default=None, help="path of the JSON report (optional)."
+    )
+    return parser
+
+
+def select_env_ids(patterns: List[str]) -> List[str]:
+    """Return the (sorted) ids of the registered environments matching any
+    of the `patterns`."""
+    return sorted(
+        env_id
+        for env_id in mtenv_registry.env_specs
+        if any(fnmatch.fnmatchcase(env_id, pattern) for pattern in patterns)
+    )
+
+
+def get_metadata() -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.datetime.now().isoformat(),
+        "mtenv_version": mtenv.__version__,
+        "gym_version": gym.__version__,
+        "numpy_version": np.__version__,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+    }
+
+
+def _run_benchmark(
+    args: argparse.Namespace,
+    benchmark_fn: Callable[..., ResultType],
+    kwargs: Dict[str, Any],
+) -> ResultType:
+    if args.no_isolation:
+        return benchmark_fn(**kwargs)
+    return benchmark_env_in_subprocess(
+        timeout=args.timeout, benchmark_fn=benchmark_fn, **kwargs
+    )
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the benchmarks and return the report."""
+    results: List[ResultType] = []
+    for env_id in select_env_ids(args.env_ids):
+        if args.suite == "allocations":
+            result = _run_benchmark(
+                args=args,
+                benchmark_fn=benchmark_step_allocations,
+                kwargs={
+                    "env_id": env_id,
+                    "num_steps": args.num_steps,
+                    "env_kwargs": args.env_kwargs,
+                    "seed": args.seed,
+                },
+            )
+            print(summarize_allocations([result]).splitlines()[-1], file=sys.stderr)
+            results.append(result)
+            continue
+        if args.suite == "task_switch":
+            result = _run_benchmark(
+                args=args,
+                benchmark_fn=benchmark_task_switch,
+                kwargs={
+                    "env_id": env_id,
+                    "num_task_switches": args.num_task_switches,
+                    "env_kwargs": args.env_kwargs,
+                    "seed": args.seed,
+                },
+            )
+            print(summarize_task_switch([result]).splitlines()[-1], file=sys.stderr)
+            results.append(result)
+            continue
+        for mode in args.modes:
+            result = _run_benchmark(
+                args=args,
+                benchmark_fn=benchmark_env,
+                kwargs={
+                    "env_id": env_id,
+                    "mode": mode,
+                    "num_envs": args.num_envs,
+                    "num_steps": args.num_steps,
+                    "num_resets": args.num_resets,
+                    "num_task_switches": args.num_task_switches,
+                    "env_kwargs": args.env_kwargs,
+                    "seed": args.seed,
+                },
+            )
+            print(summarize([result]).splitlines()[-1], file=sys.stderr)
+            results.append(result)
+    return {
+        "metadata": get_metadata(),
+        "config": vars(args),
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = get_parser().parse_args(argv)
+    report = run(args)
+    if args.suite == "allocations":
+        print(summarize_allocations(report["results"]))
+    elif args.suite == "task_switch":
+        print(summarize_task_switch(report["results"]))
+    else:
+        print(summarize(report["results"]))
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
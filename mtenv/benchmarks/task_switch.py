@@ -0,0 +1,141 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Task-switch latency (`set_task_state` followed by `reset`) benchmarks
+for the registered multitask environments."""
+
+import time
+import traceback
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from mtenv.benchmarks.throughput import ResultType, get_peak_rss_mb
+from mtenv.envs.registration import make, mtenv_registry
+from mtenv.utils.profiling import LatencyHistogram
+from mtenv.utils.types import TaskStateType
+
+
+def get_env_family(env_id: str) -> str:
+    """Return the family of a registered environment, ie the package (in
+    `mtenv.envs`) which implements it."""
+    entry_point = mtenv_registry.spec(env_id).entry_point
+    if not isinstance(entry_point, str):
+        return "unknown"
+    module = entry_point.split(":")[0]
+    prefix = "mtenv.envs."
+    if module.startswith(prefix):
+        return module[len(prefix) :].split(".")[0]
+    return module
+
+
+def is_same_task_state(first: TaskStateType, second: TaskStateType) -> bool:
+    """Compare two task states (which can be arbitrary nested objects)."""
+    try:
+        return bool(np.array_equal(first, second))
+    except Exception:
+        return bool(first == second)
+
+
+def _stats_ms(histogram: LatencyHistogram) -> Dict[str, float]:
+    stats = histogram.as_dict()
+    stats = {
+        key: value * 1000.0
+        for key, value in stats.items()
+        if key in ("mean", "p50", "p99", "max")
+    }
+    stats["count"] = histogram.count
+    return stats
+
+
+def benchmark_task_switch(
+    env_id: str,
+    num_task_switches: int = 100,
+    env_kwargs: Optional[Dict[str, Any]] = None,
+    seed: int = 1,
+) -> ResultType:
+    """Measure the latency of switching tasks (`set_task_state` followed
+    by `reset`) for a registered environment.
+
+    The latencies are reported separately for switches to the same task
+    (which environments can serve from a fast path) and to a new task.
+    Errors (eg missing dependencies) are reported in the result instead
+    of being raised.
+
+    Args:
+        env_id (str): id of the registered environment.
+        num_task_switches (int, optional): number of switches of each kind.
+            Defaults to 100.
+        env_kwargs (Optional[Dict[str, Any]], optional): arguments to
+            construct the environment. Defaults to None.
+        seed (int, optional): Defaults to 1.
+
+    Returns:
+        ResultType: dictionary with the configuration, the status (`ok` or
+        `error`) and the latencies (in ms).
+    """
+    result: ResultType = {
+        "env_id": env_id,
+        "family": get_env_family(env_id),
+        "mode": "task_switch",
+    }
+    env = None
+    try:
+        env = make(env_id, **(env_kwargs or {}))
+        env.seed(seed)
+        env.seed_task(seed + 1)
+        env.reset_task_state()
+        env.reset()
+
+        same_task = LatencyHistogram()
+        new_task = LatencyHistogram()
+        for _ in range(num_task_switches):
+            task_state = env.get_task_state()
+            start = time.perf_counter()
+            env.set_task_state(task_state)
+            env.reset()
+            same_task.add(time.perf_counter() - start)
+
+            task_state = env.sample_task_state()
+            histogram = (
+                same_task
+                if is_same_task_state(task_state, env.get_task_state())
+                else new_task
+            )
+            start = time.perf_counter()
+            env.set_task_state(task_state)
+            env.reset()
+            histogram.add(time.perf_counter() - start)
+
+        result["same_task_latency_ms"] = _stats_ms(same_task)
+        result["new_task_latency_ms"] = _stats_ms(new_task)
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    finally:
+        if env is not None:
+            env.close()
+    result["peak_rss_mb"] = get_peak_rss_mb()
+    return result
+
+
+def summarize_task_switch(results: List[ResultType]) -> str:
+    """Format the results as a (human readable) table, grouped by
+    environment family."""
+    lines = [
+        f"{'family':<12} {'env_id':<60} {'same p50 ms':>12} {'new p50 ms':>12} "
+        f"{'new p99 ms':>12}"
+    ]
+    for result in sorted(results, key=lambda result: result.get("family", "")):
+        prefix = f"{result.get('family', 'unknown'):<12} {result['env_id']:<60}"
+        if result["status"] != "ok":
+            lines.append(f"{prefix} {result['error']}")
+            continue
+        same = result["same_task_latency_ms"]
+        new = result["new_task_latency_ms"]
+        lines.append(
+            f"{prefix} {same.get('p50', float('nan')):>12.3f} "
+            f"{new.get('p50', float('nan')):>12.3f} "
+            f"{new.get('p99', float('nan')):>12.3f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,310 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Throughput benchmarks (steps/sec, resets/sec, task-switch latency and
+peak memory) for the registered multitask environments."""
+
+import functools
+import multiprocessing as mp
+import queue as queue_module
+import sys
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+
+from mtenv.envs.registration import make
+from mtenv.utils.profiling import LatencyHistogram
+from mtenv.vector.subproc_vector_mtenv import SubprocVectorMTEnv
+from mtenv.vector.sync_vector_mtenv import SyncVectorMTEnv
+from mtenv.vector.vector_mtenv import VectorMTEnv
+
+ResultType = Dict[str, Any]
+
+MODES = ("single", "vectorized", "subprocess")
+
+try:
+    import resource
+except ImportError:  # resource is not available on Windows.
+    resource = None  # type: ignore[assignment]
+
+
+def make_vector_env(
+    env_id: str, mode: str, num_envs: int, env_kwargs: Dict[str, Any]
+) -> VectorMTEnv:
+    """Construct the environments to benchmark.
+
+    Args:
+        env_id (str): id of the registered environment.
+        mode (str): `single` (one environment, in a `SyncVectorMTEnv` so
+            that the overhead of the vector wrapper is included, refer
+            `result["vector_env"]`), `vectorized` (`num_envs`
+            environments stepped sequentially in the current process) or
+            `subprocess` (`num_envs` environments, each in its own worker
+            process).
+        num_envs (int): number of environments (ignored in `single` mode).
+        env_kwargs (Dict[str, Any]): arguments to construct the
+            environment.
+
+    Raises:
+        ValueError: if `mode` is not valid.
+
+    Returns:
+        VectorMTEnv:
+    """
+    env_fn = functools.partial(make, env_id, **env_kwargs)
+    if mode == "single":
+        return SyncVectorMTEnv([env_fn])
+    if mode == "vectorized":
+        return SyncVectorMTEnv([env_fn for _ in range(num_envs)])
+    if mode == "subprocess":
+        return SubprocVectorMTEnv([env_fn for _ in range(num_envs)])
+    raise ValueError(f"mode={mode} is not valid. It should be one of {MODES}.")
+
+
+def get_peak_rss_mb() -> Dict[str, float]:
+    """Return the peak resident set size (in MB) of the current process
+    and of its (terminated and waited for) children."""
+    if resource is None:
+        return {}
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux.
+    scale = 1024.0**2 if sys.platform == "darwin" else 1024.0
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale,
+    }
+
+
+def _latency_stats_ms(histogram: LatencyHistogram) -> Dict[str, float]:
+    return {
+        key: value * 1000.0
+        for key, value in histogram.as_dict().items()
+        if key in ("mean", "p50", "p99", "max")
+    }
+
+
+def _get_rate(count: int, duration: float) -> Optional[float]:
+    # The rate is None when nothing was timed (eg `num_resets=0`).
+    if count <= 0 or duration <= 0.0:
+        return None
+    return count / duration
+
+
+def measure(
+    venv: VectorMTEnv,
+    num_steps: int,
+    num_resets: int,
+    num_task_switches: int,
+    seed: int = 1,
+) -> ResultType:
+    """Measure the throughput of `venv`.
+
+    Environments which are done are reset (as part of the step loop).
+    Actions are sampled before the timed loop.
+
+    Args:
+        venv (VectorMTEnv): environments to benchmark.
+        num_steps (int): number of (batched) steps.
+        num_resets (int): number of (batched) resets.
+        num_task_switches (int): number of (batched) task switches. A task
+            switch is a call to `reset_task_state` followed by a call to
+            `reset`.
+        seed (int, optional): Defaults to 1.
+
+    Returns:
+        ResultType: dictionary of metrics.
+    """
+    num_envs = venv.num_envs
+    venv.seed([seed + index for index in range(num_envs)])
+    venv.seed_task([seed + num_envs + index for index in range(num_envs)])
+    venv.action_space.seed(seed)
+    venv.reset_task_state()
+    venv.reset()
+
+    actions = [
+        [venv.action_space.sample() for _ in range(num_envs)] for _ in range(num_steps)
+    ]
+    num_episodes = 0
+    start = time.perf_counter()
+    for batch_actions in actions:
+        _, _, dones, _ = venv.step(batch_actions)
+        done_indices = [index for index, done in enumerate(dones) if done]
+        if done_indices:
+            num_episodes += len(done_indices)
+            venv.reset(indices=done_indices)
+    step_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(num_resets):
+        venv.reset()
+    reset_time = time.perf_counter() - start
+
+    task_switch_latency = LatencyHistogram()
+    for _ in range(num_task_switches):
+        start = time.perf_counter()
+        venv.reset_task_state()
+        venv.reset()
+        task_switch_latency.add(time.perf_counter() - start)
+
+    return {
+        "steps_per_sec": _get_rate(num_steps * num_envs, step_time),
+        "resets_per_sec": _get_rate(num_resets * num_envs, reset_time),
+        "task_switch_latency_ms": _latency_stats_ms(task_switch_latency),
+        "num_episodes_completed": num_episodes,
+    }
+
+
+def benchmark_env(
+    env_id: str,
+    mode: str,
+    num_envs: int = 4,
+    num_steps: int = 1000,
+    num_resets: int = 20,
+    num_task_switches: int = 20,
+    env_kwargs: Optional[Dict[str, Any]] = None,
+    seed: int = 1,
+) -> ResultType:
+    """Construct and benchmark an environment (in the current process).
+
+    Errors (eg missing dependencies) are reported in the result instead
+    of being raised.
+
+    Returns:
+        ResultType: dictionary with the configuration, the status (`ok` or
+        `error`) and the metrics.
+    """
+    result: ResultType = {
+        "env_id": env_id,
+        "mode": mode,
+        "num_envs": 1 if mode == "single" else num_envs,
+        "num_steps": num_steps,
+    }
+    venv = None
+    try:
+        start = time.perf_counter()
+        venv = make_vector_env(
+            env_id=env_id,
+            mode=mode,
+            num_envs=num_envs,
+            env_kwargs=env_kwargs or {},
+        )
+        result["construction_time_sec"] = time.perf_counter() - start
+        # The measurements include the overhead of the vector wrapper (also
+        # in `single` mode).
+        result["vector_env"] = type(venv).__name__
+        result.update(
+            measure(
+                venv=venv,
+                num_steps=num_steps,
+                num_resets=num_resets,
+                num_task_switches=num_task_switches,
+                seed=seed,
+            )
+        )
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    finally:
+        if venv is not None:
+            venv.close()
+    result["peak_rss_mb"] = get_peak_rss_mb()
+    return result
+
+
+def _benchmark_env_worker(
+    queue: Any, benchmark_fn: Callable[..., ResultType], kwargs: Dict[str, Any]
+) -> None:
+    queue.put(benchmark_fn(**kwargs))
+
+
+def benchmark_env_in_subprocess(
+    timeout: Optional[float] = None,
+    benchmark_fn: Callable[..., ResultType] = benchmark_env,
+    poll_interval: float = 0.1,
+    **kwargs: Any,
+) -> ResultType:
+    """Run a benchmark in a fresh (spawned) process.
+
+    This isolates the peak memory measurement (and any crash) of each
+    benchmark. A crash of the process is reported (with its exit code) as
+    soon as it is detected.
+
+    Args:
+        timeout (Optional[float], optional): time limit (in seconds) for
+            the benchmark. Defaults to None (no limit).
+        benchmark_fn (Callable[..., ResultType], optional): benchmark to
+            run. It should be importable from the spawned process.
+            Defaults to `benchmark_env`.
+        poll_interval (float, optional): interval (in seconds) between the
+            checks that the process is alive. Defaults to 0.1.
+        **kwargs: arguments of `benchmark_fn`.
+
+    Returns:
+        ResultType:
+    """
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(
+        target=_benchmark_env_worker, args=(queue, benchmark_fn, kwargs)
+    )
+    process.start()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    result: Optional[ResultType] = None
+    error = None
+    while result is None and error is None:
+        wait = poll_interval
+        if deadline is not None:
+            wait = min(wait, max(deadline - time.monotonic(), 0.0))
+        try:
+            result = queue.get(timeout=wait)
+        except queue_module.Empty:
+            if process.exitcode is not None:
+                # The result may have been sent just before the process
+                # exited.
+                try:
+                    result = queue.get(timeout=poll_interval)
+                except queue_module.Empty:
+                    error = (
+                        "the benchmark process exited with code "
+                        f"{process.exitcode} without a result."
+                    )
+            elif deadline is not None and time.monotonic() >= deadline:
+                process.terminate()
+                error = f"the benchmark did not complete within {timeout} seconds."
+    process.join()
+    if result is None:
+        result = {
+            "env_id": kwargs["env_id"],
+            "mode": kwargs.get("mode", benchmark_fn.__name__),
+            "status": "error",
+            "error": error,
+        }
+    return result
+
+
+def _format_rate(rate: Optional[float], width: int) -> str:
+    if rate is None:
+        return f"{'n/a':>{width}}"
+    return f"{rate:>{width}.1f}"
+
+
+def summarize(results: List[ResultType]) -> str:
+    """Format the results as a (human readable) table."""
+    lines = [
+        f"{'env_id':<60} {'mode':<11} {'steps/s':>10} {'resets/s':>10} "
+        f"{'switch p50 ms':>14} {'rss MB':>8}"
+    ]
+    for result in results:
+        if result["status"] != "ok":
+            lines.append(
+                f"{result['env_id']:<60} {result['mode']:<11} {result['error']}"
+            )
+            continue
+        rss = result["peak_rss_mb"]
+        lines.append(
+            f"{result['env_id']:<60} {result['mode']:<11} "
+            f"{_format_rate(result['steps_per_sec'], 10)} "
+            f"{_format_rate(result['resets_per_sec'], 10)} "
+            f"{result['task_switch_latency_ms'].get('p50', float('nan')):>14.3f} "
+            f"{rss.get('self', 0.0) + rss.get('children', 0.0):>8.1f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,53 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Command line interface of mtenv (`mtenv serve`)."""
+
+import argparse
+from typing import List, Optional
+
+from mtenv.remote.codec import DEFAULT_MAX_FRAME_SIZE
+from mtenv.remote.server import serve
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="mtenv")
+    subparsers = parser.add_subparsers(dest="command")
+    # `add_subparsers(required=True)` needs Python 3.7.
+    subparsers.required = True
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Host the registered environments behind a Unix or TCP socket "
+        "(refer `mtenv.remote.RemoteMTEnv` for the client).",
+    )
+    serve_parser.add_argument(
+        "--address",
+        default="127.0.0.1:7878",
+        help="`unix:<path>` or `<host>:<port>`.",
+    )
+    serve_parser.add_argument(
+        "--env-ids",
+        nargs="+",
+        default=["*"],
+        help="ids (or glob patterns) of the registered environments which "
+        "the clients can make.",
+    )
+    serve_parser.add_argument(
+        "--max-frame-size",
+        type=int,
+        default=DEFAULT_MAX_FRAME_SIZE,
+        help="largest request (in bytes) accepted from a client.",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = get_parser().parse_args(argv)
+    if args.command == "serve":
+        serve(
+            address=args.address,
+            env_ids=args.env_ids,
+            max_frame_size=args.max_frame_size,
+        )
+
+
+if __name__ == "__main__":
+    main()
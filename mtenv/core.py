@@ -1,7 +1,7 @@
 # Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
 """Core API of MultiTask Environments for Reinforcement Learning."""
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, List, Optional
 
 from gym.core import Env
 from gym.spaces.dict import Dict as DictSpace
@@ -17,6 +17,9 @@ from mtenv.utils.types import (
     TaskStateType,
 )
 
+# Marks the absence of an action waiting for `step_wait`.
+_NO_ACTION = object()
+
 
 class MTEnv(Env, ABC):  # type: ignore[misc]
     def __init__(
@@ -77,6 +80,35 @@ class MTEnv(Env, ABC):  # type: ignore[misc]
         """
         pass
 
+    def step_async(self, action: ActionType) -> None:
+        """Start executing the action in the environment. The result is
+        returned by `step_wait`, so that the caller can do some work (eg
+        the inference of the next action of another environment) while
+        the action is executed.
+
+        By default, the action is executed synchronously, in `step_wait`.
+        Environments which can run asynchronously (eg in another process)
+        override both methods.
+
+        Args:
+            action (ActionType)
+        """
+        if getattr(self, "_async_action", _NO_ACTION) is not _NO_ACTION:
+            raise RuntimeError("step_wait should be called before step_async.")
+        self._async_action: Any = action
+
+    def step_wait(self) -> StepReturnType:
+        """Wait for the action passed to `step_async` to be executed.
+
+        Returns:
+            StepReturnType: same as `step`.
+        """
+        action: Any = getattr(self, "_async_action", _NO_ACTION)
+        if action is _NO_ACTION:
+            raise RuntimeError("step_async should be called before step_wait.")
+        self._async_action = _NO_ACTION
+        return self.step(action)
+
     def get_task_obs(self) -> TaskObsType:
         """Get the current value of task observation.
 
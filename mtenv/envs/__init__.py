@@ -27,6 +27,33 @@ register(
     },
 )
 
+register(
+    id="MT-Bandit-v0",
+    entry_point="mtenv.envs.bandit.bandit:MTBanditEnv",
+    kwargs={"n_arms": 5},
+    test_kwargs={
+        "valid_env_kwargs": [{"n_arms": 2, "episode_length": 2}],
+        "invalid_env_kwargs": [{"n_arms": 0}],
+    },
+)
+
+register(
+    id="MT-SparseTabularMDP-v0",
+    entry_point="mtenv.envs.tabular_mdp.tmdp:SparseUniformTMDP",
+    kwargs={"n_states": 4, "n_actions": 5, "n_successors": 2},
+    test_kwargs={
+        "valid_env_kwargs": [
+            {
+                "n_states": 3,
+                "n_actions": 2,
+                "n_successors": 3,
+                "generate_from_seed": True,
+            }
+        ],
+        "invalid_env_kwargs": [{"n_states": 3, "n_actions": 2, "n_successors": 4}],
+    },
+)
+
 register(
     id="MT-Acrobat-v0",
     entry_point="mtenv.envs.control.acrobot:MTAcrobot",
@@ -46,6 +73,16 @@ register(
     },
 )
 
+register(
+    id="MT-HeadlessTwoGoalMaze-v0",
+    entry_point="mtenv.envs.mpte.headless_two_goal_maze_env:HeadlessTwoGoalMazeEnv",
+    kwargs={"size_x": 3, "size_y": 3},
+    test_kwargs={
+        "valid_env_kwargs": [{"size_x": 5, "size_y": 5, "empty_mu": True}],
+        "invalid_env_kwargs": [],
+    },
+)
+
 
 # remove it before making the repo public.
 default_kwargs = {
@@ -0,0 +1,261 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Multi-armed Bernoulli bandits, with a batched engine to run many
+independent bandit tasks at once."""
+
+import os
+import tempfile
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from gym import spaces
+from numpy.random import RandomState
+
+from mtenv import MTEnv
+from mtenv.utils import seeding
+from mtenv.utils.types import ActionType, ObsType, StepReturnType, TaskObsType
+
+TaskStateType = np.ndarray
+
+# Tables of arm probabilities built by `get_finite_task_observations`, keyed
+# by (n_tasks, n_arms, seed, cache_dir).
+_finite_task_observations: Dict[Tuple[int, int, int, Optional[str]], np.ndarray] = {}
+
+
+def _make_finite_task_observations(n_tasks: int, n_arms: int, seed: int) -> np.ndarray:
+    np_random, _ = seeding.np_random(seed)
+    # Same values as sampling the tasks one by one from
+    # `Box(low=0.0, high=1.0, shape=(n_arms,))` seeded with `seed`.
+    task_observations: np.ndarray = np_random.uniform(
+        low=0.0, high=1.0, size=(n_tasks, n_arms)
+    ).astype(np.float32)
+    return task_observations
+
+
+def get_finite_task_observations(
+    n_tasks: int, n_arms: int, seed: int = 0, cache_dir: Optional[str] = None
+) -> np.ndarray:
+    """Read-only table of the arm probabilities of a finite set of bandit
+    tasks, of shape (n_tasks, n_arms).
+
+    The table is generated (in one vectorized draw) once per process and
+    shared by all the callers. When `cache_dir` is set, the table is
+    stored in a `.npy` file of `cache_dir` and memory-mapped: the
+    processes using the same file (eg the workers of a
+    `SubprocVectorMTEnv`) share a single buffer, from the page cache.
+
+    Args:
+        n_tasks (int): number of tasks.
+        n_arms (int): number of arms.
+        seed (int, optional): seed of the table. Defaults to 0.
+        cache_dir (Optional[str], optional): directory of the memory-mapped
+            file. Defaults to None (the table is held in memory).
+
+    Returns:
+        np.ndarray: the table (a `np.memmap` when `cache_dir` is set).
+    """
+    if n_tasks <= 0 or n_arms <= 0:
+        raise ValueError(f"n_tasks={n_tasks} and n_arms={n_arms} should be positive.")
+    key = (n_tasks, n_arms, seed, cache_dir)
+    if key in _finite_task_observations:
+        return _finite_task_observations[key]
+    if cache_dir is None:
+        task_observations = _make_finite_task_observations(n_tasks, n_arms, seed)
+        task_observations.flags.writeable = False
+    else:
+        path = os.path.join(cache_dir, f"bandit_tasks_{n_tasks}_{n_arms}_{seed}.npy")
+        if not os.path.exists(path):
+            os.makedirs(cache_dir, exist_ok=True)
+            # The table is written to a temporary file which is then renamed,
+            # so that concurrent processes never map a partial file.
+            with tempfile.NamedTemporaryFile(
+                dir=cache_dir, suffix=".npy", delete=False
+            ) as f:
+                np.save(f, _make_finite_task_observations(n_tasks, n_arms, seed))
+            os.replace(f.name, path)
+        task_observations = np.load(path, mmap_mode="r")
+    _finite_task_observations[key] = task_observations
+    return task_observations
+
+
+class BatchedBandit:
+    def __init__(
+        self, num_envs: int, n_arms: int, episode_length: Optional[int] = None
+    ) -> None:
+        """Batch of `num_envs` independent Bernoulli bandit tasks with
+        `n_arms` arms.
+
+        The task of an environment is the probability of a reward of 1 for
+        each arm, and the tasks of the batch are stored in an array of
+        shape (num_envs, n_arms). Steps are vectorized: the rewards of all
+        the environments are drawn at once, with a single random number
+        generator per batch (refer `seed` and `seed_task`).
+
+        Args:
+            num_envs (int): number of environments.
+            n_arms (int): number of arms.
+            episode_length (Optional[int], optional): number of steps of an
+                episode. Defaults to None (the episodes never end).
+        """
+        if num_envs <= 0 or n_arms <= 0:
+            raise ValueError(
+                f"num_envs={num_envs} and n_arms={n_arms} should be positive."
+            )
+        self.num_envs = num_envs
+        self.n_arms = n_arms
+        self.episode_length = episode_length
+        self.np_random_env: Optional[RandomState] = None
+        self.np_random_task: Optional[RandomState] = None
+        self.arm_probabilities = np.zeros((num_envs, n_arms))
+        self.step_count = np.zeros(num_envs, dtype=np.int64)
+        self._arange = np.arange(num_envs)
+        # The environment observation is constant.
+        self._env_obs = np.zeros((num_envs, 1), dtype=np.float32)
+        self._env_obs.flags.writeable = False
+
+    @property
+    def task_obs(self) -> np.ndarray:
+        """Read-only view of the arm probabilities, of shape (num_envs,
+        n_arms)."""
+        task_obs = self.arm_probabilities.view()
+        task_obs.flags.writeable = False
+        return task_obs
+
+    def _get_indices(self, indices: Optional[Sequence[int]]) -> Union[slice, List[int]]:
+        return slice(None) if indices is None else list(indices)
+
+    def seed(self, seed: Optional[int] = None) -> List[int]:
+        """Set the seed of the random number generator of the rewards."""
+        self.np_random_env, seed = seeding.np_random(seed)
+        return [seed]
+
+    def seed_task(self, seed: Optional[int] = None) -> List[int]:
+        """Set the seed of the random number generator of the tasks."""
+        self.np_random_task, seed = seeding.np_random(seed)
+        return [seed]
+
+    def sample_task_state(self, indices: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Sample the arm probabilities of (a subset of) the environments.
+
+        Returns:
+            np.ndarray: array of shape (len(indices), n_arms).
+        """
+        assert self.np_random_task is not None, "please call `seed_task()` first"
+        num_envs = self.num_envs if indices is None else len(indices)
+        task_states: np.ndarray = self.np_random_task.random_sample(
+            (num_envs, self.n_arms)
+        )
+        return task_states
+
+    def set_task_state(
+        self, task_states: np.ndarray, indices: Optional[Sequence[int]] = None
+    ) -> None:
+        """Set the arm probabilities of (a subset of) the environments."""
+        self.arm_probabilities[self._get_indices(indices)] = task_states
+
+    def reset(self, indices: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Reset (a subset of) the environments.
+
+        Returns:
+            np.ndarray: observations (of the reset environments), of shape
+            (len(indices), 1).
+        """
+        _indices = self._get_indices(indices)
+        self.step_count[_indices] = 0
+        env_obs: np.ndarray = self._env_obs[_indices]
+        return env_obs
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Pull one arm per environment.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: observations (of
+            shape (num_envs, 1)), rewards and dones.
+        """
+        assert self.np_random_env is not None, "please call `seed()` first"
+        probabilities = self.arm_probabilities[self._arange, actions]
+        rewards = (
+            self.np_random_env.random_sample(self.num_envs) < probabilities
+        ).astype(np.float64)
+        self.step_count += 1
+        if self.episode_length is None:
+            dones = np.zeros(self.num_envs, dtype=bool)
+        else:
+            dones = self.step_count >= self.episode_length
+        return self._env_obs, rewards, dones
+
+
+class MTBanditEnv(MTEnv):
+    def __init__(self, n_arms: int, episode_length: Optional[int] = None) -> None:
+        """Multitask Bernoulli bandit: the task state is the probability
+        of a reward of 1 for each arm (sampled uniformly in [0, 1]).
+
+        The task observation is a read-only copy of the arm probabilities,
+        shared by the observations of a task (`set_task_state` makes a new
+        copy, so the previous observations are left unchanged). Use
+        `BatchedBandit` directly to step many bandit tasks at once.
+
+        Args:
+            n_arms (int): number of arms.
+            episode_length (Optional[int], optional): number of steps of an
+                episode. Defaults to None (the episodes never end).
+        """
+        self.bandit = BatchedBandit(
+            num_envs=1, n_arms=n_arms, episode_length=episode_length
+        )
+        self.n_arms = n_arms
+        super().__init__(
+            action_space=spaces.Discrete(n_arms),
+            env_observation_space=spaces.Box(
+                low=0.0, high=1.0, shape=(1,), dtype=np.float32
+            ),
+            task_observation_space=spaces.Box(
+                low=0.0, high=1.0, shape=(n_arms,), dtype=np.float64
+            ),
+        )
+        self._task_obs = self._copy_task_obs()
+        self._should_reset_env = True
+
+    def _copy_task_obs(self) -> np.ndarray:
+        task_obs: np.ndarray = self.bandit.arm_probabilities[0].copy()
+        task_obs.flags.writeable = False
+        return task_obs
+
+    def seed(self, seed: Optional[int] = None) -> List[int]:
+        self.np_random_env, seed = seeding.np_random(seed)
+        return self.bandit.seed(seed)
+
+    def seed_task(self, seed: Optional[int] = None) -> List[int]:
+        self.np_random_task, seed = seeding.np_random(seed)
+        return self.bandit.seed_task(seed)
+
+    def get_task_obs(self) -> TaskObsType:
+        return self._task_obs
+
+    def get_task_state(self) -> TaskStateType:
+        task_state: np.ndarray = self.bandit.arm_probabilities[0].copy()
+        return task_state
+
+    def set_task_state(self, task_state: TaskStateType) -> None:
+        self.bandit.set_task_state(np.asarray(task_state)[None], indices=[0])
+        self._task_obs = self._copy_task_obs()
+
+    def sample_task_state(self) -> TaskStateType:
+        self.assert_task_seed_is_set()
+        task_state: np.ndarray = self.bandit.sample_task_state(indices=[0])[0]
+        return task_state
+
+    def reset(self) -> ObsType:
+        self.assert_env_seed_is_set()
+        self._should_reset_env = False
+        return {"env_obs": self.bandit.reset()[0], "task_obs": self._task_obs}
+
+    def step(self, action: ActionType) -> StepReturnType:
+        if self._should_reset_env:
+            raise RuntimeError("Call `env.reset()` before calling `env.step()`")
+        env_obs, rewards, dones = self.bandit.step(np.array([action]))
+        return (
+            {"env_obs": env_obs[0], "task_obs": self._task_obs},
+            float(rewards[0]),
+            bool(dones[0]),
+            {},
+        )
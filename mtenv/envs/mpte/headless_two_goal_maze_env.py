@@ -0,0 +1,416 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the  LICENSE file in the root directory of this source tree.
+"""NumPy implementation of `TwoGoalMazeEnv` (with `xy` observations) which
+does not depend on `gym_miniworld` or OpenGL."""
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from gym import spaces
+from gym.spaces.box import Box as BoxSpace
+from gym.spaces.dict import Dict as DictSpace
+from numpy.random import RandomState
+
+from mtenv import MTEnv
+from mtenv.utils import seeding
+from mtenv.utils.types import DoneType, InfoType, RewardType
+
+TaskStateType = List[int]
+
+ActionType = int
+
+EnvObsType = Dict[str, np.ndarray]
+ObsType = Dict[str, Union[EnvObsType, List[float]]]
+StepReturnType = Tuple[ObsType, RewardType, DoneType, InfoType]
+
+# Geometry and dynamics of `TwoGoalMazeEnv` (see `gym_miniworld.entity.Agent`,
+# `gym_miniworld.entity.Box` and `gym_miniworld.miniworld.MiniWorldEnv`).
+AGENT_RADIUS = 0.4
+BOX_RADIUS = math.sqrt(0.8 * 0.8 + 0.8 * 0.8) / 2
+FORWARD_STEP = 0.51
+TURN_ANGLE = 45 * (math.pi / 180)
+GOAL_DISTANCE = 2.0
+
+TURN_LEFT = 0
+TURN_RIGHT = 1
+MOVE_FORWARD = 2
+
+
+def get_wall_segments(size_x: float, size_y: float) -> np.ndarray:
+    """Return the walls of the (plus shaped) maze.
+
+    The maze is made of a central room ([-size_x, size_x] x [-size_y,
+    size_y]) and of four corridors (of width 1), one along each side of the
+    central room. The walls are listed in the same order as in
+    `TwoGoalMazeEnv`.
+
+    Args:
+        size_x (float): half width of the central room.
+        size_y (float): half depth of the central room.
+
+    Returns:
+        np.ndarray: array of shape (12, 2, 2) with the (x, z) coordinates
+        of the two end points of each wall segment.
+    """
+    sx, sy = size_x, size_y
+    return np.array(
+        [
+            [[sx, sy], [sx, sy + 1]],
+            [[-sx, sy + 1], [-sx, sy]],
+            [[sx, sy + 1], [-sx, sy + 1]],
+            [[sx, -sy - 1], [sx, -sy]],
+            [[-sx, -sy - 1], [sx, -sy - 1]],
+            [[-sx, -sy], [-sx, -sy - 1]],
+            [[-sx - 1, -sy], [-sx, -sy]],
+            [[-sx - 1, sy], [-sx - 1, -sy]],
+            [[-sx, sy], [-sx - 1, sy]],
+            [[sx + 1, -sy], [sx + 1, sy]],
+            [[sx, -sy], [sx + 1, -sy]],
+            [[sx + 1, sy], [sx, sy]],
+        ],
+        dtype=np.float64,
+    )
+
+
+def intersect_circles_segments(
+    points: np.ndarray, radius: float, segments: np.ndarray
+) -> np.ndarray:
+    """Check if circles intersect with any of the segments.
+
+    Args:
+        points (np.ndarray): centers of the circles, of shape (n, 2).
+        radius (float): radius of the circles.
+        segments (np.ndarray): segments, of shape (m, 2, 2).
+
+    Returns:
+        np.ndarray: boolean array of shape (n,).
+    """
+    a = segments[None, :, 0, :]
+    ab = segments[None, :, 1, :] - a
+    ap = points[:, None, :] - a
+    proj = np.clip(np.sum(ap * ab, axis=2) / np.sum(ab * ab, axis=2), 0.0, 1.0)
+    closest = a + proj[:, :, None] * ab
+    distance = np.sqrt(np.sum((closest - points[:, None, :]) ** 2, axis=2))
+    return np.any(distance < radius, axis=1)  # type: ignore[no-any-return]
+
+
+class BatchedTwoGoalMaze:
+    def __init__(
+        self,
+        num_envs: int,
+        size_x: float = 5,
+        size_y: float = 5,
+        empty_mu: bool = False,
+        sample_task_on_reset: bool = True,
+    ):
+        """Batch of `num_envs` two goal mazes, with `xy` observations.
+
+        This is a NumPy implementation of the room layout, the movements,
+        the collisions (against the walls and the boxes) and the rewards
+        of `TwoGoalMazeEnv`. Steps are vectorized over the environments.
+        The random numbers are drawn in the same order as in
+        `TwoGoalMazeEnv` so, for the same seeds, both implementations
+        produce the same trajectories.
+
+        The task state of an environment is the index of the goal box
+        (0 for the blue box and 1 for the red box). Episodes end when the
+        agent reaches one of the boxes.
+
+        Args:
+            num_envs (int): number of environments.
+            size_x (float, optional): half width of the central room.
+                Defaults to 5.
+            size_y (float, optional): half depth of the central room.
+                Defaults to 5.
+            empty_mu (bool, optional): hide the task in the observations.
+                Defaults to False.
+            sample_task_on_reset (bool, optional): sample a new task at
+                every reset (as `TwoGoalMazeEnv` does). Defaults to True.
+        """
+        self.num_envs = num_envs
+        self.size_x, self.size_y = size_x, size_y
+        self.empty_mu = empty_mu
+        self.sample_task_on_reset = sample_task_on_reset
+        self.wall_segments = get_wall_segments(size_x=size_x, size_y=size_y)
+
+        self.np_random_env: List[Optional[RandomState]] = [None] * num_envs
+        # `TwoGoalMazeEnv` places the entities with the random number
+        # generator of `gym_miniworld` (which is seeded with the same seed
+        # as `np_random_env`).
+        self.np_random_placement: List[Optional[RandomState]] = [None] * num_envs
+        self.np_random_task: List[Optional[RandomState]] = [None] * num_envs
+
+        self.task_state = np.zeros(num_envs, dtype=np.int64)
+        self.agent_pos = np.zeros((num_envs, 2))
+        self.agent_dir = np.zeros(num_envs)
+        # boxes[:, 0] is the blue box and boxes[:, 1] is the red box.
+        self.boxes = np.zeros((num_envs, 2, 2))
+        self.total_reward = np.zeros(num_envs)
+        self.step_count = np.zeros(num_envs, dtype=np.int64)
+
+    def _get_indices(self, indices: Optional[Sequence[int]]) -> List[int]:
+        if indices is None:
+            return list(range(self.num_envs))
+        return list(indices)
+
+    def seed(self, seeds: Sequence[Optional[int]]) -> List[int]:
+        """Set the seeds of the environments' random number generators (one
+        seed per environment)."""
+        assert len(seeds) == self.num_envs
+        used_seeds = []
+        for index, seed in enumerate(seeds):
+            self.np_random_env[index], used_seed = seeding.np_random(seed)
+            self.np_random_placement[index], _ = seeding.np_random(used_seed)
+            used_seeds.append(used_seed)
+        return used_seeds
+
+    def seed_task(self, seeds: Sequence[Optional[int]]) -> List[int]:
+        """Set the seeds of the tasks' random number generators (one seed
+        per environment)."""
+        assert len(seeds) == self.num_envs
+        used_seeds = []
+        for index, seed in enumerate(seeds):
+            self.np_random_task[index], used_seed = seeding.np_random(seed)
+            used_seeds.append(used_seed)
+        return used_seeds
+
+    def sample_task_state(self, indices: Optional[Sequence[int]] = None) -> np.ndarray:
+        task_states = []
+        for index in self._get_indices(indices):
+            rng = self.np_random_task[index]
+            assert rng is not None, "please call `seed_task()` first"
+            task_states.append(rng.randint(2))
+        return np.array(task_states, dtype=np.int64)
+
+    def set_task_state(
+        self,
+        task_states: Union[Sequence[int], np.ndarray],
+        indices: Optional[Sequence[int]] = None,
+    ) -> None:
+        self.task_state[self._get_indices(indices)] = task_states
+
+    def _place(
+        self, index: int, radius: float, others: List[Tuple[float, float, float]]
+    ) -> Tuple[float, float]:
+        """Sample a position, in the central room, which does not intersect
+        with the `others` entities (given as (x, z, radius)).
+
+        The sampled positions are at least `radius` away from the sides of
+        the central room so they can not intersect with the walls.
+        """
+        rng = self.np_random_placement[index]
+        assert rng is not None, "please call `seed()` first"
+        sx, sy = self.size_x, self.size_y
+        low = [-sx + radius, 0, -sy + radius]
+        high = [sx - radius, 0, sy - radius]
+        while True:
+            x, _, z = rng.uniform(low=low, high=high)
+            if not (-sx < x < sx and -sy < z < sy):
+                continue
+            if any(
+                math.sqrt((other_x - x) ** 2 + (other_z - z) ** 2)
+                < radius + other_radius
+                for other_x, other_z, other_radius in others
+            ):
+                continue
+            return x, z
+
+    def _place_entities(self, index: int) -> None:
+        placement_rng = self.np_random_placement[index]
+        env_rng = self.np_random_env[index]
+        assert placement_rng is not None and env_rng is not None
+        others: List[Tuple[float, float, float]] = []
+        for box_index in range(2):
+            x, z = self._place(index, BOX_RADIUS, others)
+            self.boxes[index, box_index] = x, z
+            # Direction of the box (which does not matter here).
+            placement_rng.uniform(-math.pi, math.pi)
+            others.append((x, z, BOX_RADIUS))
+        self.agent_dir[index] = env_rng.randint(8) * (math.pi / 4) - math.pi
+        while True:
+            x, z = self._place(index, AGENT_RADIUS, others)
+            if all(
+                math.sqrt((box_x - x) ** 2 + (box_z - z) ** 2) >= GOAL_DISTANCE
+                for box_x, box_z, _ in others
+            ):
+                break
+        self.agent_pos[index] = x, z
+
+    def _get_box_distances(self, indices: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Return the distances between the agents and the (goal, other)
+        boxes, as an array of shape (len(indices), 2)."""
+        _indices = slice(None) if indices is None else list(indices)
+        task_state = self.task_state[_indices]
+        boxes = self.boxes[_indices]
+        arange = np.arange(len(task_state))
+        goal = boxes[arange, task_state]
+        other = boxes[arange, 1 - task_state]
+        agent_pos = self.agent_pos[_indices]
+        return np.stack(  # type: ignore[no-any-return]
+            [
+                np.sqrt(np.sum((goal - agent_pos) ** 2, axis=1)),
+                np.sqrt(np.sum((other - agent_pos) ** 2, axis=1)),
+            ],
+            axis=1,
+        )
+
+    def _get_obs(self, indices: Optional[Sequence[int]] = None) -> np.ndarray:
+        _indices = slice(None) if indices is None else list(indices)
+        agent_pos = self.agent_pos[_indices]
+        agent_dir = self.agent_dir[_indices]
+        angle = np.arctan2(np.cos(agent_dir), -np.sin(agent_dir))
+        obs = np.empty((len(agent_dir), 4), dtype=np.float32)
+        obs[:, 0] = (agent_pos[:, 0] / self.size_x) * 2.1 - 1.0
+        obs[:, 1] = (agent_pos[:, 1] / self.size_y) * 2.1 - 1.0
+        obs[:, 2] = angle
+        if self.empty_mu:
+            obs[:, 3] = 0.0
+        else:
+            # The agent observes the task when it faces the bottom wall.
+            facing = (angle < -1.5) & (angle > -1.7)
+            task_state = self.task_state[_indices]
+            obs[:, 3] = np.where(facing, np.where(task_state == 0, -1.0, 1.0), 0.0)
+        return obs
+
+    def reset(self, indices: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Reset the environments listed in `indices` (all the
+        environments by default).
+
+        Returns:
+            np.ndarray: observations (of the reset environments), of shape
+            (len(indices), 4).
+        """
+        _indices = self._get_indices(indices)
+        if self.sample_task_on_reset:
+            self.set_task_state(self.sample_task_state(_indices), _indices)
+        for index in _indices:
+            self._place_entities(index)
+        self.total_reward[_indices] = 0.0
+        self.step_count[_indices] = 0
+        obs = self._get_obs(_indices)
+        # The task is never observed at the start of an episode.
+        obs[:, 3] = 0.0
+        return obs
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Execute one action per environment.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: observations (of
+            shape (num_envs, 4)), rewards and dones.
+        """
+        actions = np.asarray(actions)
+        self.step_count += 1
+        self.agent_dir[actions == TURN_LEFT] += TURN_ANGLE
+        self.agent_dir[actions == TURN_RIGHT] -= TURN_ANGLE
+
+        moving = np.flatnonzero(actions == MOVE_FORWARD)
+        if len(moving) > 0:
+            agent_dir = self.agent_dir[moving]
+            next_pos = self.agent_pos[moving] + FORWARD_STEP * np.stack(
+                [np.cos(agent_dir), -np.sin(agent_dir)], axis=1
+            )
+            blocked = intersect_circles_segments(
+                next_pos, AGENT_RADIUS, self.wall_segments
+            )
+            box_distances = np.sqrt(
+                np.sum((self.boxes[moving] - next_pos[:, None, :]) ** 2, axis=2)
+            )
+            blocked |= np.any(box_distances < AGENT_RADIUS + BOX_RADIUS, axis=1)
+            self.agent_pos[moving[~blocked]] = next_pos[~blocked]
+
+        distances = self._get_box_distances()
+        reached_goal = distances[:, 0] < GOAL_DISTANCE
+        reached_other = distances[:, 1] < GOAL_DISTANCE
+        rewards = np.where(reached_other, -1.0, np.where(reached_goal, 1.0, 0.0))
+        dones = reached_goal | reached_other
+        self.total_reward += rewards
+
+        return self._get_obs(), rewards, dones
+
+
+class HeadlessTwoGoalMazeEnv(MTEnv):
+    def __init__(self, size_x: float = 5, size_y: float = 5, empty_mu: bool = False):
+        """Two goal maze environment (with `xy` observations) which does not
+        depend on `gym_miniworld` or OpenGL.
+
+        This environment has the same observations, dynamics and rewards
+        as `TwoGoalMazeEnv` (with `obs_type="xy"`) and samples a new task
+        at every reset. Use `BatchedTwoGoalMaze` directly to step many
+        mazes at once.
+
+        Args:
+            size_x (float, optional): half width of the central room.
+                Defaults to 5.
+            size_y (float, optional): half depth of the central room.
+                Defaults to 5.
+            empty_mu (bool, optional): hide the task in the observations.
+                Defaults to False.
+        """
+        self.maze = BatchedTwoGoalMaze(
+            num_envs=1, size_x=size_x, size_y=size_y, empty_mu=empty_mu
+        )
+        self.empty_mu = empty_mu
+        env_observation_space = DictSpace(
+            {
+                "obs": BoxSpace(low=-np.inf, high=np.inf, shape=(4,), dtype=np.float32),
+                "total_reward": BoxSpace(
+                    low=-np.inf, high=np.inf, shape=(1,), dtype=np.float32
+                ),
+            }
+        )
+        super().__init__(
+            action_space=spaces.Discrete(MOVE_FORWARD + 1),
+            env_observation_space=env_observation_space,
+            task_observation_space=BoxSpace(
+                low=0.0, high=1.0, shape=(1,), dtype=np.float32
+            ),
+        )
+
+    def seed(self, seed: Optional[int] = None) -> List[int]:
+        """Set the seed for environment observations"""
+        self.np_random_env, seed = seeding.np_random(seed)
+        self.maze.seed([seed])
+        return [seed]
+
+    def seed_task(self, seed: Optional[int] = None) -> List[int]:
+        """Set the seed for task information"""
+        self.np_random_task, seed = seeding.np_random(seed)
+        self.maze.seed_task([seed])
+        return [seed]
+
+    def get_task_obs(self) -> List[float]:  # type: ignore[override]
+        if self.empty_mu:
+            return [0.0]
+        return [float(self.maze.task_state[0])]
+
+    def get_task_state(self) -> TaskStateType:  # type: ignore[override]
+        return [int(self.maze.task_state[0])]
+
+    def set_task_state(  # type: ignore[override]
+        self, task_state: TaskStateType
+    ) -> None:
+        self.maze.set_task_state([int(task_state[0])])
+
+    def sample_task_state(self) -> TaskStateType:  # type: ignore[override]
+        self.assert_task_seed_is_set()
+        return [int(self.maze.sample_task_state()[0])]
+
+    def _make_obs(self, env_obs: np.ndarray) -> ObsType:
+        return {
+            "env_obs": {
+                "obs": env_obs,
+                "total_reward": self.maze.total_reward.astype(np.float32),
+            },
+            "task_obs": self.get_task_obs(),
+        }
+
+    def reset(self) -> ObsType:  # type: ignore[override]
+        self.assert_env_seed_is_set()
+        self.assert_task_seed_is_set()
+        return self._make_obs(self.maze.reset()[0])
+
+    def step(self, action: ActionType) -> StepReturnType:  # type: ignore[override]
+        obs, rewards, dones = self.maze.step(np.array([action]))
+        return self._make_obs(obs[0]), float(rewards[0]), bool(dones[0]), {}
@@ -13,6 +13,7 @@ from gym.spaces.discrete import Discrete as DiscreteSpace
 from gym_miniworld.entity import Box
 from gym_miniworld.miniworld import Agent, MiniWorldEnv
 from numpy.random import RandomState
+from pyglet import gl
 
 from mtenv.utils import seeding
 from mtenv.utils.types import DoneType, InfoType, RewardType, TaskObsType
@@ -62,10 +63,33 @@ class MTMiniWorldEnv(EnvToMTEnv):
         return self.env.seed(seed=seed)
 
 
+# gym_miniworld compiles the static geometry of every environment into the
+# same display list (`1`), so environments rendered in turn keep compiling it
+# again. Instead, each layout gets its own display list. The OpenGL contexts
+# created by pyglet share their display lists, so the display lists of the
+# cached layouts (keyed by `(size_x, size_y, layout key)`) are shared by all
+# the environments of the process.
+_static_display_lists: Dict[Tuple[int, int, int], int] = {}
+
+# Shadow windows (OpenGL contexts) and frame buffers shared by the
+# environments of the process (see `share_render_context`), keyed by the
+# size of the observations.
+_shared_render_contexts: Dict[Tuple[int, int], Dict[str, Any]] = {}
+
+# Lookup table to normalize the pixel values from [0, 255] to [-1, 1] (ie
+# `(x / 255.0) * 2.0 - 1.0`), directly in float32.
+_NORMALIZED_PIXELS = ((np.arange(256) / 255.0) * 2.0 - 1.0).astype(np.float32)
+
+
 class TwoGoalMazeEnv(MiniWorldEnv):
 
     metadata = {"render.modes": ["human", "rgb_array"], "video.frames_per_second": 30}
 
+    # Rendering resources (created in `MiniWorldEnv.__init__`).
+    shadow_window: Any
+    obs_fb: Any
+    vis_fb: Any
+
     def __init__(
         self,
         size_x=5,
@@ -75,9 +99,45 @@ class TwoGoalMazeEnv(MiniWorldEnv):
         n_tasks=10,
         p_change=0.0,
         empty_mu=False,
+        cache_world=True,
+        reuse_obs=False,
+        normalize_pixels=True,
+        share_render_context=False,
     ):
         assert p_change == 0.0
         self.empty_mu = empty_mu
+        # When `reuse_obs` is set, `step` and `reset` return the same
+        # observation (dictionaries, preallocated float32 `xy` array and
+        # cached task observation) every time, updated in place. The
+        # observations should then be copied if they are stored.
+        self.reuse_obs = reuse_obs
+        # Pixel observations (when `obs_type` is not `xy`) are float32 arrays
+        # in [-1, 1] when `normalize_pixels` is set and uint8 arrays in
+        # [0, 255] (to normalize later, eg on the GPU) otherwise.
+        self.normalize_pixels = normalize_pixels
+        self._pixel_obs_buffer: Optional[np.ndarray] = None
+        self._task_obs: Any = []
+        self._xy_obs_buffer = np.zeros(4, dtype=np.float32)
+        self._total_reward_buffer = np.zeros(1, dtype=np.float32)
+        self._obs: Dict[str, Any] = {
+            "env_obs": {
+                "obs": self._xy_obs_buffer,
+                "total_reward": self._total_reward_buffer,
+            },
+            "task_obs": self._task_obs,
+        }
+        # When `cache_world` is set, the rooms and the wall segments are
+        # built once per layout (which only depends on `task_state[0]`) and
+        # `reset` only places the boxes and the agent again. The static
+        # display list is compiled lazily, when the world is rendered, so
+        # runs with `xy` observations never compile it.
+        self.cache_world = cache_world
+        self._layouts: Dict[int, Dict[str, Any]] = {}
+        self._layout: Optional[Dict[str, Any]] = None
+        # Display list of the static geometry when the layouts are not
+        # cached, and layout that it was compiled for.
+        self._display_list: Optional[int] = None
+        self._display_list_layout: Optional[Dict[str, Any]] = None
         self.obs_type = obs_type
         self.seed_task(seed=task_seed)
         self.np_random_env: Optional[RandomState] = None
@@ -85,6 +145,13 @@ class TwoGoalMazeEnv(MiniWorldEnv):
         self.task_state = []
 
         super().__init__()
+        # When `share_render_context` is set, all the environments of the
+        # process (with the same observation size) render their pixel
+        # observations with the same OpenGL context and frame buffers, which
+        # avoids switching contexts between environments.
+        if share_render_context:
+            self._use_shared_render_context()
+        pixel_obs_shape = (self.obs_fb.height, self.obs_fb.width, 3)
         # Allow only movement actions (left/right/forward)
         self.action_space = spaces.Discrete(self.actions.move_forward + 1)
         if self.obs_type == "xy":
@@ -92,13 +159,20 @@ class TwoGoalMazeEnv(MiniWorldEnv):
                 low=-np.inf, high=np.inf, shape=(4,), dtype=np.float32
             )
 
-        else:
+        elif self.normalize_pixels:
             _obs_space = BoxSpace(
                 low=-1.0,
                 high=1.0,
-                shape=(64, 64),
+                shape=pixel_obs_shape,
                 dtype=np.float32,
             )
+        else:
+            _obs_space = BoxSpace(
+                low=0,
+                high=255,
+                shape=pixel_obs_shape,
+                dtype=np.uint8,
+            )
         self.observation_space = DictSpace(
             {
                 "obs": _obs_space,
@@ -128,9 +202,20 @@ class TwoGoalMazeEnv(MiniWorldEnv):
 
     def set_task_state(self, task_state: TaskStateType) -> None:
         self.task_state = task_state
+        self._task_obs = [0.0] if self.empty_mu else copy.deepcopy(task_state)
+        self._obs["task_obs"] = self._task_obs
 
     def _gen_world(self):
         self.reset_task_state()
+        self._gen_layout()
+        self._place_entities()
+
+    def _get_layout_key(self) -> int:
+        """Return the part of the task state which changes the layout (the
+        texture of the goal room)."""
+        return int(self.task_state[0])
+
+    def _gen_layout(self):
         room1 = self.add_rect_room(
             min_x=-self.size_x,
             max_x=self.size_x,
@@ -187,6 +272,8 @@ class TwoGoalMazeEnv(MiniWorldEnv):
 
         self.connect_rooms(room1, room5, min_z=-self.size_y, max_z=self.size_y)
 
+    def _place_entities(self):
+        room1 = self.room1
         self.boxes = []
         self.boxes.append(Box(color="blue"))
         self.boxes.append(Box(color="red"))
@@ -205,6 +292,142 @@ class TwoGoalMazeEnv(MiniWorldEnv):
                 room=room1,
             )
 
+    def _gen_world_from_cache(self) -> None:
+        """Generate the world for a new episode, reusing the cached layout
+        of the task when possible."""
+        self.reset_task_state()
+        layout_key = self._get_layout_key()
+        layout = None
+        if self.cache_world and not self.domain_rand:
+            layout = self._layouts.get(layout_key)
+        if layout is not None:
+            self.rooms = layout["rooms"]
+            self.room1 = layout["room1"]
+            self.wall_segs = layout["wall_segs"]
+            self.room_probs = layout["room_probs"]
+            self._place_entities()
+        else:
+            self.rooms = []
+            self.wall_segs = []
+            self._gen_layout()
+            # Placing the entities generates the static data (wall segments).
+            self._place_entities()
+            layout = {
+                "rooms": self.rooms,
+                "room1": self.room1,
+                "wall_segs": self.wall_segs,
+                "room_probs": self.room_probs,
+            }
+            if self.cache_world and not self.domain_rand:
+                self._layouts[layout_key] = layout
+        self._layout = layout
+
+    def _use_shared_render_context(self) -> None:
+        """Render with the shadow window (OpenGL context) and the frame
+        buffers shared by the environments of the process, instead of the
+        ones created for this environment."""
+        key = (self.obs_fb.width, self.obs_fb.height)
+        context = _shared_render_contexts.get(key)
+        if context is None:
+            _shared_render_contexts[key] = {
+                "shadow_window": self.shadow_window,
+                "obs_fb": self.obs_fb,
+                "vis_fb": self.vis_fb,
+            }
+            return
+        self.shadow_window.close()
+        self.shadow_window = context["shadow_window"]
+        self.obs_fb = context["obs_fb"]
+        self.vis_fb = context["vis_fb"]
+
+    def _get_static_display_list(self) -> int:
+        """Return the display list of the static geometry of the current
+        layout, compiling it if needed."""
+        if self.cache_world and not self.domain_rand:
+            key = (self.size_x, self.size_y, self._get_layout_key())
+            display_list = _static_display_lists.get(key)
+            if display_list is None:
+                display_list = gl.glGenLists(1)
+                self._compile_static_display_list(display_list)
+                _static_display_lists[key] = display_list
+            return display_list
+        if self._display_list is None:
+            self._display_list = gl.glGenLists(1)
+        if self._display_list_layout is not self._layout:
+            self._compile_static_display_list(self._display_list)
+            self._display_list_layout = self._layout
+        return self._display_list
+
+    def _compile_static_display_list(self, display_list: int) -> None:
+        """Compile the static parts of the environment into `display_list`
+        (as `MiniWorldEnv._render_static` does for the display list `1`)."""
+        gl.glNewList(display_list, gl.GL_COMPILE)
+
+        gl.glLightfv(
+            gl.GL_LIGHT0, gl.GL_POSITION, (gl.GLfloat * 4)(*self.light_pos + [1])
+        )
+        gl.glLightfv(gl.GL_LIGHT0, gl.GL_AMBIENT, (gl.GLfloat * 4)(*self.light_ambient))
+        gl.glLightfv(gl.GL_LIGHT0, gl.GL_DIFFUSE, (gl.GLfloat * 4)(*self.light_color))
+
+        gl.glEnable(gl.GL_LIGHTING)
+        gl.glEnable(gl.GL_LIGHT0)
+
+        gl.glShadeModel(gl.GL_SMOOTH)
+        gl.glEnable(gl.GL_COLOR_MATERIAL)
+        gl.glColorMaterial(gl.GL_FRONT_AND_BACK, gl.GL_AMBIENT_AND_DIFFUSE)
+
+        gl.glEnable(gl.GL_TEXTURE_2D)
+        for room in self.rooms:
+            room._render()
+
+        for ent in self.entities:
+            if ent.is_static:
+                ent.render()
+
+        gl.glEndList()
+
+    def _render_static(self):
+        self._compile_static_display_list(self._get_static_display_list())
+
+    def _render_world(self, frame_buffer, render_agent):
+        gl.glCallList(self._get_static_display_list())
+
+        for ent in self.entities:
+            if not ent.is_static and ent is not self.agent:
+                ent.render()
+
+        if render_agent:
+            self.agent.render()
+
+        return frame_buffer.resolve()
+
+    def render_pixel_obs(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Render the observation of the agent (as pixels).
+
+        Args:
+            out (Optional[np.ndarray], optional): array to write the
+                observation into. Defaults to None (allocate a new array).
+
+        Returns:
+            np.ndarray: float32 array in [-1, 1] when `normalize_pixels` is
+            set, and uint8 array in [0, 255] otherwise.
+        """
+        img = self.render_obs()
+        if self.normalize_pixels:
+            return np.take(_NORMALIZED_PIXELS, img, out=out)
+        if out is None:
+            return img
+        np.copyto(out, img)
+        return out
+
+    def _make_pixel_obs(self) -> np.ndarray:
+        if not self.reuse_obs:
+            return self.render_pixel_obs()
+        if self._pixel_obs_buffer is None:
+            self._pixel_obs_buffer = self.render_pixel_obs()
+            return self._pixel_obs_buffer
+        return self.render_pixel_obs(out=self._pixel_obs_buffer)
+
     def _dist(self):
         bp = self.boxes[int(self.task_state[0])].pos
         pos = self.agent.pos
@@ -226,9 +449,7 @@ class TwoGoalMazeEnv(MiniWorldEnv):
         self.step_count = 0
         self.agent = Agent()
         self.entities: List[Any] = []
-        self.rooms: List[Any] = []
-        self.wall_segs: List[Any] = []
-        self._gen_world()
+        self._gen_world_from_cache()
         self.blocked = False
         rand = self.rand if self.domain_rand else None
         self.params.sample_many(
@@ -248,28 +469,39 @@ class TwoGoalMazeEnv(MiniWorldEnv):
         if len(self.wall_segs) == 0:
             self._gen_static_data()
 
-        # Pre-compile static parts of the environment into a display list
-        self._render_static()
-        _pos = [
-            (self.agent.pos[0] / self.size_x) * 2.1 - 1.0,
-            (self.agent.pos[2] / self.size_y) * 2.1 - 1.0,
-        ]
-        _dir = [self.agent.dir_vec[0], self.agent.dir_vec[2]]
-
+        # The static parts of the environment are compiled into a display
+        # list the first time the world is rendered (see `_render_world`).
         if self.obs_type == "xy":
-            _mu = [0.0]
-            at = math.atan2(_dir[0], _dir[1])
-            o = copy.deepcopy(_pos + [at] + _mu)
+            o = self._make_xy_obs(at=self._get_angle(), mu=0.0)
         else:
-            o = (self.render_obs() / 255.0) * 2.0 - 1.0
+            o = self._make_pixel_obs()
 
+        if self.reuse_obs:
+            return self._update_obs(env_obs=o, total_reward=0.0)
         return self.make_obs(env_obs=o, total_reward=[0.0])
 
+    def _get_angle(self) -> float:
+        """Return the orientation of the agent, ie
+        `atan2(dir_vec[0], dir_vec[2])` (without building `dir_vec`)."""
+        return math.atan2(math.cos(self.agent.dir), -math.sin(self.agent.dir))
+
+    def _make_xy_obs(self, at: float, mu: float) -> Union[List[float], np.ndarray]:
+        pos = self.agent.pos
+        x = (pos[0] / self.size_x) * 2.1 - 1.0
+        z = (pos[2] / self.size_y) * 2.1 - 1.0
+        if not self.reuse_obs:
+            return [x, z, at, mu]
+        buffer = self._xy_obs_buffer
+        buffer[0] = x
+        buffer[1] = z
+        buffer[2] = at
+        buffer[3] = mu
+        return buffer
+
     def get_task_obs(self) -> TaskObsType:
-        mmu = copy.deepcopy(self.task_state)
-        if self.empty_mu:
-            mmu = [0.0]
-        return mmu
+        if self.reuse_obs:
+            return self._task_obs
+        return copy.copy(self._task_obs)
 
     def get_task_state(self) -> TaskStateType:
         return self.task_state
@@ -285,6 +517,12 @@ class TwoGoalMazeEnv(MiniWorldEnv):
             "task_obs": self.get_task_obs(),
         }
 
+    def _update_obs(self, env_obs: Any, total_reward: float) -> ObsType:
+        """Update the reused observation (when `reuse_obs` is set)."""
+        self._total_reward_buffer[0] = total_reward
+        self._obs["env_obs"]["obs"] = env_obs
+        return self._obs
+
     def seed(self, seed: Optional[int] = None) -> List[int]:
         """Set the seed for environment observations"""
         self.np_random_env, seed = seeding.np_random(seed)
@@ -310,34 +548,75 @@ class TwoGoalMazeEnv(MiniWorldEnv):
         if distance < 2:
             reward = -1.0
             done = True
-        _pos = [
-            (self.agent.pos[0] / self.size_x) * 2.1 - 1.0,
-            (self.agent.pos[2] / self.size_y) * 2.1 - 1.0,
-        ]
-        _dir = [self.agent.dir_vec[0], self.agent.dir_vec[2]]
-
         if self.obs_type == "xy":
-            at = math.atan2(_dir[0], _dir[1])
-            _mu = [0.0]
+            at = self._get_angle()
+            mu = 0.0
             if (at < -1.5 and at > -1.7) and not self.empty_mu:
-                _mu = [1.0]
+                mu = 1.0
                 if self.task_state[0] == 0:
-                    _mu = [-1.0]
+                    mu = -1.0
 
-            o = copy.deepcopy(_pos + [at] + _mu)
+            o = self._make_xy_obs(at=at, mu=mu)
         else:
-            o = (self.render_obs() / 255.0) * 2.0 - 1.0
+            o = self._make_pixel_obs()
 
         self.treward += reward
 
+        if self.reuse_obs:
+            return (
+                self._update_obs(env_obs=o, total_reward=self.treward),
+                reward,
+                done,
+                {},
+            )
         return self.make_obs(env_obs=o, total_reward=[self.treward]), reward, done, {}
 
 
-def build_two_goal_maze_env(size_x: int, size_y: int, task_seed: int, n_tasks: int):
+def build_two_goal_maze_env(
+    size_x: int,
+    size_y: int,
+    task_seed: int,
+    n_tasks: int,
+    reuse_obs: bool = False,
+    obs_type: str = "xy",
+    normalize_pixels: bool = True,
+    share_render_context: bool = False,
+):
     env = MTMiniWorldEnv(
         TwoGoalMazeEnv(
-            size_x=size_x, size_y=size_y, task_seed=task_seed, n_tasks=n_tasks
+            size_x=size_x,
+            size_y=size_y,
+            obs_type=obs_type,
+            task_seed=task_seed,
+            n_tasks=n_tasks,
+            reuse_obs=reuse_obs,
+            normalize_pixels=normalize_pixels,
+            share_render_context=share_render_context,
         ),
         task_observation_space=DiscreteSpace(n=1),
     )
     return env
+
+
+def render_pixel_obs_batch(
+    envs: List[TwoGoalMazeEnv], out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Render the pixel observations of several environments (eg created
+    with `share_render_context=True`) into one array.
+
+    Args:
+        envs (List[TwoGoalMazeEnv]): environments (with the same
+            observation size and `normalize_pixels`).
+        out (Optional[np.ndarray], optional): array (of shape
+            `(len(envs), height, width, 3)`) to write the observations into.
+            Defaults to None (allocate a new array).
+
+    Returns:
+        np.ndarray:
+    """
+    if out is None:
+        obs_space = envs[0].observation_space["obs"]
+        out = np.empty((len(envs),) + obs_space.shape, dtype=obs_space.dtype)
+    for index, env in enumerate(envs):
+        env.render_pixel_obs(out=out[index])
+    return out
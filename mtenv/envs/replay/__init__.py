@@ -0,0 +1,2 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+from mtenv.envs.replay.replay_mtenv import ReplayMTEnv  # noqa: F401
@@ -0,0 +1,254 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Multitask environment which replays recorded trajectories."""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from gym.spaces.space import Space
+
+from mtenv import MTEnv
+from mtenv.utils.trajectory_storage import (
+    ColumnsType,
+    TrajectoryReader,
+    task_state_key,
+    unflatten_transition,
+)
+from mtenv.utils.types import ActionType, ObsType, StepReturnType, TaskStateType
+
+_OBS_KEYS = ("env_obs", "task_obs")
+_NEXT_OBS_PREFIX = "next_obs."
+
+
+class _TaskIndex:
+    def __init__(self, chunks: List[ColumnsType]) -> None:
+        """Chunks of the transitions of one task and position of its
+        episodes.
+
+        An episode starts with the first transition of the task, after a
+        transition which is `done` and at a transition which is `first`
+        (if recorded).
+
+        Args:
+            chunks (List[ColumnsType]): columns of each chunk.
+
+        Raises:
+            ValueError: if there is no chunk.
+        """
+        if not chunks:
+            raise ValueError("the task has no recorded transition.")
+        self.chunks = chunks
+        self.obs_columns = [
+            name for name in chunks[0] if name.split(".")[0] in _OBS_KEYS
+        ]
+        # Columns of the observations returned by `step` (not recorded by
+        # older versions of `RecordTrajectories`).
+        self.next_obs_columns = [
+            name for name in chunks[0] if name.startswith(_NEXT_OBS_PREFIX)
+        ]
+        # Positions of the episodes, as `(chunk index, row)` of their first
+        # transition and number of transitions.
+        self.episodes: List[Tuple[int, int, int]] = []
+        starts: List[Tuple[int, int, int]] = []
+        offset = 0
+        is_done = True
+        for chunk_index, chunk in enumerate(chunks):
+            done = np.asarray(chunk["done"], dtype=bool)
+            is_start = np.empty(len(done), dtype=bool)
+            is_start[0] = is_done
+            is_start[1:] = done[:-1]
+            if "first" in chunk:
+                is_start |= np.asarray(chunk["first"], dtype=bool)
+            for row in np.flatnonzero(is_start):
+                starts.append((chunk_index, int(row), offset + int(row)))
+            offset += len(done)
+            is_done = bool(done[-1])
+        ends = [position for _, _, position in starts[1:]] + [offset]
+        for (chunk_index, row, position), end in zip(starts, ends):
+            self.episodes.append((chunk_index, row, end - position))
+        self.next_episode = 0
+
+
+class ReplayMTEnv(MTEnv):
+    def __init__(
+        self,
+        root_dir: str,
+        mmap: bool = True,
+        shuffle_episodes: bool = False,
+        check_actions: bool = False,
+        action_space: Optional[Space] = None,
+        observation_space: Optional[Space] = None,
+    ):
+        """Multitask environment which replays the trajectories recorded by
+        `mtenv.wrappers.RecordTrajectories`.
+
+        `set_task_state` switches to the episodes recorded for that task
+        (the recorded `task_state` are the only valid ones) and `reset`
+        starts the next one. `step` returns the next recorded observation,
+        reward and `done` (the last step of an episode returns the
+        recorded terminal observation), while the recorded action is
+        returned as `info["recorded_action"]`. The observations are read
+        from the memory-mapped files, without copying them. For the
+        trajectories recorded without the observations returned by
+        `step`, the last step of an episode returns the last recorded
+        observation. An episode whose end was not recorded is truncated
+        (with `info["TimeLimit.truncated"]` set to True).
+
+        Args:
+            root_dir (str): directory containing the trajectories.
+            mmap (bool, optional): should the recorded columns be
+                memory-mapped (instead of loaded in memory)? Defaults to
+                True.
+            shuffle_episodes (bool, optional): should `reset` sample the
+                episodes of the task (with the environment seed) instead of
+                replaying them in the recorded order? Defaults to False.
+            check_actions (bool, optional): should `step` check that the
+                action is the recorded one (eg to regression-test a
+                deterministic policy)? Defaults to False.
+            action_space (Optional[Space], optional): Defaults to None (use
+                the recorded action space).
+            observation_space (Optional[Space], optional): multitask
+                observation space. Defaults to None (use the recorded
+                observation space).
+
+        Raises:
+            ValueError: if the spaces are neither recorded nor provided.
+        """
+        self.reader = TrajectoryReader(root_dir=root_dir)
+        metadata = self.reader.metadata
+        action_space = action_space or metadata.get("action_space")
+        observation_space = observation_space or metadata.get("observation_space")
+        if action_space is None or observation_space is None:
+            raise ValueError(
+                f"the spaces are not recorded in {root_dir}. Please provide "
+                "`action_space` and `observation_space`."
+            )
+        super().__init__(
+            action_space=action_space,
+            env_observation_space=observation_space["env_obs"],
+            task_observation_space=observation_space["task_obs"],
+        )
+        self.mmap = mmap
+        self.shuffle_episodes = shuffle_episodes
+        self.check_actions = check_actions
+        self.task_states = self.reader.task_states
+        # Ids of the tasks, keyed by `task_state_key`.
+        self._task_ids = {
+            task_state_key(task_state): task_id
+            for task_id, task_state in enumerate(self.task_states)
+        }
+        # A task can be recorded without any transition (eg when it is set
+        # but never stepped): it can not be replayed.
+        self._replayable_task_ids = [
+            task_id
+            for task_id in range(len(self.task_states))
+            if self.reader.get_num_chunks(task_id) > 0
+        ]
+        self._task_indices: Dict[int, _TaskIndex] = {}
+        self._task_id: Optional[int] = None
+        # Position of the current transition.
+        self._chunk_index = 0
+        self._row = 0
+        self._num_remaining_steps = 0
+
+    def _get_task_index(self) -> _TaskIndex:
+        assert self._task_id is not None, "please call `set_task_state()` first"
+        task_index = self._task_indices.get(self._task_id)
+        if task_index is None:
+            task_index = _TaskIndex(
+                chunks=list(self.reader.iter_chunks(self._task_id, mmap=self.mmap))
+            )
+            self._task_indices[self._task_id] = task_index
+        return task_index
+
+    def get_num_episodes(self) -> int:
+        """Return the number of episodes recorded for the current task."""
+        return len(self._get_task_index().episodes)
+
+    def get_task_state(self) -> TaskStateType:
+        assert self._task_id is not None, "please call `set_task_state()` first"
+        return self.task_states[self._task_id]
+
+    def set_task_state(self, task_state: TaskStateType) -> None:
+        task_id = self._task_ids.get(task_state_key(task_state))
+        if task_id is None:
+            raise ValueError(f"task_state={task_state} was not recorded.")
+        if self.reader.get_num_chunks(task_id) == 0:
+            raise ValueError(f"no transition was recorded for task_state={task_state}.")
+        self._task_id = task_id
+        self._num_remaining_steps = 0
+
+    def sample_task_state(self) -> TaskStateType:
+        self.assert_task_seed_is_set()
+        # The assert statement (at the start of the function) ensures that
+        # self.np_random_task is not None.
+        index = self.np_random_task.randint(  # type: ignore[union-attr]
+            len(self._replayable_task_ids)
+        )
+        return self.task_states[self._replayable_task_ids[index]]
+
+    def _get_obs(self, task_index: _TaskIndex) -> ObsType:
+        chunk = task_index.chunks[self._chunk_index]
+        obs = unflatten_transition(
+            {name: chunk[name][self._row] for name in task_index.obs_columns}
+        )
+        self._task_obs = obs["task_obs"]
+        return obs
+
+    def _get_next_obs(self, task_index: _TaskIndex) -> ObsType:
+        chunk = task_index.chunks[self._chunk_index]
+        next_obs = unflatten_transition(
+            {
+                name[len(_NEXT_OBS_PREFIX) :]: chunk[name][self._row]
+                for name in task_index.next_obs_columns
+            }
+        )
+        self._task_obs = next_obs["task_obs"]
+        return next_obs
+
+    def reset(self) -> ObsType:
+        self.assert_env_seed_is_set()
+        task_index = self._get_task_index()
+        if self.shuffle_episodes:
+            # The assert statement (at the start of the function) ensures that
+            # self.np_random_env is not None.
+            episode = self.np_random_env.randint(  # type: ignore[union-attr]
+                len(task_index.episodes)
+            )
+        else:
+            episode = task_index.next_episode
+            task_index.next_episode = (episode + 1) % len(task_index.episodes)
+        self._chunk_index, self._row, self._num_remaining_steps = task_index.episodes[
+            episode
+        ]
+        return self._get_obs(task_index)
+
+    def step(self, action: ActionType) -> StepReturnType:
+        assert self._num_remaining_steps > 0, "please call `reset()` first"
+        task_index = self._get_task_index()
+        chunk = task_index.chunks[self._chunk_index]
+        recorded_action = chunk["action"][self._row]
+        if self.check_actions and not np.array_equal(action, recorded_action):
+            raise ValueError(
+                f"action={action} is not the recorded action={recorded_action}."
+            )
+        reward = float(chunk["reward"][self._row])
+        done = bool(chunk["done"][self._row])
+        info: Dict[str, Any] = {"recorded_action": recorded_action}
+        next_obs = (
+            self._get_next_obs(task_index) if task_index.next_obs_columns else None
+        )
+        self._num_remaining_steps -= 1
+        if self._num_remaining_steps == 0:
+            if not done:
+                info["TimeLimit.truncated"] = True
+                done = True
+            if next_obs is None:
+                next_obs = self._get_obs(task_index)
+            return next_obs, reward, done, info
+        self._row += 1
+        if self._row == len(chunk["done"]):
+            self._chunk_index += 1
+            self._row = 0
+        if next_obs is None:
+            next_obs = self._get_obs(task_index)
+        return next_obs, reward, done, info
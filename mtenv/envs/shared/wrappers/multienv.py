@@ -1,6 +1,6 @@
 # Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
 """Wrapper to (lazily) construct a multitask environment from a list of
-    constructors (list of functions to construct the environments)."""
+constructors (list of functions to construct the environments)."""
 
 from typing import Callable, List, Optional
 
@@ -9,6 +9,7 @@ from gym.spaces.discrete import Discrete as DiscreteSpace
 
 from mtenv import MTEnv
 from mtenv.utils import seeding
+from mtenv.utils.task_sampler import TaskSampler, get_task_sampler
 from mtenv.utils.types import ActionType, EnvObsType, ObsType, StepReturnType
 
 EnvBuilderType = Callable[[], Env]
@@ -21,6 +22,7 @@ class MultiEnvWrapper(MTEnv):
         self,
         funcs_to_make_envs: List[EnvBuilderType],
         initial_task_state: TaskStateType,
+        task_sampler: Optional[TaskSampler] = None,
     ) -> None:
         """Wrapper to (lazily) construct a multitask environment from a
         list of constructors (list of functions to construct the
@@ -37,6 +39,9 @@ class MultiEnvWrapper(MTEnv):
                 functions to make the environments.
             initial_task_state (TaskStateType): intial task/environment
                 to select.
+            task_sampler (Optional[TaskSampler], optional): strategy to
+                sample the tasks (eg `PrioritizedTaskSampler`). Defaults to
+                None (sample the tasks uniformly).
         """
         self._num_tasks = len(funcs_to_make_envs)
         self._funcs_to_make_envs = funcs_to_make_envs
@@ -49,6 +54,9 @@ class MultiEnvWrapper(MTEnv):
             task_observation_space=DiscreteSpace(n=self._num_tasks),
         )
         self.task_obs: TaskObsType = initial_task_state
+        self.task_sampler = get_task_sampler(
+            task_sampler=task_sampler, num_tasks=self._num_tasks
+        )
 
     def _make_observation(self, env_obs: EnvObsType) -> ObsType:
         return {
@@ -81,7 +89,7 @@ class MultiEnvWrapper(MTEnv):
 
     def sample_task_state(self) -> TaskStateType:
         self.assert_task_seed_is_set()
-        task_state = self.np_random_task.randint(self._num_tasks)  # type: ignore[union-attr]
+        task_state = self.task_sampler.sample(self.np_random_task)  # type: ignore[arg-type]
         # The assert statement (at the start of the function) ensures that self.np_random_task
         # is not None. Mypy is raising the warning incorrectly.
         assert isinstance(task_state, int)
@@ -0,0 +1,202 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Exact planning (value iteration and policy evaluation) for batches of
+tabular MDP tasks (refer `mtenv.envs.tabular_mdp.tmdp`)."""
+
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Task state of a `TMDP` (reward matrix and transition matrix) or of a
+# `SparseTMDP` (reward matrix, successors and transition probabilities).
+TMDPTaskStateType = Tuple[np.ndarray, ...]
+
+
+def stack_task_states(
+    task_states: Iterable[TMDPTaskStateType],
+) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """Stack the task states of tasks of the same size.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]: rewards of
+        shape (K, S, A), transitions of shape (K, S, A, S) (or the
+        transition probabilities of shape (K, S, A, n_successors) for
+        sparse tasks) and the successors of shape (K, S, A, n_successors)
+        (None for dense tasks).
+    """
+    task_states = list(task_states)
+    if not task_states:
+        raise ValueError("at least one task state is needed.")
+    is_sparse = len(task_states[0]) == 3
+    if any((len(task_state) == 3) != is_sparse for task_state in task_states):
+        raise ValueError("dense and sparse task states can not be stacked.")
+    rewards = np.stack([task_state[0] for task_state in task_states])
+    if is_sparse:
+        successors = np.stack([task_state[1] for task_state in task_states])
+        transitions = np.stack([task_state[2] for task_state in task_states])
+        return rewards, transitions, successors
+    transitions = np.stack([task_state[1] for task_state in task_states])
+    return rewards, transitions, None
+
+
+def _expected_next_values(
+    transitions: np.ndarray, values: np.ndarray, successors: Optional[np.ndarray]
+) -> np.ndarray:
+    """Expected value of the next state, of shape (K, S, A)."""
+    if successors is None:
+        next_values: np.ndarray = np.einsum("ksat,kt->ksa", transitions, values)
+    else:
+        batch_indices = np.arange(len(values))[:, None, None, None]
+        next_values = np.einsum(
+            "ksan,ksan->ksa", transitions, values[batch_indices, successors]
+        )
+    return next_values
+
+
+def value_iteration(
+    rewards: np.ndarray,
+    transitions: np.ndarray,
+    discount: float = 0.99,
+    successors: Optional[np.ndarray] = None,
+    tol: float = 1e-8,
+    max_iterations: int = 10000,
+) -> np.ndarray:
+    """Compute the optimal Q-values of a batch of K tasks at once.
+
+    Args:
+        rewards (np.ndarray): expected rewards, of shape (K, S, A).
+        transitions (np.ndarray): transition matrices, of shape
+            (K, S, A, S), or the transition probabilities of shape
+            (K, S, A, n_successors) when `successors` is set.
+        discount (float, optional): Defaults to 0.99.
+        successors (Optional[np.ndarray], optional): successors of the
+            state-action pairs of sparse tasks, of shape
+            (K, S, A, n_successors). Defaults to None (dense tasks).
+        tol (float, optional): stop when the Q-values change by less than
+            `tol`. Defaults to 1e-8.
+        max_iterations (int, optional): Defaults to 10000.
+
+    Returns:
+        np.ndarray: optimal Q-values, of shape (K, S, A).
+    """
+    if not 0 <= discount < 1:
+        raise ValueError(f"discount={discount} should be in [0, 1).")
+    q_values = np.array(rewards, dtype=np.float64)
+    for _ in range(max_iterations):
+        new_q_values = rewards + discount * _expected_next_values(
+            transitions, q_values.max(axis=2), successors
+        )
+        delta = np.abs(new_q_values - q_values).max()
+        q_values = new_q_values
+        if delta < tol:
+            break
+    return q_values
+
+
+def policy_evaluation(
+    rewards: np.ndarray,
+    transitions: np.ndarray,
+    policy: np.ndarray,
+    discount: float = 0.99,
+    successors: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Compute the (exact) values of a batch of K tasks under a policy,
+    by solving the Bellman equations.
+
+    Args:
+        rewards (np.ndarray): expected rewards, of shape (K, S, A).
+        transitions (np.ndarray): refer `value_iteration`.
+        policy (np.ndarray): probabilities of the actions, of shape
+            (K, S, A) (or (S, A) to evaluate the same policy on all the
+            tasks).
+        discount (float, optional): Defaults to 0.99.
+        successors (Optional[np.ndarray], optional): refer
+            `value_iteration`.
+
+    Returns:
+        np.ndarray: values of the states, of shape (K, S).
+    """
+    if not 0 <= discount < 1:
+        raise ValueError(f"discount={discount} should be in [0, 1).")
+    num_tasks, num_states, _ = rewards.shape
+    policy = np.broadcast_to(policy, rewards.shape)
+    if successors is None:
+        state_transitions = np.einsum("ksa,ksat->kst", policy, transitions)
+    else:
+        state_transitions = np.zeros((num_tasks, num_states, num_states))
+        batch_indices = np.arange(num_tasks)[:, None, None, None]
+        state_indices = np.arange(num_states)[None, :, None, None]
+        np.add.at(
+            state_transitions,
+            (batch_indices, state_indices, successors),
+            policy[..., None] * transitions,
+        )
+    policy_rewards = np.einsum("ksa,ksa->ks", policy, rewards)
+    values: np.ndarray = np.linalg.solve(
+        np.eye(num_states) - discount * state_transitions, policy_rewards[..., None]
+    )[..., 0]
+    return values
+
+
+class OptimalQValueCache:
+    def __init__(
+        self, discount: float = 0.99, tol: float = 1e-8, max_iterations: int = 10000
+    ):
+        """Optimal Q-values of tabular MDP tasks, keyed by task id (eg the
+        id of a task of `NTasksId`, or the key of a task of
+        `ProceduralTasks`), to compute regrets during evaluation.
+
+        The Q-values of the tasks which are not cached yet are computed
+        together, with one call to `value_iteration`.
+
+        Args:
+            discount (float, optional): Defaults to 0.99.
+            tol (float, optional): refer `value_iteration`. Defaults to
+                1e-8.
+            max_iterations (int, optional): refer `value_iteration`.
+                Defaults to 10000.
+        """
+        self.discount = discount
+        self.tol = tol
+        self.max_iterations = max_iterations
+        self.q_values: Dict[Hashable, np.ndarray] = {}
+
+    def update(self, task_states: Dict[Hashable, TMDPTaskStateType]) -> None:
+        """Compute the Q-values of the tasks (keyed by id) which are not
+        cached yet."""
+        task_ids: List[Hashable] = [
+            task_id for task_id in task_states if task_id not in self.q_values
+        ]
+        if not task_ids:
+            return
+        rewards, transitions, successors = stack_task_states(
+            task_states[task_id] for task_id in task_ids
+        )
+        q_values = value_iteration(
+            rewards=rewards,
+            transitions=transitions,
+            discount=self.discount,
+            successors=successors,
+            tol=self.tol,
+            max_iterations=self.max_iterations,
+        )
+        self.q_values.update(zip(task_ids, q_values))
+
+    def __contains__(self, task_id: Hashable) -> bool:
+        return task_id in self.q_values
+
+    def __len__(self) -> int:
+        return len(self.q_values)
+
+    def __getitem__(self, task_id: Hashable) -> np.ndarray:
+        """Optimal Q-values of a task, of shape (S, A)."""
+        return self.q_values[task_id]
+
+    def values(self, task_id: Hashable) -> np.ndarray:
+        """Optimal values of the states of a task, of shape (S,)."""
+        values: np.ndarray = self.q_values[task_id].max(axis=1)
+        return values
+
+    def regret(self, task_id: Hashable, state: int, discounted_return: float) -> float:
+        """Difference between the optimal (expected) discounted return from
+        `state` and `discounted_return`."""
+        return float(self.values(task_id)[state] - discounted_return)
@@ -108,6 +108,166 @@ class UniformTMDP(TMDP):
         return new_task_state
 
 
+class SparseTMDP(MTEnv):
+    """Defines a Tabular MDP (refer `TMDP`) where each state-action pair
+    has at most `n_successors` successor states, so that the transitions
+    take O(n_states * n_actions * n_successors) memory.
+
+    task_state is (reward_matrix, successors, transition_probabilities):
+        reward_matrix is n_states*n_actions (as in `TMDP`)
+        successors is n_states*n_actions*n_successors and gives the indices of the successor states of (s,a)
+        transition_probabilities is n_states*n_actions*n_successors and gives the probability of moving to successors[s,a,i]
+    ie the transitions are a CSR matrix whose rows (the state-action pairs) all have n_successors entries.
+    The task observation is the reward matrix, the successors (divided by n_states - 1) and the
+    transition probabilities, flattened.
+    """
+
+    def __init__(self, n_states, n_actions, n_successors):
+        if not 0 < n_successors <= n_states:
+            raise ValueError(
+                f"n_successors={n_successors} should be in [1, n_states={n_states}]."
+            )
+        self.n_states = n_states
+        self.n_actions = n_actions
+        self.n_successors = n_successors
+
+        observation_space = spaces.Box(
+            low=0.0, high=1.0, shape=(n_states + 1,), dtype=np.float32
+        )
+        action_space = spaces.Discrete(n_actions)
+        task_space = spaces.Box(
+            low=0.0,
+            high=1.0,
+            shape=(n_states * n_actions * (1 + 2 * n_successors),),
+            dtype=np.float32,
+        )
+        super().__init__(
+            action_space=action_space,
+            env_observation_space=observation_space,
+            task_observation_space=task_space,
+        )
+        successors = np.zeros((n_states, n_actions, n_successors), dtype=np.int64)
+        probabilities = np.zeros((n_states, n_actions, n_successors))
+        probabilities[..., 0] = 1.0
+        self.set_task_state(
+            (np.zeros((n_states, n_actions)), successors, probabilities)
+        )
+
+    def _set_transitions(self, t_reward, successors, probabilities):
+        self.t_reward = np.asarray(t_reward)
+        self.successors = np.asarray(successors)
+        self.transition_probabilities = np.asarray(probabilities)
+        # Cumulative probabilities, to sample the successors by bisection.
+        self._cumulative_probabilities = np.cumsum(
+            self.transition_probabilities, axis=2
+        )
+        self._task_obs = np.concatenate(
+            [
+                self.t_reward.ravel(),
+                self.successors.ravel() / max(self.n_states - 1, 1),
+                self.transition_probabilities.ravel(),
+            ]
+        ).astype(np.float32)
+
+    def get_task_obs(self):
+        return self._task_obs
+
+    def get_task_state(self):
+        return self.task_state
+
+    def set_task_state(self, task_state):
+        self.task_state = task_state
+        self._set_transitions(*task_state)
+
+    def sample_task_state(self):
+        raise NotImplementedError
+
+    def seed(self, env_seed):
+        self.np_random_env, seed = seeding.np_random(env_seed)
+        return [seed]
+
+    def seed_task(self, task_seed):
+        self.np_random_task, seed = seeding.np_random(task_seed)
+        return [seed]
+
+    def step(self, action):
+        reward = 0.0
+        if self.np_random_env.rand() < self.t_reward[self.state, action]:
+            reward = 1.0
+        cumulative_probabilities = self._cumulative_probabilities[self.state, action]
+        index = np.searchsorted(
+            cumulative_probabilities,
+            self.np_random_env.rand() * cumulative_probabilities[-1],
+            side="right",
+        )
+        self.state = self.successors[
+            self.state, action, min(index, self.n_successors - 1)
+        ]
+
+        obs = np.zeros(self.n_states + 1)
+        obs[self.state] = 1.0
+        obs[-1] = reward
+        return (
+            {"env_obs": list(obs), "task_obs": self.get_task_obs()},
+            reward,
+            False,
+            {},
+        )
+
+    def reset(self):
+        self.state = self.np_random_env.randint(self.n_states)
+        obs = np.zeros(self.n_states + 1)
+        obs[self.state] = 1.0
+        return {"env_obs": list(obs), "task_obs": self.get_task_obs()}
+
+
+class SparseUniformTMDP(SparseTMDP):
+    """Sparse version of `UniformTMDP`: the transitions of (s,a) are the
+    `n_successors` most likely ones of `UniformTMDP` (with the same random
+    draws), renormalized.
+
+    With `generate_from_seed`, the task state is a seed from which the
+    transitions are generated (deterministically) by `set_task_state`, so
+    that a pool of tasks only stores their seeds.
+    """
+
+    def __init__(self, n_states, n_actions, n_successors, generate_from_seed=False):
+        self.generate_from_seed = generate_from_seed
+        super().__init__(n_states, n_actions, n_successors)
+
+    def make_task_state(self, np_random):
+        """Sample the (sparse) reward matrix and transitions of a task with
+        the random number generator `np_random`."""
+        t_reward = np_random.rand(self.n_states, self.n_actions)
+        logits = np_random.randn(self.n_states, self.n_actions, self.n_states)
+        if self.n_successors < self.n_states:
+            successors = np.argpartition(-logits, self.n_successors - 1, axis=2)[
+                ..., : self.n_successors
+            ]
+            successors.sort(axis=2)
+        else:
+            successors = np.broadcast_to(np.arange(self.n_states), logits.shape)
+        logits = np.take_along_axis(logits, successors, axis=2)
+        t_transitions = scipy.special.softmax(logits, axis=2)
+        return t_reward, np.ascontiguousarray(successors), t_transitions
+
+    def sample_task_state(self):
+        self.assert_task_seed_is_set()
+        if self.generate_from_seed:
+            return int(self.np_random_task.randint(2**31 - 1))
+        return self.make_task_state(self.np_random_task)
+
+    def set_task_state(self, task_state):
+        # A seed is an integer, any other task_state (eg a tuple or a list
+        # of 3 arrays) holds explicit transitions.
+        if self.generate_from_seed and isinstance(task_state, (int, np.integer)):
+            self.task_state = task_state
+            np_random, _ = seeding.np_random(int(task_state))
+            self._set_transitions(*self.make_task_state(np_random))
+        else:
+            super().set_task_state(task_state)
+
+
 if __name__ == "__main__":
     env = UniformTMDP(3, 2)
     env.seed(5)
@@ -0,0 +1,7 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+from mtenv.remote.client import (  # noqa: F401
+    RemoteConnection,
+    RemoteMTEnv,
+    RemoteVectorMTEnv,
+)
+from mtenv.remote.server import make_server, serve  # noqa: F401
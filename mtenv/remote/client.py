@@ -0,0 +1,316 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Clients of the environments hosted by `mtenv serve` (refer
+`mtenv.remote.server`)."""
+
+import select
+import socket
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from gym.spaces.space import Space
+
+from mtenv import MTEnv
+from mtenv.remote.codec import (
+    DEFAULT_MAX_FRAME_SIZE,
+    recv_message,
+    send_message,
+    space_from_value,
+)
+from mtenv.remote.server import CommandType, parse_address
+from mtenv.utils.types import (
+    ActionType,
+    ObsType,
+    StepReturnType,
+    TaskObsType,
+    TaskStateType,
+)
+from mtenv.vector.vector_mtenv import VectorMTEnv
+
+
+class RemoteConnection:
+    def __init__(
+        self,
+        address: str,
+        timeout: Optional[float] = None,
+        max_frame_size: int = DEFAULT_MAX_FRAME_SIZE,
+    ) -> None:
+        """Connection to a server started with `mtenv serve`.
+
+        A request is a batch of commands and at most one request is in
+        flight at a time: `send` starts a request and `receive` waits for
+        its response.
+
+        Args:
+            address (str): `unix:<path>` or `<host>:<port>`.
+            timeout (Optional[float], optional): timeout (in seconds) of the
+                socket operations. Defaults to None (no timeout).
+            max_frame_size (int, optional): largest response (in bytes)
+                accepted from the server. Defaults to
+                `DEFAULT_MAX_FRAME_SIZE`.
+        """
+        family, parsed_address = parse_address(address)
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(parsed_address)
+        if family == socket.AF_INET:
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.max_frame_size = max_frame_size
+        self._lock = threading.Lock()
+        self._is_request_in_flight = False
+        self.closed = False
+
+    def send(self, commands: Sequence[CommandType]) -> None:
+        """Send a batch of commands `(handle, method, args)`."""
+        with self._lock:
+            if self._is_request_in_flight:
+                raise RuntimeError("the response of the previous request is pending.")
+            send_message(self.sock, list(commands))
+            self._is_request_in_flight = True
+
+    def poll(self, timeout: Optional[float] = 0.0) -> bool:
+        """Return True if the response of the request is available."""
+        readable, _, _ = select.select([self.sock], [], [], timeout)
+        return bool(readable)
+
+    def receive(self) -> List[Any]:
+        """Wait for the response of the request.
+
+        Raises:
+            RuntimeError: if a command raised an exception on the server.
+
+        Returns:
+            List[Any]: outputs of the commands.
+        """
+        with self._lock:
+            if not self._is_request_in_flight:
+                raise RuntimeError("no request is in flight.")
+            results = recv_message(self.sock, max_frame_size=self.max_frame_size)
+            self._is_request_in_flight = False
+        errors = [output for is_success, output in results if not is_success]
+        if errors:
+            raise RuntimeError(
+                f"{len(errors)} remote command(s) raised an exception. "
+                f"First one:\n{errors[0]}"
+            )
+        return [output for _, output in results]
+
+    def call(self, commands: Sequence[CommandType]) -> List[Any]:
+        """Send a batch of commands and wait for their outputs."""
+        self.send(commands)
+        return self.receive()
+
+    def make(
+        self, env_ids: Sequence[str], env_kwargs: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[int, Space, Space]]:
+        """Make environments on the server (in one request).
+
+        Returns:
+            List[Tuple[int, Space, Space]]: handle, action space and
+            observation space of each environment.
+        """
+        outputs = self.call(
+            [(None, "make", [env_id, dict(env_kwargs or {})]) for env_id in env_ids]
+        )
+        return [
+            (handle, space_from_value(action_space), space_from_value(obs_space))
+            for handle, action_space, obs_space in outputs
+        ]
+
+    def close(self) -> None:
+        if not self.closed:
+            self.sock.close()
+            self.closed = True
+
+
+class RemoteMTEnv(MTEnv):
+    def __init__(
+        self,
+        env_id: str,
+        address: Optional[str] = None,
+        connection: Optional[RemoteConnection] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Multitask environment hosted by a server started with
+        `mtenv serve`.
+
+        The observations are sent as raw array buffers (without pickle),
+        so the values exchanged with the environment (including `info` and
+        `task_state`) should be made of None, bools, numbers, strings,
+        numpy arrays, lists, tuples and dicts. `step_async` sends the
+        action without waiting for the response.
+
+        .. code-block:: python
+
+            # mtenv serve --address 127.0.0.1:7878
+            env = RemoteMTEnv("MT-HiPBMDP-Cartpole-Swingup-vary-friction-v0",
+                              address="127.0.0.1:7878", seed=1)
+
+        Args:
+            env_id (str): id of the registered environment.
+            address (Optional[str], optional): address of the server.
+                Defaults to None (use `connection`).
+            connection (Optional[RemoteConnection], optional): connection
+                to share between environments (which are then called one
+                at a time). Defaults to None (open a connection to
+                `address`).
+            kwargs: arguments to make the environment with.
+        """
+        if (address is None) == (connection is None):
+            raise ValueError("exactly one of address and connection should be set.")
+        self._owns_connection = connection is None
+        if connection is None:
+            assert address is not None
+            connection = RemoteConnection(address)
+        self.connection = connection
+        ((self.handle, action_space, observation_space),) = self.connection.make(
+            env_ids=[env_id], env_kwargs=kwargs
+        )
+        super().__init__(
+            action_space=action_space,
+            env_observation_space=observation_space["env_obs"],
+            task_observation_space=observation_space["task_obs"],
+        )
+        self.env_id = env_id
+
+    def _call(self, method: str, *args: Any) -> Any:
+        return self.connection.call([(self.handle, method, list(args))])[0]
+
+    def step(self, action: ActionType) -> StepReturnType:
+        step_return: StepReturnType = self._call("step", action)
+        return step_return
+
+    def step_async(self, action: ActionType) -> None:
+        self.connection.send([(self.handle, "step", [action])])
+
+    def step_wait(self) -> StepReturnType:
+        step_return: StepReturnType = self.connection.receive()[0]
+        return step_return
+
+    def reset(self) -> ObsType:
+        obs: ObsType = self._call("reset")
+        return obs
+
+    def get_task_obs(self) -> TaskObsType:
+        task_obs: TaskObsType = self._call("get_task_obs")
+        return task_obs
+
+    def get_task_state(self) -> TaskStateType:
+        return self._call("get_task_state")
+
+    def set_task_state(self, task_state: TaskStateType) -> None:
+        self._call("set_task_state", task_state)
+
+    def sample_task_state(self) -> TaskStateType:
+        return self._call("sample_task_state")
+
+    def reset_task_state(self) -> None:
+        self._call("reset_task_state")
+
+    def assert_env_seed_is_set(self) -> None:
+        self._call("assert_env_seed_is_set")
+
+    def assert_task_seed_is_set(self) -> None:
+        self._call("assert_task_seed_is_set")
+
+    def seed(self, seed: Optional[int] = None) -> List[int]:
+        seeds: List[int] = self._call("seed", seed)
+        return seeds
+
+    def seed_task(self, seed: Optional[int] = None) -> List[int]:
+        seeds: List[int] = self._call("seed_task", seed)
+        return seeds
+
+    def close(self) -> None:
+        if self.connection.closed:
+            return
+        self._call("close")
+        if self._owns_connection:
+            self.connection.close()
+
+
+class RemoteVectorMTEnv(VectorMTEnv):
+    def __init__(
+        self,
+        address: str,
+        env_ids: Sequence[str],
+        env_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Batch of multitask environments hosted by a server started with
+        `mtenv serve`, over one connection: the calls to the environments
+        (eg `step`) are sent in one request per batch, ie one round-trip.
+
+        `step_async` sends the actions of a batch of environments, whose
+        results are received together: `poll` returns either all the
+        environments of the batch, or none.
+
+        Args:
+            address (str): address of the server.
+            env_ids (Sequence[str]): ids of the registered environments
+                (one per environment).
+            env_kwargs (Optional[Dict[str, Any]], optional): arguments to
+                make the environments with. Defaults to None.
+        """
+        self.connection = RemoteConnection(address)
+        envs = self.connection.make(env_ids=env_ids, env_kwargs=env_kwargs)
+        self.handles = [handle for handle, _, _ in envs]
+        _, action_space, observation_space = envs[0]
+        super().__init__(
+            num_envs=len(self.handles),
+            action_space=action_space,
+            observation_space=observation_space,
+        )
+        self._in_flight_indices: Optional[List[int]] = None
+
+    def call_each(
+        self,
+        name: str,
+        args_list: Optional[Sequence[Tuple[Any, ...]]] = None,
+        indices: Optional[Sequence[int]] = None,
+    ) -> List[Any]:
+        _indices = self._get_indices(indices)
+        if args_list is None:
+            args_list = [() for _ in _indices]
+        assert len(args_list) == len(_indices)
+        return self.connection.call(
+            [
+                (self.handles[index], name, list(args))
+                for index, args in zip(_indices, args_list)
+            ]
+        )
+
+    def _start_steps(self, actions: Sequence[ActionType], indices: List[int]) -> None:
+        self.connection.send(
+            [
+                (self.handles[index], "step", [action])
+                for index, action in zip(indices, actions)
+            ]
+        )
+        self._in_flight_indices = indices
+
+    def _finish_steps(
+        self, actions: Sequence[ActionType], indices: List[int]
+    ) -> List[Any]:
+        in_flight_indices = self._in_flight_indices
+        if in_flight_indices is None or sorted(indices) != sorted(in_flight_indices):
+            raise RuntimeError(
+                "the environments stepped together should be waited for together."
+            )
+        self._in_flight_indices = None
+        results = dict(zip(in_flight_indices, self.connection.receive()))
+        return [results[index] for index in indices]
+
+    def poll(self, timeout: Optional[float] = 0.0) -> List[int]:
+        if self._in_flight_indices is None or not self.connection.poll(timeout):
+            return []
+        return list(self._in_flight_indices)
+
+    def _close(self) -> None:
+        if self._in_flight_indices is not None:
+            # Drop the results of the pending steps.
+            self._in_flight_indices = None
+            try:
+                self.connection.receive()
+            except RuntimeError:
+                pass
+        self.call("close")
+        self.connection.close()
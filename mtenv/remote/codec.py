@@ -0,0 +1,292 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Compact binary encoding (without pickle) of the values exchanged with a
+remote environment, and length-prefixed framing over sockets."""
+
+import socket
+import struct
+from typing import Any, Dict, List, Union
+
+import numpy as np
+from gym.spaces import Box, Discrete, MultiBinary, MultiDiscrete, Space
+from gym.spaces import Dict as DictSpace
+from gym.spaces import Tuple as TupleSpace
+
+# Tags of the encoded values.
+_NONE = b"N"
+_TRUE = b"T"
+_FALSE = b"F"
+_INT = b"i"
+_FLOAT = b"f"
+_STR = b"s"
+_BYTES = b"b"
+_ARRAY = b"a"
+_SCALAR = b"g"
+_LIST = b"l"
+_TUPLE = b"t"
+_DICT = b"d"
+
+_INT_STRUCT = struct.Struct("<q")
+_MIN_INT = -(2**63)
+_MAX_INT = 2**63 - 1
+_FLOAT_STRUCT = struct.Struct("<d")
+_LENGTH_STRUCT = struct.Struct("<I")
+_FRAME_STRUCT = struct.Struct("<Q")
+
+# Largest frame accepted by `recv_message` by default (1 GiB).
+DEFAULT_MAX_FRAME_SIZE = 1 << 30
+
+
+def _encode_dtype(dtype: np.dtype, chunks: List[bytes]) -> None:
+    if dtype.hasobject:
+        raise TypeError("arrays of objects can not be encoded.")
+    name = dtype.str.encode("ascii")
+    chunks.append(bytes([len(name)]))
+    chunks.append(name)
+
+
+def _encode(value: Any, chunks: List[bytes]) -> None:
+    # bool is checked before int, as it is a subclass of int.
+    if value is None:
+        chunks.append(_NONE)
+    elif value is True:
+        chunks.append(_TRUE)
+    elif value is False:
+        chunks.append(_FALSE)
+    elif isinstance(value, int):
+        if not _MIN_INT <= value <= _MAX_INT:
+            raise TypeError("integers should fit in 64 bits to be encoded.")
+        chunks.append(_INT + _INT_STRUCT.pack(value))
+    elif isinstance(value, float):
+        chunks.append(_FLOAT + _FLOAT_STRUCT.pack(value))
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        chunks.append(_STR + _LENGTH_STRUCT.pack(len(data)))
+        chunks.append(data)
+    elif isinstance(value, bytes):
+        chunks.append(_BYTES + _LENGTH_STRUCT.pack(len(value)))
+        chunks.append(value)
+    elif isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        chunks.append(_ARRAY)
+        _encode_dtype(array.dtype, chunks)
+        chunks.append(bytes([array.ndim]))
+        chunks.append(struct.pack(f"<{array.ndim}Q", *array.shape))
+        chunks.append(array.tobytes())
+    elif isinstance(value, np.generic):
+        chunks.append(_SCALAR)
+        _encode_dtype(value.dtype, chunks)
+        chunks.append(value.tobytes())
+    elif isinstance(value, (list, tuple)):
+        chunks.append(
+            (_LIST if isinstance(value, list) else _TUPLE)
+            + _LENGTH_STRUCT.pack(len(value))
+        )
+        for item in value:
+            _encode(item, chunks)
+    elif isinstance(value, dict):
+        chunks.append(_DICT + _LENGTH_STRUCT.pack(len(value)))
+        for key, item in value.items():
+            _encode(key, chunks)
+            _encode(item, chunks)
+    else:
+        raise TypeError(f"values of type {type(value).__name__} can not be encoded.")
+
+
+def encode(value: Any) -> bytes:
+    """Encode a value made of None, bools, ints, floats, strings, bytes,
+    numpy arrays and scalars, lists, tuples and dicts.
+
+    Arrays are stored as their dtype, their shape and their raw buffer.
+
+    Raises:
+        TypeError: if the value contains another type.
+    """
+    chunks: List[bytes] = []
+    _encode(value, chunks)
+    return b"".join(chunks)
+
+
+class _Decoder:
+    def __init__(self, buffer: memoryview) -> None:
+        self.buffer = buffer
+        self.offset = 0
+
+    def read(self, size: int) -> memoryview:
+        start = self.offset
+        self.offset += size
+        if self.offset > len(self.buffer):
+            raise ValueError("the encoded value is truncated.")
+        return self.buffer[start : self.offset]
+
+    def read_length(self) -> int:
+        length: int = _LENGTH_STRUCT.unpack(self.read(_LENGTH_STRUCT.size))[0]
+        return length
+
+    def read_dtype(self) -> np.dtype:
+        size = self.read(1)[0]
+        return np.dtype(bytes(self.read(size)).decode("ascii"))
+
+    def decode(self) -> Any:
+        tag = bytes(self.read(1))
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _INT:
+            return _INT_STRUCT.unpack(self.read(_INT_STRUCT.size))[0]
+        if tag == _FLOAT:
+            return _FLOAT_STRUCT.unpack(self.read(_FLOAT_STRUCT.size))[0]
+        if tag == _STR:
+            return bytes(self.read(self.read_length())).decode("utf-8")
+        if tag == _BYTES:
+            return bytes(self.read(self.read_length()))
+        if tag == _ARRAY:
+            dtype = self.read_dtype()
+            ndim = self.read(1)[0]
+            shape = struct.unpack(f"<{ndim}Q", self.read(8 * ndim))
+            count = int(np.prod(shape))
+            # The array is a view of the (writable) buffer, not a copy.
+            return np.frombuffer(
+                self.read(count * dtype.itemsize), dtype=dtype, count=count
+            ).reshape(shape)
+        if tag == _SCALAR:
+            dtype = self.read_dtype()
+            return np.frombuffer(self.read(dtype.itemsize), dtype=dtype)[0]
+        if tag in (_LIST, _TUPLE):
+            items = [self.decode() for _ in range(self.read_length())]
+            return items if tag == _LIST else tuple(items)
+        if tag == _DICT:
+            # The keys and values are decoded in sequence (the evaluation
+            # order of dict comprehensions changed in Python 3.8).
+            value = {}
+            for _ in range(self.read_length()):
+                key = self.decode()
+                value[key] = self.decode()
+            return value
+        raise ValueError(f"unknown tag {tag!r}.")
+
+
+def decode(buffer: Union[bytes, bytearray]) -> Any:
+    """Decode a value encoded with `encode`.
+
+    The decoded arrays are views of `buffer` (they are writable when
+    `buffer` is a bytearray).
+    """
+    decoder = _Decoder(memoryview(buffer))
+    value = decoder.decode()
+    if decoder.offset != len(decoder.buffer):
+        raise ValueError("unexpected data after the encoded value.")
+    return value
+
+
+def send_frame(sock: socket.socket, data: bytes) -> None:
+    """Send an encoded value, prefixed with its length."""
+    sock.sendall(_FRAME_STRUCT.pack(len(data)) + data)
+
+
+def send_message(sock: socket.socket, value: Any) -> None:
+    """Send a value, encoded and prefixed with its length."""
+    send_frame(sock, encode(value))
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytearray:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        num_bytes = sock.recv_into(view[received:], size - received)
+        if num_bytes == 0:
+            raise EOFError("the connection is closed.")
+        received += num_bytes
+    return buffer
+
+
+def recv_message(
+    sock: socket.socket, max_frame_size: int = DEFAULT_MAX_FRAME_SIZE
+) -> Any:
+    """Receive a value sent with `send_message`.
+
+    Args:
+        sock (socket.socket):
+        max_frame_size (int, optional): largest accepted size (in bytes)
+            of the encoded value. Defaults to `DEFAULT_MAX_FRAME_SIZE`.
+
+    Raises:
+        EOFError: if the connection is closed.
+        ValueError: if the frame is larger than `max_frame_size` (the
+            frame is not read, so the connection can not be used anymore).
+    """
+    (size,) = _FRAME_STRUCT.unpack(_recv_exactly(sock, _FRAME_STRUCT.size))
+    if size > max_frame_size:
+        raise ValueError(
+            f"the frame size ({size} bytes) exceeds max_frame_size={max_frame_size}."
+        )
+    return decode(_recv_exactly(sock, size))
+
+
+def space_to_value(space: Space) -> Dict[str, Any]:
+    """Describe a gym space with values which can be encoded.
+
+    Raises:
+        TypeError: if the type of space is not supported.
+    """
+    if isinstance(space, Box):
+        return {
+            "type": "Box",
+            "low": space.low,
+            "high": space.high,
+            "dtype": np.dtype(space.dtype).str,
+        }
+    if isinstance(space, Discrete):
+        return {"type": "Discrete", "n": int(space.n)}
+    if isinstance(space, MultiDiscrete):
+        return {"type": "MultiDiscrete", "nvec": np.asarray(space.nvec)}
+    if isinstance(space, MultiBinary):
+        return {"type": "MultiBinary", "n": space.n}
+    if isinstance(space, DictSpace):
+        return {
+            "type": "Dict",
+            "spaces": {
+                key: space_to_value(value) for key, value in space.spaces.items()
+            },
+        }
+    if isinstance(space, TupleSpace):
+        # The container of the spaces (list or tuple) is preserved.
+        return {
+            "type": "Tuple",
+            "spaces": type(space.spaces)(
+                space_to_value(value) for value in space.spaces
+            ),
+        }
+    raise TypeError(f"spaces of type {type(space).__name__} are not supported.")
+
+
+def space_from_value(value: Dict[str, Any]) -> Space:
+    """Build the gym space described by `space_to_value`."""
+    space_type = value["type"]
+    if space_type == "Box":
+        return Box(
+            low=np.array(value["low"]),
+            high=np.array(value["high"]),
+            dtype=np.dtype(value["dtype"]),
+        )
+    if space_type == "Discrete":
+        return Discrete(n=value["n"])
+    if space_type == "MultiDiscrete":
+        return MultiDiscrete(nvec=np.array(value["nvec"]))
+    if space_type == "MultiBinary":
+        return MultiBinary(n=value["n"])
+    if space_type == "Dict":
+        spaces: Dict[str, Space] = {
+            key: space_from_value(item) for key, item in value["spaces"].items()
+        }
+        return DictSpace(spaces=spaces)
+    if space_type == "Tuple":
+        return TupleSpace(
+            spaces=type(value["spaces"])(
+                space_from_value(item) for item in value["spaces"]
+            )
+        )
+    raise ValueError(f"unknown type of space {space_type}.")
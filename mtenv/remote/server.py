@@ -0,0 +1,205 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Server hosting registered multitask environments behind a Unix or TCP
+socket (refer `mtenv.remote.client` for the clients)."""
+
+import fnmatch
+import os
+import socket
+import socketserver
+import stat
+import traceback
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import mtenv
+from mtenv import MTEnv
+from mtenv.remote.codec import (
+    DEFAULT_MAX_FRAME_SIZE,
+    encode,
+    recv_message,
+    send_frame,
+    space_to_value,
+)
+
+# Methods of the environments which the clients can call.
+ALLOWED_METHODS = (
+    "assert_env_seed_is_set",
+    "assert_task_seed_is_set",
+    "close",
+    "get_task_obs",
+    "get_task_state",
+    "reset",
+    "reset_task_state",
+    "sample_task_state",
+    "seed",
+    "seed_task",
+    "set_task_state",
+    "step",
+)
+
+AddressType = Union[str, Tuple[str, int]]
+CommandType = Tuple[Optional[int], str, List[Any]]
+
+
+def parse_address(address: str) -> Tuple[int, AddressType]:
+    """Parse `unix:<path>` or `<host>:<port>` into a socket family and
+    address."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:") :]
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(
+            f"address={address} should be `unix:<path>` or `<host>:<port>`."
+        )
+    return socket.AF_INET, (host, int(port))
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def setup(self) -> None:
+        if self.request.family == socket.AF_INET:
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Environments created by this connection, keyed by handle.
+        self.envs: Dict[int, MTEnv] = {}
+        self.next_handle = 0
+
+    def handle(self) -> None:
+        while True:
+            try:
+                commands = recv_message(
+                    self.request,
+                    max_frame_size=self.server.max_frame_size,  # type: ignore[attr-defined]
+                )
+            except (EOFError, ConnectionError, ValueError):
+                # A frame which is too large is not read: the connection is
+                # closed.
+                break
+            results = [self.run(*command) for command in commands]
+            try:
+                data = encode(results)
+            except TypeError:
+                results = [_check_encodable(result) for result in results]
+                data = encode(results)
+            try:
+                send_frame(self.request, data)
+            except (BrokenPipeError, ConnectionError):
+                break
+
+    def run(self, handle: Optional[int], method: str, args: List[Any]) -> Any:
+        try:
+            if method == "make":
+                return True, self.make(*args)
+            if method not in ALLOWED_METHODS:
+                raise ValueError(f"method {method} can not be called remotely.")
+            if handle not in self.envs:
+                raise ValueError(f"unknown environment {handle}.")
+            env = self.envs[handle]
+            output = getattr(env, method)(*args)
+            if method == "close":
+                del self.envs[handle]
+            return True, output
+        except Exception:
+            return False, traceback.format_exc()
+
+    def make(self, env_id: str, kwargs: Dict[str, Any]) -> Tuple[int, Any, Any]:
+        env_ids: Sequence[str] = self.server.env_ids  # type: ignore[attr-defined]
+        if not any(fnmatch.fnmatchcase(env_id, pattern) for pattern in env_ids):
+            raise ValueError(f"env_id={env_id} is not served.")
+        env = mtenv.make(env_id, **kwargs)
+        handle = self.next_handle
+        self.next_handle += 1
+        self.envs[handle] = env
+        return (
+            handle,
+            space_to_value(env.action_space),
+            space_to_value(env.observation_space),
+        )
+
+    def finish(self) -> None:
+        for env in self.envs.values():
+            env.close()
+        self.envs.clear()
+
+
+def _check_encodable(result: Tuple[bool, Any]) -> Tuple[bool, Any]:
+    try:
+        encode(result)
+    except TypeError as error:
+        return False, f"the output can not be sent: {error}"
+    return result
+
+
+class _ServerMixin:
+    env_ids: Sequence[str]
+    max_frame_size: int
+
+
+class _TCPServer(_ServerMixin, socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class _UnixServer(_ServerMixin, socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(
+    address: str,
+    env_ids: Sequence[str] = ("*",),
+    max_frame_size: int = DEFAULT_MAX_FRAME_SIZE,
+) -> socketserver.BaseServer:
+    """Make a server hosting the registered environments (one thread per
+    connection, the environments of a connection are closed when it is
+    closed).
+
+    Each request of a client is a batch of commands (calls to a method of
+    one of its environments), and the response holds the outputs of the
+    commands, so that many environments can be stepped per round-trip.
+
+    Args:
+        address (str): `unix:<path>` or `<host>:<port>` (the port 0 picks
+            a free port).
+        env_ids (Sequence[str], optional): ids (or glob patterns) of the
+            registered environments which can be made. Defaults to ("*",).
+        max_frame_size (int, optional): largest request (in bytes) of a
+            client (the connection is closed on larger requests). Defaults
+            to `DEFAULT_MAX_FRAME_SIZE`.
+
+    Raises:
+        FileExistsError: if the path of a Unix socket exists and is not a
+            socket.
+
+    Returns:
+        socketserver.BaseServer: the server (call `serve_forever` to start
+        serving).
+    """
+    family, parsed_address = parse_address(address)
+    server: Union[_TCPServer, _UnixServer]
+    if family == socket.AF_UNIX:
+        assert isinstance(parsed_address, str)
+        if os.path.exists(parsed_address):
+            # Only a stale socket (eg of a previous server) is removed.
+            if not stat.S_ISSOCK(os.stat(parsed_address).st_mode):
+                raise FileExistsError(f"{parsed_address} exists and is not a socket.")
+            os.remove(parsed_address)
+        server = _UnixServer(parsed_address, _Handler)
+    else:
+        assert not isinstance(parsed_address, str)
+        server = _TCPServer(parsed_address, _Handler)
+    server.env_ids = tuple(env_ids)
+    server.max_frame_size = max_frame_size
+    return server
+
+
+def serve(
+    address: str,
+    env_ids: Sequence[str] = ("*",),
+    max_frame_size: int = DEFAULT_MAX_FRAME_SIZE,
+) -> None:
+    """Serve the registered environments until interrupted (refer
+    `make_server`)."""
+    with make_server(
+        address=address, env_ids=env_ids, max_frame_size=max_frame_size
+    ) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
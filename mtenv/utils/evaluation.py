@@ -0,0 +1,91 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Run complete evaluation episodes (with a given policy) and summarize
+them per task."""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from mtenv import MTEnv
+from mtenv.utils.types import ActionType, ObsType, TaskStateType
+
+PolicyType = Callable[[ObsType], ActionType]
+EpisodeSummaryType = Dict[str, Any]
+
+
+def run_episodes(
+    env: MTEnv,
+    policy: PolicyType,
+    task_state: TaskStateType,
+    num_episodes: int = 1,
+    max_episode_steps: Optional[int] = None,
+    success_key: Optional[str] = "success",
+) -> EpisodeSummaryType:
+    """Run `num_episodes` episodes of a task and summarize them.
+
+    Args:
+        env (MTEnv): environment (it should not sample a new task on
+            `reset`, eg with `SampleRandomTask`).
+        policy (PolicyType): function mapping an observation to an action.
+        task_state (TaskStateType): state of the task to evaluate.
+        num_episodes (int, optional): Defaults to 1.
+        max_episode_steps (Optional[int], optional): maximum length of an
+            episode. Defaults to None (run until `done`).
+        success_key (Optional[str], optional): key of the success in
+            `info` (an episode is successful when it is truthy at any
+            step). Defaults to "success".
+
+    Returns:
+        EpisodeSummaryType: `task_state`, the `returns`, `lengths` and
+        `successes` of the episodes, and their `return_mean` and
+        `success_rate`.
+    """
+    env.set_task_state(task_state)
+    returns: List[float] = []
+    lengths: List[int] = []
+    successes: List[bool] = []
+    for _ in range(num_episodes):
+        obs = env.reset()
+        done = False
+        episode_return = 0.0
+        length = 0
+        is_successful = False
+        while not done and (max_episode_steps is None or length < max_episode_steps):
+            obs, reward, done, info = env.step(policy(obs))
+            episode_return += reward
+            length += 1
+            if success_key is not None and info.get(success_key):
+                is_successful = True
+        returns.append(float(episode_return))
+        lengths.append(length)
+        successes.append(is_successful)
+    return {
+        "task_state": task_state,
+        "returns": returns,
+        "lengths": lengths,
+        "successes": successes,
+        "return_mean": float(np.mean(returns)) if returns else np.nan,
+        "success_rate": float(np.mean(successes)) if successes else np.nan,
+    }
+
+
+def evaluate_task_states(
+    env: MTEnv,
+    policy: PolicyType,
+    task_states: Sequence[TaskStateType],
+    num_episodes: int = 1,
+    max_episode_steps: Optional[int] = None,
+    success_key: Optional[str] = "success",
+) -> List[EpisodeSummaryType]:
+    """Run `run_episodes` for each task state (in order)."""
+    return [
+        run_episodes(
+            env=env,
+            policy=policy,
+            task_state=task_state,
+            num_episodes=num_episodes,
+            max_episode_steps=max_episode_steps,
+            success_key=success_key,
+        )
+        for task_state in task_states
+    ]
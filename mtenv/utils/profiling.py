@@ -0,0 +1,361 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Opt-in instrumentation to measure the latency of `step`, `reset` and
+`set_task_state` across the layers of a (multitask) environment stack."""
+
+import json
+import math
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from gym.core import Env
+
+from mtenv.envs.shared.wrappers.multienv import MultiEnvWrapper
+from mtenv.utils.task_state import canonicalize_task_state
+from mtenv.utils.types import TaskStateType
+
+TaskKeyFnType = Callable[[TaskStateType], Hashable]
+StatsType = Dict[str, float]
+
+# Methods which are timed for every layer of the environment stack.
+_TIMED_METHODS = ("step", "reset", "set_task_state")
+# Methods after which the key of the current task is refreshed.
+_TASK_CHANGING_METHODS = ("reset", "set_task_state")
+
+_UNKNOWN_TASK = "-"
+
+
+def default_task_key(task_state: TaskStateType) -> Hashable:
+    """Map a `task_state` to the key used to group the measurements.
+
+    Integer (and string) task states are used as is. Other task states
+    (eg arrays of continuous parameters) are keyed by their canonical form
+    (refer `canonicalize_task_state`), so that each task gets its own key.
+
+    Args:
+        task_state (TaskStateType): For more information on `task_state`,
+            refer :ref:`task_state`.
+
+    Returns:
+        Hashable: key of the task.
+    """
+    if isinstance(task_state, (int, np.integer)):
+        return int(task_state)
+    if isinstance(task_state, str):
+        return task_state
+    key = canonicalize_task_state(task_state)
+    try:
+        hash(key)
+    except TypeError:
+        # eg a task_state containing a set.
+        return repr(key)
+    task_key: Hashable = key
+    return task_key
+
+
+class LatencyHistogram:
+    def __init__(
+        self,
+        min_latency: float = 1e-7,
+        max_latency: float = 1e3,
+        bins_per_decade: int = 20,
+    ) -> None:
+        """Fixed-size histogram of latencies with log-spaced bins.
+
+        Memory usage does not grow with the number of measurements and
+        quantiles are accurate up to the width of a bin (about 12% with
+        the default `bins_per_decade`).
+
+        Args:
+            min_latency (float, optional): smallest latency (in seconds)
+                that can be resolved. Defaults to 1e-7.
+            max_latency (float, optional): largest latency (in seconds)
+                that can be resolved. Defaults to 1e3.
+            bins_per_decade (int, optional): Defaults to 20.
+        """
+        self._log_min = math.log10(min_latency)
+        self._bins_per_decade = bins_per_decade
+        n_bins = int(
+            math.ceil((math.log10(max_latency) - self._log_min) * bins_per_decade)
+        )
+        self._counts = np.zeros(n_bins, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def clear(self) -> None:
+        """Drop all the recorded latencies."""
+        self._counts[:] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, latency: float) -> None:
+        """Record a latency (in seconds)."""
+        if latency > 0.0:
+            index = int((math.log10(latency) - self._log_min) * self._bins_per_decade)
+            index = min(max(index, 0), len(self._counts) - 1)
+        else:
+            index = 0
+        self._counts[index] += 1
+        self.count += 1
+        self.total += latency
+        if latency > self.max:
+            self.max = latency
+
+    def quantile(self, q: float) -> float:
+        """Estimate the `q`-th quantile (`q` in [0, 1]) of the latencies.
+
+        The estimate is the geometric center of the bin containing the
+        quantile.
+        """
+        if self.count == 0:
+            return math.nan
+        index = int(np.searchsorted(np.cumsum(self._counts), q * self.count))
+        index = min(index, len(self._counts) - 1)
+        return min(
+            10 ** (self._log_min + (index + 0.5) / self._bins_per_decade), self.max
+        )
+
+    def as_dict(self) -> StatsType:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else math.nan,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+            "total": self.total,
+        }
+
+
+class Profiler:
+    def __init__(
+        self, task_key: TaskKeyFnType = default_task_key, enabled: bool = True
+    ) -> None:
+        """Record per-layer, per-task latency histograms of `step`, `reset`
+        and `set_task_state`, along with the construction time of the
+        environments.
+
+        Instrumenting is opt-in: environments are left untouched until
+        they are passed to `instrument`. Setting `enabled` to False turns
+        the instrumented methods into plain pass-throughs (one attribute
+        lookup per call) and `restore` removes the instrumentation.
+
+        .. code-block:: python
+
+            profiler = Profiler()
+            with profiler.time_construction("MT-MetaWorld-MT10-v0"):
+                env = mtenv.make("MT-MetaWorld-MT10-v0")
+            env = profiler.instrument(env)
+            ...
+            print(profiler.to_json())
+
+        The latency of a layer includes the latency of the layers that it
+        wraps.
+
+        Args:
+            task_key (TaskKeyFnType, optional): function mapping the
+                `task_state` of the (outermost) environment to the key used
+                to group the measurements. Defaults to `default_task_key`.
+            enabled (bool, optional): Defaults to True.
+        """
+        self.enabled = enabled
+        self._task_key = task_key
+        self._task: Hashable = _UNKNOWN_TASK
+        self._histograms: Dict[Tuple[str, str, Hashable], LatencyHistogram] = {}
+        self._construction: Dict[str, LatencyHistogram] = {}
+        # (object, name, whether the instance had the attribute, old value)
+        self._patched: List[Tuple[Any, str, bool, Any]] = []
+
+    def _get_histogram(
+        self, layer_name: str, method: str, task: Hashable
+    ) -> LatencyHistogram:
+        key = (layer_name, method, task)
+        if key not in self._histograms:
+            self._histograms[key] = LatencyHistogram()
+        return self._histograms[key]
+
+    def record(
+        self, layer_name: str, method: str, latency: float, task: Hashable = None
+    ) -> None:
+        """Record a latency (in seconds) for `method` of `layer_name`.
+
+        Args:
+            layer_name (str):
+            method (str):
+            latency (float):
+            task (Hashable, optional): key of the task. Defaults to the
+                key of the current task.
+        """
+        if task is None:
+            task = self._task
+        self._get_histogram(layer_name, method, task).add(latency)
+
+    @contextmanager
+    def time_construction(self, name: str) -> Iterator[None]:
+        """Context manager to record the time taken to construct an
+        environment (or any other block of code) under `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.enabled:
+                if name not in self._construction:
+                    self._construction[name] = LatencyHistogram()
+                self._construction[name].add(time.perf_counter() - start)
+
+    def _refresh_task(self, root: Env) -> None:
+        try:
+            task_state = root.get_task_state()
+        except (AttributeError, NotImplementedError):
+            # the task_state is not set yet or not supported by the env.
+            self._task = _UNKNOWN_TASK
+            return
+        self._task = self._task_key(task_state)
+
+    def _make_timed_method(
+        self, func: Callable[..., Any], layer_name: str, method: str, root: Env
+    ) -> Callable[..., Any]:
+        should_refresh_task = method in _TASK_CHANGING_METHODS
+        histograms: Dict[Hashable, LatencyHistogram] = {}
+
+        def _timed_method(*args: Any, **kwargs: Any) -> Any:
+            if not self.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            output = func(*args, **kwargs)
+            latency = time.perf_counter() - start
+            if should_refresh_task:
+                self._refresh_task(root)
+            task = self._task
+            if task not in histograms:
+                histograms[task] = self._get_histogram(layer_name, method, task)
+            histograms[task].add(latency)
+            return output
+
+        return _timed_method
+
+    def _patch(self, obj: Any, name: str, value: Any) -> None:
+        had_attr = name in vars(obj)
+        self._patched.append((obj, name, had_attr, vars(obj).get(name)))
+        setattr(obj, name, value)
+
+    def _instrument_layer(self, layer: Env, depth: int, root: Env) -> None:
+        layer_name = f"{depth}:{type(layer).__name__}"
+        if "_mtenv_profiler" in vars(layer):
+            # the layer (eg an environment shared by several tasks) is
+            # already instrumented.
+            return
+        self._patch(layer, "_mtenv_profiler", self)
+        for method in _TIMED_METHODS:
+            func = getattr(type(layer), method, None)
+            if func is None:
+                continue
+            self._patch(
+                layer,
+                method,
+                self._make_timed_method(
+                    func=getattr(layer, method),
+                    layer_name=layer_name,
+                    method=method,
+                    root=root,
+                ),
+            )
+
+        if isinstance(layer, MultiEnvWrapper):
+            self._instrument_multienv(layer=layer, depth=depth, root=root)
+        else:
+            inner = vars(layer).get("env", None)
+            if isinstance(inner, Env):
+                self._instrument_layer(layer=inner, depth=depth + 1, root=root)
+
+    def _instrument_multienv(
+        self, layer: MultiEnvWrapper, depth: int, root: Env
+    ) -> None:
+        """The environments of `MultiEnvWrapper` are constructed lazily so
+        the constructors are wrapped to time the construction and to
+        instrument the new environments."""
+        layer_name = f"{depth}:{type(layer).__name__}"
+
+        def _wrap_builder(index: int, func: Callable[[], Env]) -> Callable[[], Env]:
+            def _builder() -> Env:
+                with self.time_construction(f"{layer_name}[{index}]"):
+                    env = func()
+                self._instrument_layer(layer=env, depth=depth + 1, root=root)
+                return env
+
+            return _builder
+
+        self._patch(
+            layer,
+            "_funcs_to_make_envs",
+            [
+                _wrap_builder(index, func)
+                for index, func in enumerate(layer._funcs_to_make_envs)
+            ],
+        )
+        for env in layer._envs:
+            if env is not None:
+                self._instrument_layer(layer=env, depth=depth + 1, root=root)
+
+    def instrument(self, env: Env) -> Env:
+        """Instrument all the layers of `env`.
+
+        The layers are found by following the `env` attribute of the
+        wrappers (and all the environments of `MultiEnvWrapper`). The
+        methods are patched on the instances, so `env` is returned as is.
+        """
+        self._instrument_layer(layer=env, depth=0, root=env)
+        self._refresh_task(env)
+        return env
+
+    def restore(self) -> None:
+        """Remove the instrumentation from all the instrumented
+        environments."""
+        for obj, name, had_attr, old_value in reversed(self._patched):
+            if had_attr:
+                setattr(obj, name, old_value)
+            elif name in vars(obj):
+                delattr(obj, name)
+        self._patched = []
+
+    def reset_stats(self) -> None:
+        """Drop all the measurements recorded so far."""
+        for histogram in self._histograms.values():
+            histogram.clear()
+        self._construction = {}
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Export the measurements as a (JSON serializable) dictionary.
+
+        The dictionary has two keys: `layers`, which maps
+        `layer -> method -> task -> stats`, and `construction`, which maps
+        `name -> stats`. `stats` contain the count, mean, p50, p99, max and
+        total of the latencies (in seconds).
+        """
+        layers: Dict[str, Dict[str, Dict[str, StatsType]]] = {}
+        for (layer_name, method, task), histogram in sorted(
+            self._histograms.items(), key=lambda item: str(item[0])
+        ):
+            if histogram.count == 0:
+                continue
+            layers.setdefault(layer_name, {}).setdefault(method, {})[
+                str(task)
+            ] = histogram.as_dict()
+        return {
+            "layers": layers,
+            "construction": {
+                name: histogram.as_dict()
+                for name, histogram in sorted(self._construction.items())
+            },
+        }
+
+    def to_json(self, path: Optional[str] = None, indent: int = 2) -> str:
+        """Export the measurements (refer `as_dict`) as a JSON string and
+        optionally write it to `path`."""
+        output = json.dumps(self.as_dict(), indent=indent)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(output)
+        return output
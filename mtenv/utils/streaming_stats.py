@@ -0,0 +1,131 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Streaming (constant memory) estimates of quantiles, for many independent
+streams at once."""
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+# Number of markers of the P^2 algorithm.
+_NUM_MARKERS = 5
+
+
+class P2Quantiles:
+    def __init__(self, quantiles: Sequence[float], capacity: int = 16) -> None:
+        """Streaming estimates of quantiles with the P^2 algorithm (Jain and
+        Chlamtac, 1985), for `capacity` independent streams (rows).
+
+        Each quantile of each stream is tracked with 5 markers (heights and
+        positions), stored in fixed-size arrays: memory usage does not grow
+        with the number of values. The estimates are exact while a stream
+        has at most 5 values. `grow` adds streams.
+
+        Args:
+            quantiles (Sequence[float]): quantiles (in [0, 1]) to estimate.
+            capacity (int, optional): number of streams. Defaults to 16.
+        """
+        self.quantiles = np.asarray(quantiles, dtype=np.float64)
+        p = self.quantiles[:, None]
+        # Increments of the desired positions of the markers.
+        self._increments = np.concatenate(
+            [np.zeros_like(p), p / 2, p, (1 + p) / 2, np.ones_like(p)], axis=1
+        )
+        self._initial_desired_positions = np.concatenate(
+            [np.zeros_like(p), 2 * p, 4 * p, 2 + 2 * p, np.full_like(p, 4)], axis=1
+        )
+        self.counts = np.zeros(0, dtype=np.int64)
+        self._heights = np.zeros((0, len(self.quantiles), _NUM_MARKERS))
+        self._positions = np.zeros_like(self._heights)
+        self._desired_positions = np.zeros_like(self._heights)
+        self.grow(capacity)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.counts)
+
+    def grow(self, capacity: int) -> None:
+        """Increase the number of streams to `capacity`."""
+        num_new_rows = capacity - self.capacity
+        if num_new_rows <= 0:
+            return
+        self.counts = np.concatenate([self.counts, np.zeros(num_new_rows, np.int64)])
+        new_rows = np.zeros((num_new_rows,) + self._heights.shape[1:])
+        self._heights = np.concatenate([self._heights, new_rows])
+        self._positions = np.concatenate([self._positions, new_rows])
+        self._desired_positions = np.concatenate([self._desired_positions, new_rows])
+
+    def clear(self, row: Optional[int] = None) -> None:
+        """Drop the values of a stream (of all the streams when `row` is
+        None)."""
+        if row is None:
+            self.counts[:] = 0
+        else:
+            self.counts[row] = 0
+
+    def add(self, row: int, value: float) -> None:
+        """Add a value to a stream."""
+        count = self.counts[row]
+        self.counts[row] += 1
+        heights = self._heights[row]
+        if count < _NUM_MARKERS:
+            # The first values are stored (sorted) in the markers.
+            heights[:, count] = value
+            heights[:, : count + 1].sort(axis=1)
+            if count + 1 == _NUM_MARKERS:
+                self._positions[row] = np.arange(_NUM_MARKERS)
+                self._desired_positions[row] = self._initial_desired_positions
+            return
+        positions = self._positions[row]
+        desired_positions = self._desired_positions[row]
+
+        # Update the extreme markers and find the cell containing the value.
+        heights[:, 0] = np.minimum(heights[:, 0], value)
+        heights[:, -1] = np.maximum(heights[:, -1], value)
+        cells = np.clip((heights[:, 1:-1] <= value).sum(axis=1), 0, 3)
+        positions[np.arange(_NUM_MARKERS)[None, :] > cells[:, None]] += 1
+        desired_positions += self._increments
+
+        # Adjust the heights of the middle markers.
+        rows = np.arange(len(self.quantiles))
+        for marker in range(1, _NUM_MARKERS - 1):
+            delta = desired_positions[:, marker] - positions[:, marker]
+            previous_gap = positions[:, marker - 1] - positions[:, marker]
+            next_gap = positions[:, marker + 1] - positions[:, marker]
+            should_move = ((delta >= 1) & (next_gap > 1)) | (
+                (delta <= -1) & (previous_gap < -1)
+            )
+            if not should_move.any():
+                continue
+            d = np.sign(delta)
+            height = heights[:, marker]
+            previous_height = heights[:, marker - 1]
+            next_height = heights[:, marker + 1]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                parabolic = height + d / (next_gap - previous_gap) * (
+                    (-previous_gap + d) * (next_height - height) / next_gap
+                    + (next_gap - d) * (height - previous_height) / -previous_gap
+                )
+                neighbour = (marker + d).astype(np.int64)
+                linear = height + d * (heights[rows, neighbour] - height) / (
+                    positions[rows, neighbour] - positions[:, marker]
+                )
+            is_parabolic_valid = (previous_height < parabolic) & (
+                parabolic < next_height
+            )
+            new_height = np.where(is_parabolic_valid, parabolic, linear)
+            heights[:, marker] = np.where(should_move, new_height, height)
+            positions[:, marker] += np.where(should_move, d, 0)
+
+    def get(self, row: int) -> np.ndarray:
+        """Return the estimates of the quantiles of a stream (NaN when the
+        stream is empty)."""
+        count = self.counts[row]
+        if count == 0:
+            return np.full(len(self.quantiles), np.nan)
+        if count <= _NUM_MARKERS:
+            # Exact quantiles (with the same interpolation as `np.quantile`).
+            estimates: np.ndarray = np.quantile(
+                self._heights[row, 0, :count], self.quantiles
+            )
+            return estimates
+        return self._heights[row, :, 2].copy()
@@ -0,0 +1,179 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Strategies to sample the id of the next task (eg uniformly or in
+proportion to priorities, for curricula)."""
+
+from abc import ABC, abstractmethod
+from typing import Optional, Sequence, Union
+
+import numpy as np
+from numpy.random import RandomState
+
+
+class TaskSampler(ABC):
+    def __init__(self, num_tasks: int) -> None:
+        """Strategy to sample the id (in `[0, num_tasks)`) of the next
+        task.
+
+        Samplers are passed to the wrappers which sample tasks among a
+        fixed set (eg `NTasks`, `NTasksId` and `MultiEnvWrapper`). The
+        random number generator is the task generator of the wrapper, so
+        the sampled tasks are reproducible with `seed_task`.
+
+        Args:
+            num_tasks (int): number of tasks.
+        """
+        if num_tasks <= 0:
+            raise ValueError(f"num_tasks={num_tasks} should be positive.")
+        self.num_tasks = num_tasks
+
+    @abstractmethod
+    def sample(self, np_random: RandomState) -> int:
+        """Sample the id of a task.
+
+        Args:
+            np_random (RandomState): random number generator.
+
+        Returns:
+            int: id of the task.
+        """
+        pass
+
+
+class UniformTaskSampler(TaskSampler):
+    def __init__(self, num_tasks: int) -> None:
+        """Sample the tasks uniformly (the default strategy)."""
+        super().__init__(num_tasks=num_tasks)
+
+    def sample(self, np_random: RandomState) -> int:
+        return int(np_random.randint(self.num_tasks))
+
+
+class SumTree:
+    def __init__(self, capacity: int) -> None:
+        """Binary tree where each node holds the sum of the values of its
+        children, to update the values of (and sample among) `capacity`
+        leaves in O(log(capacity)).
+
+        Args:
+            capacity (int): number of leaves.
+        """
+        self.capacity = capacity
+        # The leaves are stored after the internal nodes (node `i` has the
+        # children `2i` and `2i + 1`, the root is node 1).
+        self._num_internal_nodes = 1 << int(np.ceil(np.log2(max(capacity, 1))))
+        self._tree = np.zeros(2 * self._num_internal_nodes)
+
+    @property
+    def total(self) -> float:
+        """Sum of the values of the leaves."""
+        return float(self._tree[1])
+
+    def get(self, indices: Union[int, Sequence[int], np.ndarray]) -> np.ndarray:
+        """Return the values of the leaves."""
+        values: np.ndarray = self._tree[self._num_internal_nodes + np.asarray(indices)]
+        return values
+
+    def update(
+        self,
+        indices: Union[int, Sequence[int], np.ndarray],
+        values: Union[float, Sequence[float], np.ndarray],
+    ) -> None:
+        """Set the (non-negative) values of some leaves.
+
+        The ancestors of the updated leaves are refreshed level by level,
+        so the cost is O(len(indices) * log(capacity)) in a few vectorized
+        operations.
+        """
+        tree = self._tree
+        if np.ndim(indices) == 0:
+            value = float(values)  # type: ignore[arg-type]
+            if value < 0:
+                raise ValueError("the values should be non-negative.")
+            node = self._num_internal_nodes + int(indices)  # type: ignore[arg-type]
+            tree[node] = value
+            while node > 1:
+                node //= 2
+                tree[node] = tree[2 * node] + tree[2 * node + 1]
+            return
+        values = np.asarray(values, dtype=np.float64)
+        if (values < 0).any():
+            raise ValueError("the values should be non-negative.")
+        nodes = np.unique(self._num_internal_nodes + np.asarray(indices).ravel())
+        tree[self._num_internal_nodes + np.asarray(indices)] = values
+        while nodes[0] > 1:
+            nodes = np.unique(nodes // 2)
+            tree[nodes] = tree[2 * nodes] + tree[2 * nodes + 1]
+
+    def find(self, value: float) -> int:
+        """Return the index of the leaf where the cumulative sum of the
+        values (from the first leaf) exceeds `value` (in `[0, total)`)."""
+        tree = self._tree
+        node = 1
+        while node < self._num_internal_nodes:
+            left = 2 * node
+            # Going right is avoided when the right subtree is empty (which
+            # rounding errors could otherwise lead to).
+            if value < tree[left] or tree[left + 1] <= 0.0:
+                node = left
+            else:
+                value -= tree[left]
+                node = left + 1
+        return node - self._num_internal_nodes
+
+
+class PrioritizedTaskSampler(TaskSampler):
+    def __init__(self, num_tasks: int, initial_priority: float = 1.0) -> None:
+        """Sample the tasks in proportion to their priorities (eg learning
+        progress or failure rate), stored in a `SumTree`: updating the
+        priorities and sampling a task cost O(log(num_tasks)).
+
+        .. code-block:: python
+
+            sampler = PrioritizedTaskSampler(num_tasks=10000)
+            env = NTasksId(env, n_tasks=10000, task_sampler=sampler)
+            ...
+            sampler.update(task_ids, priorities)
+
+        Args:
+            num_tasks (int): number of tasks.
+            initial_priority (float, optional): priority of every task
+                before it is updated. Defaults to 1.0.
+        """
+        super().__init__(num_tasks=num_tasks)
+        self.sum_tree = SumTree(capacity=num_tasks)
+        self.sum_tree.update(np.arange(num_tasks), np.full(num_tasks, initial_priority))
+
+    def update(
+        self,
+        task_ids: Union[int, Sequence[int], np.ndarray],
+        priorities: Union[float, Sequence[float], np.ndarray],
+    ) -> None:
+        """Set the (non-negative) priorities of some tasks."""
+        self.sum_tree.update(task_ids, priorities)
+
+    def get_priorities(
+        self, task_ids: Union[int, Sequence[int], np.ndarray]
+    ) -> np.ndarray:
+        """Return the priorities of some tasks."""
+        return self.sum_tree.get(task_ids)
+
+    def sample(self, np_random: RandomState) -> int:
+        total = self.sum_tree.total
+        if total <= 0.0:
+            raise ValueError("at least one task should have a positive priority.")
+        return self.sum_tree.find(np_random.uniform(0.0, total))
+
+
+def get_task_sampler(
+    task_sampler: Optional[TaskSampler], num_tasks: int
+) -> TaskSampler:
+    """Return `task_sampler` (checking its number of tasks), or a uniform
+    sampler when it is None."""
+    if task_sampler is None:
+        return UniformTaskSampler(num_tasks=num_tasks)
+    if task_sampler.num_tasks != num_tasks:
+        raise ValueError(
+            f"task_sampler samples among {task_sampler.num_tasks} tasks "
+            f"while there are {num_tasks} tasks."
+        )
+    return task_sampler
@@ -0,0 +1,30 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Utilities to compare and hash task states."""
+
+from typing import Any
+
+import numpy as np
+
+
+def canonicalize_task_state(value: Any) -> Any:
+    """Convert a `task_state` into a canonical (hashable) form: the arrays,
+    lists and tuples are converted into tuples, the dictionaries into
+    sorted tuples of `(key, value)` pairs and the numpy scalars into
+    Python scalars."""
+    if isinstance(value, np.ndarray):
+        return canonicalize_task_state(value.tolist())
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return tuple(canonicalize_task_state(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(
+            sorted(
+                (
+                    (canonicalize_task_state(key), canonicalize_task_state(item))
+                    for key, item in value.items()
+                ),
+                key=repr,
+            )
+        )
+    return value
@@ -0,0 +1,309 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Chunked, columnar storage of trajectories (one `.npy` file per column and
+per chunk, grouped by task)."""
+
+import os
+import pickle
+import queue
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from mtenv.utils.task_state import canonicalize_task_state
+from mtenv.utils.types import TaskStateType
+
+ColumnsType = Dict[str, np.ndarray]
+
+_TASK_DIR_PREFIX = "task_"
+_CHUNK_DIR_PREFIX = "chunk_"
+_TASK_STATE_FILE = "task_state.pkl"
+_METADATA_FILE = "metadata.pkl"
+
+
+def flatten_transition(transition: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """Flatten a (nested) dictionary into a dictionary of columns, whose
+    names are the `.` separated keys of the leaves."""
+    columns: Dict[str, Any] = {}
+    for key, value in transition.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            columns.update(flatten_transition(value, prefix=f"{name}."))
+        else:
+            columns[name] = value
+    return columns
+
+
+def unflatten_transition(columns: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of `flatten_transition`."""
+    transition: Dict[str, Any] = {}
+    for name, value in columns.items():
+        *keys, last_key = name.split(".")
+        node = transition
+        for key in keys:
+            node = node.setdefault(key, {})
+        node[last_key] = value
+    return transition
+
+
+def task_state_key(task_state: TaskStateType) -> bytes:
+    """Key identifying a `task_state`, which does not depend on the types of
+    its containers and numbers (eg `np.int64(3)` and `3`, or
+    `np.array([0.5])` and `[0.5]`, have the same key)."""
+    return pickle.dumps(canonicalize_task_state(task_state))
+
+
+def _get_task_dir(root_dir: str, task_id: int) -> str:
+    return os.path.join(root_dir, f"{_TASK_DIR_PREFIX}{task_id:05d}")
+
+
+def _list_dirs(path: str, prefix: str) -> List[str]:
+    if not os.path.isdir(path):
+        return []
+    return sorted(
+        name
+        for name in os.listdir(path)
+        if name.startswith(prefix)
+        and not name.endswith(".tmp")
+        and os.path.isdir(os.path.join(path, name))
+    )
+
+
+class _ChunkBuffer:
+    def __init__(self, task_dir: str, chunk_index: int) -> None:
+        """Preallocated columns of the chunk being filled for one task."""
+        self.task_dir = task_dir
+        self.chunk_index = chunk_index
+        self.columns: ColumnsType = {}
+        self.size = 0
+
+
+class TrajectoryWriter:
+    def __init__(
+        self, root_dir: str, chunk_size: int = 1024, max_queue_size: int = 8
+    ) -> None:
+        """Write transitions into chunked, columnar files, grouped by task.
+
+        The transitions of each task are copied into preallocated columns.
+        When `chunk_size` transitions of a task are collected, the chunk is
+        handed to a background thread which saves each column as a `.npy`
+        file (which can be memory-mapped when read back, refer
+        `TrajectoryReader`). At most `max_queue_size` chunks wait to be
+        written: when the disk can not keep up, `add` blocks.
+
+        The layout of `root_dir` is::
+
+            task_00000/task_state.pkl
+            task_00000/chunk_000000/<column>.npy
+            ...
+
+        Transitions can be added to a `root_dir` which already contains
+        trajectories: the existing tasks and chunks are kept.
+
+        Args:
+            root_dir (str): directory to write the trajectories into.
+            chunk_size (int, optional): number of transitions per chunk.
+                Defaults to 1024.
+            max_queue_size (int, optional): maximum number of chunks
+                waiting to be written. Defaults to 8.
+        """
+        self.root_dir = root_dir
+        self.chunk_size = chunk_size
+        os.makedirs(root_dir, exist_ok=True)
+        # Ids of the tasks, keyed by `task_state_key`.
+        self._task_ids: Dict[bytes, int] = {}
+        for task_id, task_state in enumerate(TrajectoryReader(root_dir).task_states):
+            self._task_ids[task_state_key(task_state)] = task_id
+        self._buffers: Dict[int, _ChunkBuffer] = {}
+        self._queue: "queue.Queue[Optional[Tuple[str, int, ColumnsType]]]" = (
+            queue.Queue(maxsize=max_queue_size)
+        )
+        self._error: Optional[BaseException] = None
+        self._is_closed = False
+        self._thread = threading.Thread(target=self._write_chunks, daemon=True)
+        self._thread.start()
+
+    def save_metadata(self, metadata: Dict[str, Any]) -> None:
+        """Save (picklable) metadata, eg the spaces of the environment,
+        alongside the trajectories."""
+        with open(os.path.join(self.root_dir, _METADATA_FILE), "wb") as f:
+            pickle.dump(metadata, f)
+
+    def get_task_id(self, task_state: TaskStateType) -> int:
+        """Return the id of a task (assigning a new one, and saving its
+        `task_state`, the first time the task is seen)."""
+        key = task_state_key(task_state)
+        task_id = self._task_ids.get(key)
+        if task_id is None:
+            task_id = len(self._task_ids)
+            self._task_ids[key] = task_id
+            task_dir = _get_task_dir(self.root_dir, task_id)
+            os.makedirs(task_dir, exist_ok=True)
+            with open(os.path.join(task_dir, _TASK_STATE_FILE), "wb") as f:
+                pickle.dump(task_state, f)
+        return task_id
+
+    def add(self, task_id: int, transition: Dict[str, Any]) -> None:
+        """Add a transition of a task.
+
+        Args:
+            task_id (int): id of the task (refer `get_task_id`).
+            transition (Dict[str, Any]): (nested) dictionary of values. The
+                values are copied, so the caller can reuse them.
+        """
+        self._check_is_open()
+        buffer = self._buffers.get(task_id)
+        if buffer is None:
+            task_dir = _get_task_dir(self.root_dir, task_id)
+            buffer = _ChunkBuffer(
+                task_dir=task_dir,
+                chunk_index=len(_list_dirs(task_dir, _CHUNK_DIR_PREFIX)),
+            )
+            self._buffers[task_id] = buffer
+        for name, value in flatten_transition(transition).items():
+            column = buffer.columns.get(name)
+            if column is None:
+                value = np.asarray(value)
+                column = np.empty((self.chunk_size,) + value.shape, dtype=value.dtype)
+                buffer.columns[name] = column
+            column[buffer.size] = value
+        buffer.size += 1
+        if buffer.size == self.chunk_size:
+            self._submit(buffer)
+
+    def _submit(self, buffer: _ChunkBuffer) -> None:
+        columns = {
+            name: column[: buffer.size] for name, column in buffer.columns.items()
+        }
+        self._queue.put((buffer.task_dir, buffer.chunk_index, columns))
+        # The submitted columns are owned by the writing thread from now on.
+        buffer.columns = {}
+        buffer.chunk_index += 1
+        buffer.size = 0
+
+    def _write_chunks(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if self._error is None:
+                    self._write_chunk(*item)
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _write_chunk(task_dir: str, chunk_index: int, columns: ColumnsType) -> None:
+        chunk_dir = os.path.join(task_dir, f"{_CHUNK_DIR_PREFIX}{chunk_index:06d}")
+        # Write into a temporary directory first so that readers only see
+        # complete chunks.
+        tmp_dir = f"{chunk_dir}.tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+        for name, column in columns.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), column)
+        os.rename(tmp_dir, chunk_dir)
+
+    def _check_is_open(self) -> None:
+        if self._is_closed:
+            raise RuntimeError("the writer is closed.")
+        if self._error is not None:
+            raise RuntimeError("failed to write the trajectories.") from self._error
+
+    def flush(self) -> None:
+        """Write the (partial) chunks of all the tasks and wait until all
+        the chunks are written."""
+        self._check_is_open()
+        for buffer in self._buffers.values():
+            if buffer.size > 0:
+                self._submit(buffer)
+        self._queue.join()
+        self._check_is_open()
+
+    def close(self) -> None:
+        """Flush the chunks and stop the writing thread."""
+        if self._is_closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._is_closed = True
+            self._queue.put(None)
+            self._thread.join()
+
+
+class TrajectoryReader:
+    def __init__(self, root_dir: str) -> None:
+        """Read the trajectories written by `TrajectoryWriter`.
+
+        Args:
+            root_dir (str): directory containing the trajectories.
+        """
+        self.root_dir = root_dir
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Metadata saved by `TrajectoryWriter.save_metadata` (empty when
+        there is none)."""
+        path = os.path.join(self.root_dir, _METADATA_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, "rb") as f:
+            metadata: Dict[str, Any] = pickle.load(f)
+        return metadata
+
+    @property
+    def task_states(self) -> List[TaskStateType]:
+        """`task_state` of each task (indexed by task id)."""
+        task_states = []
+        for name in _list_dirs(self.root_dir, _TASK_DIR_PREFIX):
+            with open(os.path.join(self.root_dir, name, _TASK_STATE_FILE), "rb") as f:
+                task_states.append(pickle.load(f))
+        return task_states
+
+    def get_num_chunks(self, task_id: int) -> int:
+        """Return the number of chunks written for a task (0 when the task
+        has no transition)."""
+        return len(_list_dirs(_get_task_dir(self.root_dir, task_id), _CHUNK_DIR_PREFIX))
+
+    def iter_chunks(self, task_id: int, mmap: bool = True) -> Iterator[ColumnsType]:
+        """Iterate over the chunks of a task.
+
+        Args:
+            task_id (int): id of the task.
+            mmap (bool, optional): should the columns be memory-mapped
+                (read-only, without copying them in memory)? Defaults to
+                True.
+
+        Returns:
+            Iterator[ColumnsType]: columns of each chunk.
+        """
+        task_dir = _get_task_dir(self.root_dir, task_id)
+        for chunk_name in _list_dirs(task_dir, _CHUNK_DIR_PREFIX):
+            chunk_dir = os.path.join(task_dir, chunk_name)
+            yield {
+                file_name[: -len(".npy")]: np.load(
+                    os.path.join(chunk_dir, file_name),
+                    mmap_mode="r" if mmap else None,
+                )
+                for file_name in sorted(os.listdir(chunk_dir))
+                if file_name.endswith(".npy")
+            }
+
+    def load(self, task_id: int) -> ColumnsType:
+        """Load all the transitions of a task (concatenating the chunks).
+
+        Args:
+            task_id (int): id of the task.
+
+        Returns:
+            ColumnsType: dictionary of columns.
+        """
+        chunks = list(self.iter_chunks(task_id=task_id))
+        if not chunks:
+            return {}
+        return {
+            name: np.concatenate([chunk[name] for chunk in chunks])
+            for name in chunks[0]
+        }
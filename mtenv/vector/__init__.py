@@ -0,0 +1,9 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+from mtenv.vector.async_mtenv import AsyncMTEnv, AsyncMTEnvPool  # noqa: F401
+from mtenv.vector.scheduling import (  # noqa: F401
+    LoadBalancedTaskScheduler,
+    StratifiedTaskScheduler,
+)
+from mtenv.vector.subproc_vector_mtenv import SubprocVectorMTEnv  # noqa: F401
+from mtenv.vector.sync_vector_mtenv import SyncVectorMTEnv  # noqa: F401
+from mtenv.vector.vector_mtenv import VectorMTEnv  # noqa: F401
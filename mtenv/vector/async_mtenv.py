@@ -0,0 +1,276 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Asyncio facade to run many multitask environments on a bounded pool of
+worker threads or processes."""
+
+import asyncio
+import itertools
+import multiprocessing as mp
+import sys
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from gym.spaces.space import Space
+from gym.vector.utils import CloudpickleWrapper
+
+from mtenv import MTEnv
+from mtenv.utils.types import ActionType, ObsType, StepReturnType, TaskStateType
+from mtenv.vector.vector_mtenv import EnvFnType
+
+# Environments hosted by the current process (the main process for the
+# thread pools, a worker process for the process pools), keyed by a unique
+# key.
+_hosted_envs: Dict[int, MTEnv] = {}
+_env_keys: Iterator[int] = itertools.count()
+
+
+def _make_hosted_env(env_key: int, env_fn: EnvFnType) -> Tuple[Space, Space]:
+    env = env_fn()
+    _hosted_envs[env_key] = env
+    return env.action_space, env.observation_space
+
+
+def _call_hosted_env(env_key: int, name: str, args: Tuple[Any, ...]) -> Any:
+    return getattr(_hosted_envs[env_key], name)(*args)
+
+
+def _make_process_executor(context: Optional[str]) -> ProcessPoolExecutor:
+    """Make a single-process executor, whose process is started with the
+    `context` start method."""
+    if sys.version_info >= (3, 7):
+        return ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context(context))
+    # `mp_context` needs Python 3.7: the default start method is used.
+    if context is not None and context != mp.get_start_method():
+        raise ValueError(f"context={context} needs Python 3.7 or later.")
+    return ProcessPoolExecutor(max_workers=1)
+
+
+def _close_hosted_env(env_key: int) -> None:
+    _hosted_envs.pop(env_key).close()
+
+
+class AsyncMTEnvPool:
+    def __init__(
+        self,
+        num_workers: int,
+        use_processes: bool = False,
+        max_pending_calls: Optional[int] = None,
+        context: Optional[str] = None,
+    ) -> None:
+        """Bounded pool of workers running the environments of
+        `AsyncMTEnv` facades, to multiplex many concurrent episodes in one
+        asyncio event loop.
+
+        With threads, the environments live in the current process and
+        any worker can run any environment: this suits the simulators
+        which release the GIL (eg MuJoCo). With processes, each
+        environment lives in one worker process (the environments are
+        spread over the workers) and its calls are sent to that worker.
+
+        At most `max_pending_calls` calls are submitted to the workers at
+        once: the coroutines of the other calls wait (without consuming a
+        worker or queueing work) until a call completes, which provides
+        backpressure to the callers.
+
+        .. code-block:: python
+
+            async with AsyncMTEnvPool(num_workers=8) as pool:
+                env = await pool.make(lambda: mtenv.make("MT-HiPBMDP-..."))
+                obs = await env.reset()
+                obs, reward, done, info = await env.step(action)
+
+        Args:
+            num_workers (int): number of worker threads or processes.
+            use_processes (bool, optional): run the environments in worker
+                processes instead of threads. Defaults to False.
+            max_pending_calls (Optional[int], optional): maximum number of
+                calls submitted to the workers at once. Defaults to None
+                (twice the number of workers).
+            context (Optional[str], optional): multiprocessing start method
+                of the worker processes (only the default start method is
+                supported before Python 3.7). Defaults to None (the default
+                start method of the platform).
+        """
+        if num_workers <= 0:
+            raise ValueError(f"num_workers={num_workers} should be positive.")
+        self.num_workers = num_workers
+        self.use_processes = use_processes
+        self.max_pending_calls = (
+            2 * num_workers if max_pending_calls is None else max_pending_calls
+        )
+        self._executors: List[Executor]
+        if use_processes:
+            # One single-process executor per worker, so that the calls to
+            # an environment run in the process hosting it.
+            self._executors = [
+                _make_process_executor(context) for _ in range(num_workers)
+            ]
+        else:
+            self._executors = [ThreadPoolExecutor(max_workers=num_workers)]
+        self._num_envs = 0
+        self._hosted_env_keys: List[int] = []
+        # Created lazily, in the event loop.
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.closed = False
+
+    async def make(self, env_fn: EnvFnType) -> "AsyncMTEnv":
+        """Construct an environment (in a worker) and return its facade.
+
+        Args:
+            env_fn (EnvFnType): function to construct the environment
+                (serialized with `cloudpickle` for the worker processes).
+
+        Returns:
+            AsyncMTEnv: facade of the environment.
+        """
+        if self.closed:
+            raise RuntimeError("the pool is closed.")
+        env_key = next(_env_keys)
+        self._hosted_env_keys.append(env_key)
+        executor = self._executors[self._num_envs % len(self._executors)]
+        self._num_envs += 1
+        action_space, observation_space = await self.run(
+            executor, _make_hosted_env, env_key, CloudpickleWrapper(env_fn)
+        )
+        return AsyncMTEnv(
+            pool=self,
+            executor=executor,
+            env_key=env_key,
+            action_space=action_space,
+            observation_space=observation_space,
+        )
+
+    async def submit(self, executor: Executor, fn: Any, *args: Any) -> "Future[Any]":
+        """Submit `fn(*args)` to `executor` once fewer than
+        `max_pending_calls` calls are pending.
+
+        Returns:
+            Future[Any]: future of the call.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pending_calls)
+        semaphore = self._semaphore
+        await semaphore.acquire()
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            semaphore.release()
+            raise
+        # `get_event_loop` returns the running loop (`get_running_loop`
+        # needs Python 3.7).
+        loop = asyncio.get_event_loop()
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(semaphore.release))
+        return future
+
+    async def run(self, executor: Executor, fn: Any, *args: Any) -> Any:
+        """Run `fn(*args)` on `executor` (refer `submit`).
+
+        When the awaiting coroutine is cancelled, the call is dropped if it
+        has not started yet (a running call completes in the worker).
+        """
+        return await asyncio.wrap_future(await self.submit(executor, fn, *args))
+
+    def close(self) -> None:
+        """Shut the workers down, once the pending calls complete. The
+        environments hosted in the current process (with threads) are
+        closed, the worker processes exit with their environments."""
+        if not self.closed:
+            for executor in self._executors:
+                executor.shutdown(wait=True)
+            if not self.use_processes:
+                for env_key in self._hosted_env_keys:
+                    if env_key in _hosted_envs:
+                        _close_hosted_env(env_key)
+            self.closed = True
+
+    async def __aenter__(self) -> "AsyncMTEnvPool":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        self.close()
+
+
+class AsyncMTEnv:
+    def __init__(
+        self,
+        pool: AsyncMTEnvPool,
+        executor: Executor,
+        env_key: int,
+        action_space: Space,
+        observation_space: Space,
+    ) -> None:
+        """Asyncio facade of a multitask environment running on an
+        `AsyncMTEnvPool` (use `AsyncMTEnvPool.make` to construct it).
+
+        The calls to an environment are run one at a time, in the order of
+        the calls. If a coroutine awaiting a call is cancelled, the next
+        call waits for the cancelled one to complete (or to be dropped, if
+        it had not started), so that the environment is never used by two
+        workers at once.
+        """
+        self.pool = pool
+        self.action_space = action_space
+        self.observation_space = observation_space
+        self._executor = executor
+        self._env_key = env_key
+        self._lock = asyncio.Lock()
+        self._last_call: Optional["Future[Any]"] = None
+        self.closed = False
+
+    async def call(self, name: str, *args: Any) -> Any:
+        """Call method `name` of the environment."""
+        if self.closed:
+            raise RuntimeError("the environment is closed.")
+        async with self._lock:
+            await self._wait_for_cancelled_call()
+            future = await self.pool.submit(
+                self._executor, _call_hosted_env, self._env_key, name, args
+            )
+            self._last_call = future
+            # When the awaiting coroutine is cancelled, the call is dropped
+            # if it has not started yet.
+            return await asyncio.wrap_future(future)
+
+    async def _wait_for_cancelled_call(self) -> None:
+        if self._last_call is not None and not self._last_call.done():
+            # The previous call was cancelled while running.
+            await asyncio.wait([asyncio.wrap_future(self._last_call)])
+
+    async def step(self, action: ActionType) -> StepReturnType:
+        step_return: StepReturnType = await self.call("step", action)
+        return step_return
+
+    async def reset(self) -> ObsType:
+        obs: ObsType = await self.call("reset")
+        return obs
+
+    async def get_task_state(self) -> TaskStateType:
+        return await self.call("get_task_state")
+
+    async def set_task_state(self, task_state: TaskStateType) -> None:
+        await self.call("set_task_state", task_state)
+
+    async def sample_task_state(self) -> TaskStateType:
+        return await self.call("sample_task_state")
+
+    async def reset_task_state(self) -> None:
+        await self.call("reset_task_state")
+
+    async def seed(self, seed: Optional[int] = None) -> List[int]:
+        seeds: List[int] = await self.call("seed", seed)
+        return seeds
+
+    async def seed_task(self, seed: Optional[int] = None) -> List[int]:
+        seeds: List[int] = await self.call("seed_task", seed)
+        return seeds
+
+    async def close(self) -> None:
+        if not self.closed:
+            async with self._lock:
+                await self._wait_for_cancelled_call()
+                await self.pool.run(self._executor, _close_hosted_env, self._env_key)
+            self.closed = True
@@ -0,0 +1,369 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Schedulers to assign tasks to the environments of a `VectorMTEnv`."""
+
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from mtenv.utils import seeding
+from mtenv.utils.types import ObsType
+from mtenv.vector.vector_mtenv import VectorMTEnv
+
+
+class TaskScheduler(ABC):
+    """Base class of the schedulers which assign the ids of the tasks to
+    the environments (slots) of a `VectorMTEnv` (with `set_task_state`, eg
+    of `MultiEnvWrapper` or `NTasksId`). The environments should not
+    sample their own tasks (eg with `SampleRandomTask`)."""
+
+    @abstractmethod
+    def _get_next_task_ids(self, indices: List[int]) -> List[int]:
+        """Return the ids of the next tasks of the environments `indices`."""
+        pass
+
+    def assign(
+        self, venv: VectorMTEnv, indices: Optional[Sequence[int]] = None
+    ) -> List[int]:
+        """Set the next tasks of (a subset of) the environments.
+
+        Args:
+            venv (VectorMTEnv): vector environment.
+            indices (Optional[Sequence[int]], optional): indices of the
+                environments. Defaults to None (all the environments).
+
+        Returns:
+            List[int]: ids of the assigned tasks (one per environment).
+        """
+        _indices = list(range(venv.num_envs)) if indices is None else list(indices)
+        task_ids = self._get_next_task_ids(_indices)
+        venv.set_task_state(task_ids, indices=_indices)
+        return task_ids
+
+    def reset(
+        self, venv: VectorMTEnv, indices: Optional[Sequence[int]] = None
+    ) -> List[ObsType]:
+        """Assign the next tasks to (a subset of) the environments and
+        reset them."""
+        self.assign(venv=venv, indices=indices)
+        return venv.reset(indices=indices)
+
+
+class StratifiedTaskScheduler(TaskScheduler):
+    def __init__(
+        self,
+        num_tasks: int,
+        num_envs: int,
+        step_costs: Optional[Sequence[float]] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Assign the ids of `num_tasks` tasks to the `num_envs`
+        environments (slots) of a vector environment in a stratified
+        order: in each epoch, every task is assigned exactly once (in a
+        random order), so the tasks are equally represented in the
+        rollouts.
+
+        When the (relative) cost of a step of each task is known, the
+        tasks of an epoch are also co-scheduled by cost: they are sorted by
+        cost and consecutive groups of `num_envs` tasks (which tend to run
+        in the same batch) are assigned in a random order. The batches
+        then mix fewer cheap and expensive tasks, so fewer environments
+        wait for the slowest one.
+
+        .. code-block:: python
+
+            scheduler = StratifiedTaskScheduler(num_tasks=50, num_envs=10)
+            obs = scheduler.reset(venv)
+            ...
+            obs = scheduler.reset(venv, indices=done_indices)
+
+        Args:
+            num_tasks (int): number of tasks.
+            num_envs (int): number of environments of the vector
+                environment.
+            step_costs (Optional[Sequence[float]], optional): cost (eg
+                latency) of a step of each task. Defaults to None (the
+                tasks are not co-scheduled).
+            seed (Optional[int], optional): seed of the order of the
+                tasks. Defaults to None.
+        """
+        if num_tasks <= 0:
+            raise ValueError(f"num_tasks={num_tasks} should be positive.")
+        self.num_tasks = num_tasks
+        self.num_envs = num_envs
+        self.step_costs: Optional[np.ndarray] = None
+        if step_costs is not None:
+            self.set_step_costs(step_costs)
+        self.np_random, _ = seeding.np_random(seed)
+        self.epoch = 0
+        self._queue: Deque[int] = deque()
+
+    def set_step_costs(self, step_costs: Sequence[float]) -> None:
+        """Set the cost of a step of each task (used from the next
+        epoch)."""
+        costs = np.asarray(step_costs, dtype=np.float64)
+        if costs.shape != (self.num_tasks,):
+            raise ValueError(
+                f"step_costs should contain one cost per task ({self.num_tasks})."
+            )
+        self.step_costs = costs
+
+    def _get_epoch_order(self) -> np.ndarray:
+        order = self.np_random.permutation(self.num_tasks)
+        if self.step_costs is None:
+            return order
+        # The sort is stable, so the tasks with the same cost remain in a
+        # random order.
+        order = order[np.argsort(self.step_costs[order], kind="stable")]
+        groups = [
+            order[start : start + self.num_envs]
+            for start in range(0, self.num_tasks, self.num_envs)
+        ]
+        return np.concatenate(
+            [groups[index] for index in self.np_random.permutation(len(groups))]
+        )
+
+    def next_task_ids(self, num_task_ids: int) -> List[int]:
+        """Return the ids of the next `num_task_ids` tasks (starting new
+        epochs as needed)."""
+        task_ids = []
+        for _ in range(num_task_ids):
+            if not self._queue:
+                self._queue.extend(self._get_epoch_order().tolist())
+                self.epoch += 1
+            task_ids.append(self._queue.popleft())
+        return task_ids
+
+    def _get_next_task_ids(self, indices: List[int]) -> List[int]:
+        return self.next_task_ids(len(indices))
+
+
+def lpt_assignment(
+    costs: Union[Sequence[float], np.ndarray], num_workers: int
+) -> List[List[int]]:
+    """Partition the tasks among `num_workers` workers so that their mean
+    costs are balanced.
+
+    As each worker cycles through its tasks, its step cost is the mean
+    cost of its tasks: the workers get the same number of tasks (up to
+    one), so that balancing the sums balances the means, and the tasks,
+    from the most to the least expensive, are assigned to the least loaded
+    worker which still has room (Longest Processing Time first heuristic).
+
+    Args:
+        costs (Union[Sequence[float], np.ndarray]): cost of each task.
+        num_workers (int): number of workers.
+
+    Returns:
+        List[List[int]]: ids of the tasks of each worker.
+    """
+    costs = np.asarray(costs, dtype=np.float64)
+    num_tasks_per_worker, num_extra_tasks = divmod(len(costs), num_workers)
+    assignment: List[List[int]] = [[] for _ in range(num_workers)]
+    loads = np.zeros(num_workers)
+    for task_id in np.argsort(-costs, kind="stable"):
+        counts = np.array([len(tasks) for tasks in assignment])
+        # A worker can get one more task than the others while some of the
+        # extra tasks are not assigned.
+        capacity = num_tasks_per_worker + (1 if num_extra_tasks > 0 else 0)
+        worker = int(np.argmin(np.where(counts < capacity, loads, np.inf)))
+        assignment[worker].append(int(task_id))
+        loads[worker] += costs[task_id]
+        if len(assignment[worker]) > num_tasks_per_worker:
+            num_extra_tasks -= 1
+    return assignment
+
+
+def _imbalance(loads: np.ndarray) -> float:
+    mean = loads.mean()
+    return float(loads.max() / mean) if mean > 0 else 1.0
+
+
+class LoadBalancedTaskScheduler(TaskScheduler):
+    def __init__(
+        self,
+        num_tasks: int,
+        num_envs: int,
+        step_costs: Optional[Sequence[float]] = None,
+        smoothing: float = 0.05,
+    ) -> None:
+        """Partition the tasks among the `num_envs` environments (workers)
+        of a vector environment so that the workers have the same step
+        latency (the mean step latency of their tasks): each worker hosts
+        a subset of the tasks and cycles through them (one task per
+        episode). The subsets are computed with
+        `lpt_assignment`, from the step latency of each task, which is
+        measured online (exponential moving average).
+
+        `rebalance` recomputes the subsets from the latest estimates. The
+        tasks which migrate to another worker keep running in their
+        previous worker until the end of the current episode.
+        `balance_report` reports the estimated and measured balance.
+
+        .. code-block:: python
+
+            venv = SubprocVectorMTEnv([lambda: StepLatency(build(...))] * 8)
+            scheduler = LoadBalancedTaskScheduler(num_tasks=50, num_envs=8)
+            obs = scheduler.reset(venv)
+            ...
+            obs, rewards, dones, infos = venv.step(actions)
+            scheduler.update([info["step_latency"] for info in infos])
+            ...
+            scheduler.rebalance()
+
+        Args:
+            num_tasks (int): number of tasks (at least `num_envs`).
+            num_envs (int): number of environments of the vector
+                environment.
+            step_costs (Optional[Sequence[float]], optional): initial
+                estimates of the step latency of each task. Defaults to
+                None (the tasks have the same cost until they are
+                measured).
+            smoothing (float, optional): weight of a new measurement in
+                the moving average of the latency. Defaults to 0.05.
+        """
+        if num_tasks < num_envs:
+            raise ValueError(
+                f"num_tasks={num_tasks} should be at least num_envs={num_envs}."
+            )
+        self.num_tasks = num_tasks
+        self.num_envs = num_envs
+        self.smoothing = smoothing
+        # NaN marks the tasks which are not measured yet.
+        self.step_latencies = np.full(num_tasks, np.nan)
+        if step_costs is not None:
+            self.step_latencies[:] = step_costs
+        self.current_task_ids: List[Optional[int]] = [None] * num_envs
+        self._cursors = [0] * num_envs
+        self._worker_latency_sums = np.zeros(num_envs)
+        self._worker_step_counts = np.zeros(num_envs, dtype=np.int64)
+        self.worker_tasks = lpt_assignment(self.get_step_costs(), num_envs)
+
+    def get_step_costs(self) -> np.ndarray:
+        """Return the estimated step latency of each task (the tasks which
+        are not measured yet have the mean latency of the measured
+        tasks)."""
+        costs = self.step_latencies.copy()
+        is_unknown = np.isnan(costs)
+        if is_unknown.all():
+            costs[:] = 1.0
+        else:
+            costs[is_unknown] = np.nanmean(costs)
+        return costs
+
+    def next_task_ids(self, indices: Sequence[int]) -> List[int]:
+        """Return the ids of the next tasks of the environments `indices`
+        (the next task of the subset of each environment)."""
+        task_ids = []
+        for index in indices:
+            tasks = self.worker_tasks[index]
+            task_id = tasks[self._cursors[index] % len(tasks)]
+            self._cursors[index] += 1
+            self.current_task_ids[index] = task_id
+            task_ids.append(task_id)
+        return task_ids
+
+    def _get_next_task_ids(self, indices: List[int]) -> List[int]:
+        return self.next_task_ids(indices)
+
+    def update(
+        self, latencies: Sequence[float], indices: Optional[Sequence[int]] = None
+    ) -> None:
+        """Record the latency of a step of (a subset of) the environments
+        (for the task assigned to each environment).
+
+        Args:
+            latencies (Sequence[float]): latency of the step of each
+                environment.
+            indices (Optional[Sequence[int]], optional): indices of the
+                environments. Defaults to None (all the environments).
+        """
+        _indices = list(range(self.num_envs)) if indices is None else list(indices)
+        for index, latency in zip(_indices, latencies):
+            task_id = self.current_task_ids[index]
+            if task_id is None:
+                raise ValueError(f"no task is assigned to environment {index}.")
+            previous = self.step_latencies[task_id]
+            self.step_latencies[task_id] = (
+                latency
+                if np.isnan(previous)
+                else previous + self.smoothing * (latency - previous)
+            )
+            self._worker_latency_sums[index] += latency
+            self._worker_step_counts[index] += 1
+
+    def rebalance(self) -> int:
+        """Recompute the tasks of each worker from the latest estimates of
+        the latencies.
+
+        The new subsets are matched with the workers which already host
+        most of their tasks, to limit the migrations.
+
+        Returns:
+            int: number of tasks which migrate to another worker.
+        """
+        subsets = lpt_assignment(self.get_step_costs(), self.num_envs)
+        previous_workers = {
+            task_id: worker
+            for worker, tasks in enumerate(self.worker_tasks)
+            for task_id in tasks
+        }
+        overlaps = np.zeros((self.num_envs, self.num_envs), dtype=np.int64)
+        for subset_index, tasks in enumerate(subsets):
+            for task_id in tasks:
+                overlaps[subset_index, previous_workers[task_id]] += 1
+        # Greedy matching, from the largest overlap.
+        worker_tasks: List[List[int]] = [[] for _ in range(self.num_envs)]
+        free_subsets = set(range(self.num_envs))
+        free_workers = set(range(self.num_envs))
+        for flat_index in np.argsort(-overlaps, axis=None, kind="stable"):
+            subset_index, worker = divmod(int(flat_index), self.num_envs)
+            if subset_index in free_subsets and worker in free_workers:
+                worker_tasks[worker] = subsets[subset_index]
+                free_subsets.remove(subset_index)
+                free_workers.remove(worker)
+        num_migrations = sum(
+            previous_workers[task_id] != worker
+            for worker, tasks in enumerate(worker_tasks)
+            for task_id in tasks
+        )
+        for worker, tasks in enumerate(worker_tasks):
+            if sorted(tasks) != sorted(self.worker_tasks[worker]):
+                self._cursors[worker] = 0
+        self.worker_tasks = worker_tasks
+        return num_migrations
+
+    def balance_report(self) -> Dict[str, Any]:
+        """Return the balance of the workers.
+
+        Returns:
+            Dict[str, Any]: `worker_tasks` (ids of the tasks of each
+            worker), `estimated_step_latency` (mean of the estimated step
+            latencies of the tasks of each worker), `measured_step_latency`
+            (mean measured step latency of each worker since the last call
+            to `reset_stats`), and the corresponding imbalances
+            (`estimated_imbalance` and `measured_imbalance`: ratio of the
+            largest to the mean step latency, 1.0 when the workers are
+            balanced).
+        """
+        costs = self.get_step_costs()
+        estimated = np.array([costs[tasks].mean() for tasks in self.worker_tasks])
+        with np.errstate(invalid="ignore"):
+            measured = self._worker_latency_sums / self._worker_step_counts
+        is_measured = self._worker_step_counts > 0
+        return {
+            "worker_tasks": [list(tasks) for tasks in self.worker_tasks],
+            "estimated_step_latency": estimated.tolist(),
+            "estimated_imbalance": _imbalance(estimated),
+            "measured_step_latency": measured.tolist(),
+            "measured_imbalance": (
+                _imbalance(measured[is_measured]) if is_measured.any() else np.nan
+            ),
+        }
+
+    def reset_stats(self) -> None:
+        """Drop the measured latency of each worker (the estimates of the
+        latency of each task are kept)."""
+        self._worker_latency_sums[:] = 0.0
+        self._worker_step_counts[:] = 0
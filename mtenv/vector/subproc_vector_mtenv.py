@@ -0,0 +1,177 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Run a batch of multitask environments in parallel, with one worker
+process per environment."""
+
+import multiprocessing as mp
+import traceback
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from gym.vector.utils import CloudpickleWrapper
+
+from mtenv.utils.types import ActionType
+from mtenv.vector.vector_mtenv import EnvFnType, VectorMTEnv
+
+
+def _worker(
+    remote: Connection, parent_remote: Connection, env_fn: CloudpickleWrapper
+) -> None:
+    parent_remote.close()
+    env = env_fn()
+    while True:
+        try:
+            command, data = remote.recv()
+        except EOFError:
+            break
+        if command == "close":
+            env.close()
+            remote.send((True, None))
+            break
+        try:
+            if command == "getattr":
+                output = getattr(env, data)
+            elif command == "apply":
+                fn, args = data.fn
+                output = fn(env, *args)
+            else:
+                name, args = data
+                output = getattr(env, name)(*args)
+            remote.send((True, output))
+        except Exception:
+            remote.send((False, traceback.format_exc()))
+    remote.close()
+
+
+class SubprocVectorMTEnv(VectorMTEnv):
+    def __init__(
+        self, env_fns: Sequence[EnvFnType], context: Optional[str] = None
+    ) -> None:
+        """Run a batch of multitask environments in parallel, with one
+        worker process per environment.
+
+        The functions to construct the environments are serialized with
+        `cloudpickle` so they can be lambdas or closures.
+
+        Args:
+            env_fns (Sequence[EnvFnType]): functions to construct the
+                environments (one function per environment).
+            context (Optional[str], optional): multiprocessing start method
+                (`fork`, `spawn` or `forkserver`). Defaults to None (the
+                default start method of the platform).
+        """
+        ctx = mp.get_context(context)
+        self.remotes: List[Connection] = []
+        self.processes = []
+        for env_fn in env_fns:
+            remote, worker_remote = ctx.Pipe()
+            process = ctx.Process(  # type: ignore[attr-defined]
+                target=_worker,
+                args=(worker_remote, remote, CloudpickleWrapper(env_fn)),
+                daemon=True,
+            )
+            process.start()
+            worker_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+
+        self.remotes[0].send(("getattr", "action_space"))
+        self.remotes[0].send(("getattr", "observation_space"))
+        action_space, observation_space = self._receive(indices=[0, 0])
+        super().__init__(
+            num_envs=len(self.remotes),
+            action_space=action_space,
+            observation_space=observation_space,
+        )
+
+    def _send(
+        self,
+        name: str,
+        args_list: Optional[Sequence[Tuple[Any, ...]]],
+        indices: Sequence[int],
+    ) -> None:
+        if args_list is None:
+            args_list = [() for _ in indices]
+        assert len(args_list) == len(indices)
+        for index, args in zip(indices, args_list):
+            self.remotes[index].send(("call", (name, args)))
+
+    def _receive(self, indices: Sequence[int]) -> List[Any]:
+        results = [self.remotes[index].recv() for index in indices]
+        errors = [output for is_success, output in results if not is_success]
+        if errors:
+            raise RuntimeError(
+                f"{len(errors)} worker(s) raised an exception. First one:\n{errors[0]}"
+            )
+        return [output for _, output in results]
+
+    def call_each(
+        self,
+        name: str,
+        args_list: Optional[Sequence[Tuple[Any, ...]]] = None,
+        indices: Optional[Sequence[int]] = None,
+    ) -> List[Any]:
+        _indices = self._get_indices(indices)
+        self._check_not_waiting(_indices)
+        self._send(name=name, args_list=args_list, indices=_indices)
+        return self._receive(indices=_indices)
+
+    def apply_each(
+        self,
+        fn: Callable[..., Any],
+        args_list: Optional[Sequence[Tuple[Any, ...]]] = None,
+        indices: Optional[Sequence[int]] = None,
+    ) -> List[Any]:
+        _indices = self._get_indices(indices)
+        self._check_not_waiting(_indices)
+        if args_list is None:
+            args_list = [() for _ in _indices]
+        assert len(args_list) == len(_indices)
+        # `fn` and its arguments are serialized with `cloudpickle`, so they
+        # can be closures.
+        for index, args in zip(_indices, args_list):
+            self.remotes[index].send(("apply", CloudpickleWrapper((fn, args))))
+        return self._receive(indices=_indices)
+
+    def _check_not_waiting(self, indices: Sequence[int]) -> None:
+        busy_indices = [index for index in indices if index in self._waiting_actions]
+        if busy_indices:
+            raise RuntimeError(
+                f"the environments {busy_indices} are executing an action, "
+                "please call `step_wait` first."
+            )
+
+    def _start_steps(self, actions: Sequence[ActionType], indices: List[int]) -> None:
+        self._send(
+            name="step", args_list=[(action,) for action in actions], indices=indices
+        )
+
+    def _finish_steps(
+        self, actions: Sequence[ActionType], indices: List[int]
+    ) -> List[Any]:
+        return self._receive(indices=indices)
+
+    def poll(self, timeout: Optional[float] = 0.0) -> List[int]:
+        remotes = {
+            self.remotes[index]: index for index in sorted(self._waiting_actions)
+        }
+        if not remotes:
+            return []
+        ready_remotes = wait(list(remotes), timeout=timeout)
+        return sorted(remotes[remote] for remote in ready_remotes)  # type: ignore[index]
+
+    def _close(self) -> None:
+        # Drop the results of the pending steps.
+        for index in self._waiting_actions:
+            try:
+                self.remotes[index].recv()
+            except EOFError:
+                pass
+        self._waiting_actions.clear()
+        for remote in self.remotes:
+            try:
+                remote.send(("close", None))
+                remote.recv()
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self.processes:
+            process.join()
@@ -0,0 +1,51 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Run a batch of multitask environments sequentially, in the current
+process."""
+
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from mtenv.vector.vector_mtenv import EnvFnType, VectorMTEnv
+
+
+class SyncVectorMTEnv(VectorMTEnv):
+    def __init__(self, env_fns: Sequence[EnvFnType]) -> None:
+        """Run a batch of multitask environments sequentially, in the
+        current process.
+
+        Args:
+            env_fns (Sequence[EnvFnType]): functions to construct the
+                environments (one function per environment).
+        """
+        self.envs = [env_fn() for env_fn in env_fns]
+        super().__init__(
+            num_envs=len(self.envs),
+            action_space=self.envs[0].action_space,
+            observation_space=self.envs[0].observation_space,
+        )
+
+    def call_each(
+        self,
+        name: str,
+        args_list: Optional[Sequence[Tuple[Any, ...]]] = None,
+        indices: Optional[Sequence[int]] = None,
+    ) -> List[Any]:
+        _indices = self._get_indices(indices)
+        if args_list is None:
+            return [getattr(self.envs[index], name)() for index in _indices]
+        assert len(args_list) == len(_indices)
+        return [
+            getattr(self.envs[index], name)(*args)
+            for index, args in zip(_indices, args_list)
+        ]
+
+    def apply_each(
+        self,
+        fn: Callable[..., Any],
+        args_list: Optional[Sequence[Tuple[Any, ...]]] = None,
+        indices: Optional[Sequence[int]] = None,
+    ) -> List[Any]:
+        _indices = self._get_indices(indices)
+        if args_list is None:
+            return [fn(self.envs[index]) for index in _indices]
+        assert len(args_list) == len(_indices)
+        return [fn(self.envs[index], *args) for index, args in zip(_indices, args_list)]
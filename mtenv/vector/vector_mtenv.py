@@ -0,0 +1,324 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Base class to run a batch of multitask environments together."""
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from gym.spaces.space import Space
+
+from mtenv import MTEnv
+from mtenv.utils.evaluation import (
+    EpisodeSummaryType,
+    PolicyType,
+    evaluate_task_states,
+)
+from mtenv.utils.types import ActionType, InfoType, ObsType, TaskStateType
+
+EnvFnType = Callable[[], MTEnv]
+VectorStepReturnType = Tuple[List[ObsType], List[float], List[bool], List[InfoType]]
+
+
+class VectorMTEnv(ABC):
+    def __init__(
+        self, num_envs: int, action_space: Space, observation_space: Space
+    ) -> None:
+        """Base class to run a batch of `num_envs` multitask environments.
+
+        The outputs of the environments are returned as lists (with one
+        element per environment) as the observations of the multitask
+        environments are not necessarily arrays. Methods accepting an
+        optional `indices` argument apply to the subset of environments
+        listed in `indices` (all the environments by default).
+
+        Args:
+            num_envs (int): number of environments.
+            action_space (Space): action space of one environment.
+            observation_space (Space): observation space of one
+                environment.
+        """
+        self.num_envs = num_envs
+        self.action_space = action_space
+        self.observation_space = observation_space
+        self.closed = False
+        # Actions passed to `step_async` and not yet waited for.
+        self._waiting_actions: Dict[int, ActionType] = {}
+
+    @abstractmethod
+    def call_each(
+        self,
+        name: str,
+        args_list: Optional[Sequence[Tuple[Any, ...]]] = None,
+        indices: Optional[Sequence[int]] = None,
+    ) -> List[Any]:
+        """Call method `name` of the environments.
+
+        Args:
+            name (str): name of the method.
+            args_list (Optional[Sequence[Tuple[Any, ...]]], optional):
+                positional arguments, one tuple per environment. Defaults
+                to None (no arguments).
+            indices (Optional[Sequence[int]], optional): indices of the
+                environments to call. Defaults to None (all the
+                environments).
+
+        Returns:
+            List[Any]: return values, one per called environment.
+        """
+        pass
+
+    def _get_indices(self, indices: Optional[Sequence[int]]) -> List[int]:
+        if indices is None:
+            return list(range(self.num_envs))
+        return list(indices)
+
+    def call(
+        self, name: str, *args: Any, indices: Optional[Sequence[int]] = None
+    ) -> List[Any]:
+        """Call method `name`, with the same arguments, on the
+        environments."""
+        _indices = self._get_indices(indices)
+        return self.call_each(
+            name=name, args_list=[args for _ in _indices], indices=_indices
+        )
+
+    def apply_each(
+        self,
+        fn: Callable[..., Any],
+        args_list: Optional[Sequence[Tuple[Any, ...]]] = None,
+        indices: Optional[Sequence[int]] = None,
+    ) -> List[Any]:
+        """Call `fn(env, *args)` where the environments run (eg in their
+        worker process), to run many steps without a round-trip per step.
+
+        Args:
+            fn (Callable[..., Any]): function taking an environment (and
+                `args`).
+            args_list (Optional[Sequence[Tuple[Any, ...]]], optional):
+                positional arguments, one tuple per environment. Defaults
+                to None (no arguments).
+            indices (Optional[Sequence[int]], optional): indices of the
+                environments. Defaults to None (all the environments).
+
+        Returns:
+            List[Any]: return values, one per environment.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} can not run functions where the environments run."
+        )
+
+    def evaluate(
+        self,
+        policy: PolicyType,
+        task_states: Sequence[TaskStateType],
+        num_episodes: int = 1,
+        max_episode_steps: Optional[int] = None,
+        success_key: Optional[str] = "success",
+    ) -> List[EpisodeSummaryType]:
+        """Evaluate a policy on some tasks: the policy is sent to the
+        environments (once per call) and each environment runs the
+        complete episodes of its share of the tasks, so only the summaries
+        of the episodes are sent back (refer
+        `mtenv.utils.evaluation.run_episodes`).
+
+        Args:
+            policy (PolicyType): function mapping an observation to an
+                action (serialized with `cloudpickle` for the worker
+                processes, eg a numpy function or a TorchScript module).
+            task_states (Sequence[TaskStateType]): states of the tasks to
+                evaluate, spread over the environments.
+            num_episodes (int, optional): number of episodes per task.
+                Defaults to 1.
+            max_episode_steps (Optional[int], optional): maximum length of
+                an episode. Defaults to None (run until `done`).
+            success_key (Optional[str], optional): key of the success in
+                `info`. Defaults to "success".
+
+        Returns:
+            List[EpisodeSummaryType]: summary of the episodes of each task
+            (in the order of `task_states`).
+        """
+        indices = list(range(min(self.num_envs, len(task_states))))
+        shares = [list(task_states[index :: len(indices)]) for index in indices]
+        outputs = self.apply_each(
+            evaluate_task_states,
+            args_list=[
+                (policy, share, num_episodes, max_episode_steps, success_key)
+                for share in shares
+            ],
+            indices=indices,
+        )
+        summaries: List[EpisodeSummaryType] = [{} for _ in task_states]
+        for index, share_summaries in zip(indices, outputs):
+            summaries[index :: len(indices)] = share_summaries
+        return summaries
+
+    def step(self, actions: Sequence[ActionType]) -> VectorStepReturnType:
+        """Execute one action per environment.
+
+        Returns:
+            VectorStepReturnType: lists of observations, rewards, dones
+            and infos.
+        """
+        assert len(actions) == self.num_envs
+        results = self.call_each(name="step", args_list=[(a,) for a in actions])
+        obs, rewards, dones, infos = zip(*results)
+        return list(obs), list(rewards), list(dones), list(infos)
+
+    def step_async(
+        self, actions: Sequence[ActionType], indices: Optional[Sequence[int]] = None
+    ) -> None:
+        """Start executing one action per environment (in `indices`),
+        without waiting for the results (refer `step_wait` and `poll`).
+
+        By default, the actions are executed synchronously, in
+        `step_wait`. Implementations running the environments in other
+        processes execute them in parallel with the caller.
+        """
+        _indices = self._get_indices(indices)
+        assert len(actions) == len(_indices)
+        busy_indices = [index for index in _indices if index in self._waiting_actions]
+        if busy_indices:
+            raise RuntimeError(
+                f"the environments {busy_indices} are already executing an action."
+            )
+        self._start_steps(actions=actions, indices=_indices)
+        for index, action in zip(_indices, actions):
+            self._waiting_actions[index] = action
+
+    def step_wait(
+        self, indices: Optional[Sequence[int]] = None
+    ) -> VectorStepReturnType:
+        """Wait for the actions passed to `step_async` to be executed.
+
+        Args:
+            indices (Optional[Sequence[int]], optional): indices of the
+                environments to wait for. Defaults to None (all the
+                environments executing an action, in increasing order).
+
+        Returns:
+            VectorStepReturnType: lists of observations, rewards, dones
+            and infos (one element per environment in `indices`).
+        """
+        _indices = sorted(self._waiting_actions) if indices is None else list(indices)
+        idle_indices = [
+            index for index in _indices if index not in self._waiting_actions
+        ]
+        if idle_indices:
+            raise RuntimeError(
+                f"the environments {idle_indices} are not executing an action."
+            )
+        actions = [self._waiting_actions.pop(index) for index in _indices]
+        if not _indices:
+            return [], [], [], []
+        results = self._finish_steps(actions=actions, indices=_indices)
+        obs, rewards, dones, infos = zip(*results)
+        return list(obs), list(rewards), list(dones), list(infos)
+
+    def poll(self, timeout: Optional[float] = 0.0) -> List[int]:
+        """Return the indices of the environments whose action (passed to
+        `step_async`) is executed, ie for which `step_wait` would not
+        block.
+
+        Args:
+            timeout (Optional[float], optional): maximum time (in seconds)
+                to wait for at least one environment to be ready. Defaults
+                to 0.0 (do not wait). When None, wait until one
+                environment is ready.
+
+        Returns:
+            List[int]: indices of the ready environments (in increasing
+            order).
+        """
+        # The actions are executed synchronously, in `step_wait`.
+        return sorted(self._waiting_actions)
+
+    def step_wait_any(
+        self, timeout: Optional[float] = None
+    ) -> Tuple[List[int], VectorStepReturnType]:
+        """Wait for (at least) one of the actions passed to `step_async`
+        to be executed, and return the results of the ready environments,
+        so that new actions can be computed for them while the other
+        environments are still executing their actions.
+
+        Args:
+            timeout (Optional[float], optional): maximum time (in seconds)
+                to wait. Defaults to None (no limit).
+
+        Returns:
+            Tuple[List[int], VectorStepReturnType]: indices of the ready
+            environments and their results (refer `step_wait`).
+        """
+        indices = self.poll(timeout=timeout)
+        return indices, self.step_wait(indices=indices)
+
+    def _start_steps(self, actions: Sequence[ActionType], indices: List[int]) -> None:
+        """Start executing the actions (nothing to do by default, as the
+        actions are executed in `_finish_steps`)."""
+        pass
+
+    def _finish_steps(
+        self, actions: Sequence[ActionType], indices: List[int]
+    ) -> List[Any]:
+        """Return the outputs of `step` of the environments."""
+        return self.call_each(
+            name="step", args_list=[(action,) for action in actions], indices=indices
+        )
+
+    def reset(self, indices: Optional[Sequence[int]] = None) -> List[ObsType]:
+        return self.call("reset", indices=indices)
+
+    def seed(self, seeds: Sequence[Optional[int]]) -> List[List[int]]:
+        """Set the seed of the environment's random number generator (one
+        seed per environment)."""
+        return self.call_each("seed", args_list=[(seed,) for seed in seeds])
+
+    def seed_task(self, seeds: Sequence[Optional[int]]) -> List[List[int]]:
+        """Set the seed of the task's random number generator (one seed per
+        environment)."""
+        return self.call_each("seed_task", args_list=[(seed,) for seed in seeds])
+
+    def get_task_state(
+        self, indices: Optional[Sequence[int]] = None
+    ) -> List[TaskStateType]:
+        return self.call("get_task_state", indices=indices)
+
+    def set_task_state(
+        self,
+        task_states: Sequence[TaskStateType],
+        indices: Optional[Sequence[int]] = None,
+    ) -> None:
+        """Set the `task_state` of the environments (one `task_state` per
+        environment in `indices`)."""
+        self.call_each(
+            "set_task_state",
+            args_list=[(task_state,) for task_state in task_states],
+            indices=indices,
+        )
+
+    def sample_task_state(
+        self, indices: Optional[Sequence[int]] = None
+    ) -> List[TaskStateType]:
+        return self.call("sample_task_state", indices=indices)
+
+    def reset_task_state(self, indices: Optional[Sequence[int]] = None) -> None:
+        self.call("reset_task_state", indices=indices)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._close()
+            self.closed = True
+
+    def _close(self) -> None:
+        self.call("close")
+
+    def __enter__(self) -> "VectorMTEnv":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.num_envs
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(num_envs={self.num_envs})"
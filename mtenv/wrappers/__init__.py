@@ -1,4 +1,9 @@
 # Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+from mtenv.wrappers.episode_stats import EpisodeStats  # noqa: F401
+from mtenv.wrappers.flatten_obs import FlattenObs  # noqa: F401
 from mtenv.wrappers.ntasks import NTasks  # noqa: F401
 from mtenv.wrappers.ntasks_id import NTasksId  # noqa: F401
+from mtenv.wrappers.procedural_tasks import ProceduralTasks  # noqa: F401
+from mtenv.wrappers.record_trajectories import RecordTrajectories  # noqa: F401
 from mtenv.wrappers.sample_random_task import SampleRandomTask  # noqa: F401
+from mtenv.wrappers.step_latency import StepLatency  # noqa: F401
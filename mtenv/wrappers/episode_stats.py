@@ -0,0 +1,163 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Wrapper to aggregate per-task statistics of the episodes (return,
+length and success) with streaming quantiles."""
+
+from typing import Dict, Hashable, Optional, Sequence
+
+import numpy as np
+
+from mtenv import MTEnv
+from mtenv.utils.profiling import TaskKeyFnType, default_task_key
+from mtenv.utils.streaming_stats import P2Quantiles
+from mtenv.utils.types import ActionType, ObsType, StepReturnType, TaskStateType
+from mtenv.wrappers.multitask import MultiTask
+
+StatsType = Dict[str, float]
+
+_METRICS = ("return", "length")
+
+
+class EpisodeStats(MultiTask):
+    def __init__(
+        self,
+        env: MTEnv,
+        quantiles: Sequence[float] = (0.1, 0.5, 0.9),
+        task_key: TaskKeyFnType = default_task_key,
+        success_key: Optional[str] = "success",
+        num_tasks: int = 16,
+    ):
+        """Wrapper to aggregate the statistics of the (completed) episodes
+        of each task: number of episodes, mean and quantiles of the return
+        and of the length, and success rate.
+
+        The statistics are accumulated in fixed-size arrays (one row per
+        task) and the quantiles are estimated in a streaming fashion (refer
+        `P2Quantiles`), so the episodes are not stored. An episode is
+        successful when `info[success_key]` is truthy at any step.
+
+        .. code-block:: python
+
+            env = EpisodeStats(mtenv.make("MT-MetaWorld-MT50-v0"))
+            ...
+            env.stats()  # {task_key: {"episodes": ..., "return_p50": ...}}
+
+        Args:
+            env (MTEnv): Multitask environment to wrap over.
+            quantiles (Sequence[float], optional): quantiles (in [0, 1]) of
+                the return and of the length to estimate. Defaults to
+                (0.1, 0.5, 0.9).
+            task_key (TaskKeyFnType, optional): function mapping a
+                `task_state` to the key of the task. Defaults to
+                `default_task_key`.
+            success_key (Optional[str], optional): key of the success in
+                `info`. Defaults to "success". When None, the success rate
+                is not reported.
+            num_tasks (int, optional): initial number of rows (it grows as
+                new tasks are seen). Defaults to 16.
+        """
+        super().__init__(env=env)
+        self.task_key = task_key
+        self.success_key = success_key
+        self.quantiles = tuple(quantiles)
+        self._quantile_names = [f"p{round(q * 100):g}" for q in self.quantiles]
+        self._task_rows: Dict[Hashable, int] = {}
+        self._counts = np.zeros(num_tasks, dtype=np.int64)
+        self._sums = {metric: np.zeros(num_tasks) for metric in _METRICS}
+        self._successes = np.zeros(num_tasks, dtype=np.int64)
+        self._quantile_sketches = {
+            metric: P2Quantiles(quantiles=self.quantiles, capacity=num_tasks)
+            for metric in _METRICS
+        }
+        self._row: Optional[int] = None
+        self._episode_return = 0.0
+        self._episode_length = 0
+        self._is_episode_successful = False
+
+    def _get_row(self, task_state: TaskStateType) -> int:
+        key = self.task_key(task_state)
+        row = self._task_rows.get(key)
+        if row is None:
+            row = len(self._task_rows)
+            self._task_rows[key] = row
+            if row == len(self._counts):
+                self._grow(2 * len(self._counts))
+        return row
+
+    def _grow(self, capacity: int) -> None:
+        num_new_rows = capacity - len(self._counts)
+        self._counts = np.concatenate(
+            [self._counts, np.zeros(num_new_rows, dtype=np.int64)]
+        )
+        self._successes = np.concatenate(
+            [self._successes, np.zeros(num_new_rows, dtype=np.int64)]
+        )
+        for metric in _METRICS:
+            self._sums[metric] = np.concatenate(
+                [self._sums[metric], np.zeros(num_new_rows)]
+            )
+            self._quantile_sketches[metric].grow(capacity)
+
+    def reset(self) -> ObsType:
+        obs = self.env.reset()
+        self._row = self._get_row(self.env.get_task_state())
+        self._episode_return = 0.0
+        self._episode_length = 0
+        self._is_episode_successful = False
+        return obs
+
+    def step(self, action: ActionType) -> StepReturnType:
+        obs, reward, done, info = self.env.step(action)
+        self._episode_return += reward
+        self._episode_length += 1
+        if self.success_key is not None and info.get(self.success_key):
+            self._is_episode_successful = True
+        if done and self._row is not None:
+            self._add_episode(self._row)
+            # The episode is counted once, even if `step` is called again.
+            self._row = None
+        return obs, reward, done, info
+
+    def _add_episode(self, row: int) -> None:
+        self._counts[row] += 1
+        self._successes[row] += self._is_episode_successful
+        for metric, value in (
+            ("return", self._episode_return),
+            ("length", self._episode_length),
+        ):
+            self._sums[metric][row] += value
+            self._quantile_sketches[metric].add(row, value)
+
+    def stats(self) -> Dict[Hashable, StatsType]:
+        """Return the statistics of the completed episodes of each task.
+
+        Returns:
+            Dict[Hashable, StatsType]: statistics (`episodes`, `return_mean`,
+            `return_p<q>`, `length_mean`, `length_p<q>` and `success_rate`)
+            keyed by task.
+        """
+        stats: Dict[Hashable, StatsType] = {}
+        for key, row in self._task_rows.items():
+            count = int(self._counts[row])
+            task_stats: StatsType = {"episodes": count}
+            for metric in _METRICS:
+                task_stats[f"{metric}_mean"] = (
+                    self._sums[metric][row] / count if count else np.nan
+                )
+                estimates = self._quantile_sketches[metric].get(row)
+                for name, estimate in zip(self._quantile_names, estimates):
+                    task_stats[f"{metric}_{name}"] = float(estimate)
+            if self.success_key is not None:
+                task_stats["success_rate"] = (
+                    self._successes[row] / count if count else np.nan
+                )
+            stats[key] = task_stats
+        return stats
+
+    def reset_stats(self) -> None:
+        """Drop the statistics of all the tasks (the keys of the tasks are
+        kept)."""
+        self._counts[:] = 0
+        self._successes[:] = 0
+        for metric in _METRICS:
+            self._sums[metric][:] = 0.0
+            self._quantile_sketches[metric].clear()
@@ -0,0 +1,207 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Wrapper to fuse the environment observation and the task observation
+into a single (preallocated) vector."""
+
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from gym.spaces.box import Box as BoxSpace
+from gym.spaces.dict import Dict as DictSpace
+from gym.spaces.discrete import Discrete as DiscreteSpace
+from gym.spaces.multi_binary import MultiBinary as MultiBinarySpace
+from gym.spaces.space import Space
+
+from mtenv import MTEnv
+from mtenv.utils.types import ActionType, ObsType, StepReturnType
+from mtenv.wrappers.multitask import MultiTask
+
+BatchObsType = Union[ObsType, Sequence[ObsType]]
+
+# Keys of the multitask observation, in the order in which they are
+# written in the flat vector.
+_OBS_KEYS = ("env_obs", "task_obs")
+
+
+class _Slot:
+    def __init__(
+        self, path: Tuple[str, ...], is_one_hot: bool, start: int, size: int
+    ) -> None:
+        """Location of one leaf of the observation in the flat vector.
+
+        Args:
+            path (Tuple[str, ...]): sequence of keys to reach the leaf.
+            is_one_hot (bool): should the (discrete) leaf be one-hot
+                encoded?
+            start (int): index of the first element of the leaf.
+            size (int): number of elements of the leaf.
+        """
+        self.path = path
+        self.is_one_hot = is_one_hot
+        self.start = start
+        self.stop = start + size
+
+
+class FlatObsLayout:
+    def __init__(self, observation_space: DictSpace) -> None:
+        """Precomputed layout of a multitask observation in a flat vector.
+
+        `env_obs` is written first, followed by `task_obs`. `Box` (and
+        `MultiBinary`) spaces are written as contiguous slices, `Discrete`
+        spaces are one-hot encoded and `Dict` spaces are flattened
+        recursively (in the order of their keys).
+
+        Args:
+            observation_space (DictSpace): observation space of the
+                multitask environment.
+        """
+        self._slots: List[_Slot] = []
+        self._low: List[np.ndarray] = []
+        self._high: List[np.ndarray] = []
+        self.size = 0
+        for key in _OBS_KEYS:
+            self._add_space(space=observation_space[key], path=(key,))
+
+    def _add_space(self, space: Space, path: Tuple[str, ...]) -> None:
+        if isinstance(space, DictSpace):
+            for key, subspace in space.spaces.items():
+                self._add_space(space=subspace, path=path + (key,))
+            return
+        if isinstance(space, DiscreteSpace):
+            size = int(space.n)
+            low, high = np.zeros(size), np.ones(size)
+            is_one_hot = True
+        elif isinstance(space, BoxSpace):
+            size = int(np.prod(space.shape))
+            low, high = space.low.ravel(), space.high.ravel()
+            is_one_hot = False
+        elif isinstance(space, MultiBinarySpace):
+            size = int(np.prod(space.shape))
+            low, high = np.zeros(size), np.ones(size)
+            is_one_hot = False
+        else:
+            raise NotImplementedError(
+                f"space={space} (at {'/'.join(path)}) can not be flattened."
+            )
+        self._slots.append(
+            _Slot(path=path, is_one_hot=is_one_hot, start=self.size, size=size)
+        )
+        self._low.append(low)
+        self._high.append(high)
+        self.size += size
+
+    def make_space(self) -> BoxSpace:
+        """Return the `Box` space containing the flat vectors."""
+        return BoxSpace(
+            low=np.concatenate(self._low).astype(np.float32),
+            high=np.concatenate(self._high).astype(np.float32),
+            dtype=np.float32,
+        )
+
+    @staticmethod
+    def _get(obs: Any, path: Tuple[str, ...]) -> Any:
+        for key in path:
+            obs = obs[key]
+        return obs
+
+    def flatten(self, obs: ObsType, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Write a multitask observation into a flat vector.
+
+        Args:
+            obs (ObsType): multitask observation.
+            out (Optional[np.ndarray], optional): float32 array, of shape
+                `(size,)`, to write into. A new array is allocated when
+                None. Defaults to None.
+
+        Returns:
+            np.ndarray: the flat vector (`out` when it is provided).
+        """
+        if out is None:
+            out = np.empty(self.size, dtype=np.float32)
+        for slot in self._slots:
+            value = self._get(obs, slot.path)
+            if slot.is_one_hot:
+                out[slot.start : slot.stop] = 0.0
+                out[slot.start + int(value)] = 1.0
+            else:
+                out[slot.start : slot.stop] = np.ravel(value)
+        return out
+
+    def flatten_batch(
+        self, obs: BatchObsType, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Write a batch of multitask observations into a 2d array.
+
+        Args:
+            obs (BatchObsType): either a sequence of multitask
+                observations or a single multitask observation whose
+                leaves are batched along the first dimension (as returned
+                by vectorized environments).
+            out (Optional[np.ndarray], optional): float32 array, of shape
+                `(batch_size, size)`, to write into. A new array is
+                allocated when None. Defaults to None.
+
+        Returns:
+            np.ndarray: the flat vectors, one per row (`out` when it is
+            provided).
+        """
+        if not isinstance(obs, dict):
+            if out is None:
+                out = np.empty((len(obs), self.size), dtype=np.float32)
+            for index, _obs in enumerate(obs):
+                self.flatten(obs=_obs, out=out[index])
+            return out
+        batch_size = len(self._get(obs, self._slots[0].path))
+        if out is None:
+            out = np.empty((batch_size, self.size), dtype=np.float32)
+        rows = np.arange(batch_size)
+        for slot in self._slots:
+            value = np.asarray(self._get(obs, slot.path))
+            if slot.is_one_hot:
+                out[:, slot.start : slot.stop] = 0.0
+                out[rows, slot.start + value.astype(np.int64)] = 1.0
+            else:
+                out[:, slot.start : slot.stop] = value.reshape(batch_size, -1)
+        return out
+
+
+class FlattenObs(MultiTask):
+    def __init__(self, env: MTEnv, copy: bool = True):
+        """Wrapper to fuse `env_obs` and `task_obs` into a single float32
+        vector.
+
+        The layout of the vector is precomputed from the observation
+        space (refer `FlatObsLayout`). The fused vector is returned as
+        `env_obs` while `task_obs` is returned unchanged.
+
+        Args:
+            env (MTEnv): Multitask environment to wrap over.
+            copy (bool, optional): should each call to `step` and `reset`
+                return a new vector? When False, the vector is written in a
+                preallocated buffer, which is reused across calls: the
+                returned `env_obs` is overwritten by the next call to
+                `step` or `reset`, so it must be copied before it is stored
+                (eg as `obs` and `next_obs` in a replay buffer). Defaults
+                to True.
+        """
+        super().__init__(env=env)
+        self.layout = FlatObsLayout(observation_space=self.env.observation_space)
+        self.observation_space: DictSpace = DictSpace(
+            spaces={
+                "env_obs": self.layout.make_space(),
+                "task_obs": self.env.observation_space["task_obs"],
+            }
+        )
+        self._copy = copy
+        self._buffer = None if copy else np.zeros(self.layout.size, dtype=np.float32)
+
+    def _flatten_obs(self, obs: ObsType) -> ObsType:
+        # A new vector is allocated when `self._buffer` is None.
+        flat_obs = self.layout.flatten(obs=obs, out=self._buffer)
+        return {"env_obs": flat_obs, "task_obs": obs["task_obs"]}
+
+    def step(self, action: ActionType) -> StepReturnType:
+        obs, reward, done, info = self.env.step(action)
+        return self._flatten_obs(obs), reward, done, info
+
+    def reset(self) -> ObsType:
+        return self._flatten_obs(self.env.reset())
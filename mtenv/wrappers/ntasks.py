@@ -1,15 +1,21 @@
 # Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
 """Wrapper to fix the number of tasks in an existing multitask environment."""
 
-from typing import List
+from typing import List, Optional
 
 from mtenv import MTEnv
+from mtenv.utils.task_sampler import TaskSampler, get_task_sampler
 from mtenv.utils.types import TaskStateType
 from mtenv.wrappers.multitask import MultiTask
 
 
 class NTasks(MultiTask):
-    def __init__(self, env: MTEnv, n_tasks: int):
+    def __init__(
+        self,
+        env: MTEnv,
+        n_tasks: int,
+        task_sampler: Optional[TaskSampler] = None,
+    ):
         """Wrapper to fix the number of tasks in an existing multitask
         environment to `n_tasks`.
 
@@ -18,9 +24,15 @@ class NTasks(MultiTask):
         Args:
             env (MTEnv): Multitask environment to wrap over.
             n_tasks (int): Number of tasks to sample.
+            task_sampler (Optional[TaskSampler], optional): strategy to
+                sample the tasks (eg `PrioritizedTaskSampler`). Defaults to
+                None (sample the tasks uniformly).
         """
         super().__init__(env=env)
         self.n_tasks = n_tasks
+        self.task_sampler = get_task_sampler(
+            task_sampler=task_sampler, num_tasks=n_tasks
+        )
         self.tasks: List[TaskStateType]
         self._are_tasks_set = False
 
@@ -46,7 +58,7 @@ class NTasks(MultiTask):
 
         # The assert statement (at the start of the function) ensures that self.np_random_task
         # is not None. Mypy is raising the warning incorrectly.
-        id_task = self.np_random_task.randint(self.n_tasks)  # type: ignore[union-attr]
+        id_task = self.task_sampler.sample(self.np_random_task)  # type: ignore[arg-type]
         return self.tasks[id_task]
 
     def reset_task_state(self) -> None:
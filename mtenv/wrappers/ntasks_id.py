@@ -2,16 +2,24 @@
 """Wrapper to fix the number of tasks in an existing multitask environment
 and return the id of the task as part of the observation."""
 
+from typing import Optional
+
 from gym.spaces import Dict as DictSpace
 from gym.spaces import Discrete
 
 from mtenv import MTEnv
+from mtenv.utils.task_sampler import TaskSampler
 from mtenv.utils.types import ActionType, ObsType, StepReturnType, TaskStateType
 from mtenv.wrappers.ntasks import NTasks
 
 
 class NTasksId(NTasks):
-    def __init__(self, env: MTEnv, n_tasks: int):
+    def __init__(
+        self,
+        env: MTEnv,
+        n_tasks: int,
+        task_sampler: Optional[TaskSampler] = None,
+    ):
         """Wrapper to fix the number of tasks in an existing multitask
         environment to `n_tasks`.
 
@@ -21,10 +29,13 @@ class NTasksId(NTasks):
         Args:
             env (MTEnv): Multitask environment to wrap over.
             n_tasks (int): Number of tasks to sample.
+            task_sampler (Optional[TaskSampler], optional): strategy to
+                sample the ids of the tasks (eg `PrioritizedTaskSampler`).
+                Defaults to None (sample the tasks uniformly).
         """
         self.env = env
 
-        super().__init__(n_tasks=n_tasks, env=env)
+        super().__init__(n_tasks=n_tasks, env=env, task_sampler=task_sampler)
         self.task_state: TaskStateType
         self.observation_space: DictSpace = DictSpace(
             spaces={
@@ -63,5 +74,5 @@ class NTasksId(NTasks):
 
         # The assert statement (at the start of the function) ensures that self.np_random_task
         # is not None. Mypy is raising the warning incorrectly.
-        id_task = self.np_random_task.randint(self.n_tasks)  # type: ignore[union-attr]
+        id_task = self.task_sampler.sample(self.np_random_task)  # type: ignore[arg-type]
         return id_task
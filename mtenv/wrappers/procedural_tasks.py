@@ -0,0 +1,78 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Wrapper to identify the tasks of an existing multitask environment by
+the integer seed they are generated from."""
+
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from mtenv import MTEnv
+from mtenv.utils.types import TaskStateType
+from mtenv.wrappers.multitask import MultiTask
+
+# Keys are drawn in [0, MAX_TASK_KEY), so that they fit in 8 bytes.
+MAX_TASK_KEY = 2**63 - 1
+
+
+class ProceduralTasks(MultiTask):
+    def __init__(self, env: MTEnv, cache_size: int = 128):
+        """Wrapper whose task state is an integer key, from which the task
+        state of the wrapped environment is generated (by seeding its task
+        random number generator with the key and sampling a task).
+
+        The task pools, checkpoints and messages between processes then
+        only carry the keys of the tasks, instead of their parameters (eg
+        the transition matrix of a `UniformTMDP`). The task states
+        generated for the most recently set keys are cached.
+
+        Note that the random number generator of the tasks of the wrapped
+        environment is re-seeded each time a task is generated.
+
+        Args:
+            env (MTEnv): Multitask environment to wrap over. Its task
+                state should only depend on its task random number
+                generator (eg `MTCartPole`, `MTAcrobot` or `UniformTMDP`).
+            cache_size (int, optional): number of generated task states to
+                keep (least recently used first out). Defaults to 128.
+        """
+        if cache_size < 0:
+            raise ValueError(f"cache_size={cache_size} should be non-negative.")
+        super().__init__(env=env)
+        self.cache_size = cache_size
+        self._task_states: "OrderedDict[int, TaskStateType]" = OrderedDict()
+        self.task_state: Optional[int] = None
+
+    def generate_task_state(self, task_key: int) -> TaskStateType:
+        """Task state of the wrapped environment for the key `task_key`."""
+        if task_key in self._task_states:
+            self._task_states.move_to_end(task_key)
+            return self._task_states[task_key]
+        self.env.seed_task(task_key)
+        task_state = self.env.sample_task_state()
+        if self.cache_size > 0:
+            self._task_states[task_key] = task_state
+            if len(self._task_states) > self.cache_size:
+                self._task_states.popitem(last=False)
+        return task_state
+
+    def get_task_state(self) -> Optional[int]:
+        return self.task_state
+
+    def set_task_state(self, task_state: int) -> None:
+        self.env.set_task_state(self.generate_task_state(task_state))
+        self.task_state = task_state
+
+    def sample_task_state(self) -> int:
+        """Sample the key of a task."""
+        self.assert_task_seed_is_set()
+        # The assert statement (at the start of the function) ensures that self.np_random_task
+        # is not None. Mypy is raising the warning incorrectly.
+        return int(
+            self.np_random_task.randint(  # type: ignore[union-attr]
+                MAX_TASK_KEY, dtype=np.int64
+            )
+        )
+
+    def reset_task_state(self) -> None:
+        self.set_task_state(task_state=self.sample_task_state())
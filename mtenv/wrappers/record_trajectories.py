@@ -0,0 +1,120 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Wrapper to record the trajectories of a multitask environment on disk."""
+
+from typing import Any, Optional
+
+import numpy as np
+
+from mtenv import MTEnv
+from mtenv.utils.trajectory_storage import TrajectoryWriter
+from mtenv.utils.types import ActionType, ObsType, StepReturnType, TaskStateType
+from mtenv.wrappers.multitask import MultiTask
+
+
+def _copy_obs(obs: Any) -> Any:
+    if isinstance(obs, dict):
+        return {key: _copy_obs(value) for key, value in obs.items()}
+    return np.array(obs, copy=True)
+
+
+class RecordTrajectories(MultiTask):
+    def __init__(
+        self,
+        env: MTEnv,
+        root_dir: str,
+        chunk_size: int = 1024,
+        max_queue_size: int = 8,
+    ):
+        """Wrapper to record the transitions of a multitask environment.
+
+        Each transition, ie the multitask observation (`env_obs` and
+        `task_obs`) on which the action is taken, the `action`, the
+        `reward`, `done`, `first` (is it the first transition after a
+        call to `reset`?) and the observation returned by `step`
+        (`next_obs.env_obs` and `next_obs.task_obs`, which include the
+        terminal observation of the episodes), is stored with the
+        transitions of the same task (identified by its `task_state`). The transitions are written
+        by a background thread, in chunked, columnar files (refer
+        `TrajectoryWriter`), and can be read back with
+        `mtenv.utils.trajectory_storage.TrajectoryReader`, or replayed with
+        `mtenv.envs.replay.ReplayMTEnv`. The action and observation spaces
+        are saved as metadata.
+
+        `close` should be called to write the last (partial) chunks.
+
+        Args:
+            env (MTEnv): Multitask environment to wrap over.
+            root_dir (str): directory to write the trajectories into.
+            chunk_size (int, optional): number of transitions per chunk.
+                Defaults to 1024.
+            max_queue_size (int, optional): maximum number of chunks
+                waiting to be written. Defaults to 8.
+        """
+        super().__init__(env=env)
+        self.writer = TrajectoryWriter(
+            root_dir=root_dir, chunk_size=chunk_size, max_queue_size=max_queue_size
+        )
+        self.writer.save_metadata(
+            {
+                "action_space": self.action_space,
+                "observation_space": self.observation_space,
+            }
+        )
+        self._obs: Optional[ObsType] = None
+        self._task_id: Optional[int] = None
+        self._is_first = False
+
+    def _update_task_id(self) -> None:
+        self._task_id = self.writer.get_task_id(self.env.get_task_state())
+
+    def set_task_state(self, task_state: TaskStateType) -> None:
+        self.env.set_task_state(task_state)
+        self._update_task_id()
+
+    def reset_task_state(self) -> None:
+        self.env.reset_task_state()
+        self._update_task_id()
+
+    def reset(self) -> ObsType:
+        obs = self.env.reset()
+        self._update_task_id()
+        # Observations are copied as environments can reuse their buffers.
+        self._obs = _copy_obs(obs)
+        self._is_first = True
+        return obs
+
+    def step(self, action: ActionType) -> StepReturnType:
+        assert self._obs is not None, "please call `reset()` first"
+        obs, reward, done, info = self.env.step(action)
+        assert self._task_id is not None
+        next_obs = _copy_obs(obs)
+        self.writer.add(
+            task_id=self._task_id,
+            transition={
+                "env_obs": self._obs["env_obs"],
+                "task_obs": self._obs["task_obs"],
+                "action": action,
+                "reward": reward,
+                "done": done,
+                "first": self._is_first,
+                "next_obs": {
+                    "env_obs": next_obs["env_obs"],
+                    "task_obs": next_obs["task_obs"],
+                },
+            },
+        )
+        self._obs = next_obs
+        self._is_first = False
+        return obs, reward, done, info
+
+    def flush(self) -> None:
+        """Write the recorded transitions (including the partial chunks)."""
+        self.writer.flush()
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+        finally:
+            # The environment is closed even if the trajectories could not
+            # be written.
+            self.env.close()
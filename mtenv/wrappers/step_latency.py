@@ -0,0 +1,33 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+"""Wrapper to report the latency of each step in `info`."""
+
+import time
+
+from mtenv import MTEnv
+from mtenv.utils.types import ActionType, StepReturnType
+from mtenv.wrappers.multitask import MultiTask
+
+
+class StepLatency(MultiTask):
+    def __init__(self, env: MTEnv, info_key: str = "step_latency"):
+        """Wrapper to measure the latency (in seconds) of each step of the
+        wrapped environment and report it in `info`.
+
+        As the latency is measured where the environment runs (eg in the
+        worker process of a `SubprocVectorMTEnv`), it does not include the
+        communication overhead. It can be fed to
+        `mtenv.vector.scheduling.LoadBalancedTaskScheduler`.
+
+        Args:
+            env (MTEnv): Multitask environment to wrap over.
+            info_key (str, optional): key of the latency in `info`.
+                Defaults to "step_latency".
+        """
+        super().__init__(env=env)
+        self.info_key = info_key
+
+    def step(self, action: ActionType) -> StepReturnType:
+        start = time.perf_counter()
+        obs, reward, done, info = self.env.step(action)
+        info[self.info_key] = time.perf_counter() - start
+        return obs, reward, done, info
@@ -145,6 +145,38 @@ def test_examples(session) -> None:
     session.run("pytest", "tests/examples")
 
 
+@nox.session(python=PYTHON_VERSIONS)
+def test_utils(session) -> None:
+    setup_mtenv(session=session)
+    session.run("pytest", "tests/utils")
+
+
+@nox.session(python=PYTHON_VERSIONS)
+def test_vector(session) -> None:
+    setup_mtenv(session=session)
+    session.run("pytest", "tests/vector")
+
+
+@nox.session(python=PYTHON_VERSIONS)
+def test_remote(session) -> None:
+    setup_mtenv(session=session)
+    session.run("pytest", "tests/remote")
+
+
+@nox.session(python=PYTHON_VERSIONS)
+def test_benchmarks(session) -> None:
+    setup_mtenv(session=session)
+    session.run("pytest", "tests/benchmarks")
+
+
+@nox.session
+def benchmark(session) -> None:
+    """Run the throughput benchmarks, eg
+    `nox -s benchmark -- --env-ids "MT-CartPole*" --output report.json`."""
+    setup_mtenv(session=session)
+    session.run("mtenv-benchmark", *session.posargs)
+
+
 @nox.session(python=PYTHON_VERSIONS)
 @nox.parametrize("env_setup_path", get_all_env_setup_paths_as_nox_params())
 def test_envs(session, env_setup_path) -> None:
@@ -83,4 +83,10 @@ setuptools.setup(
     ],
     python_requires=">=3.6",
     extras_require=extras_require,
+    entry_points={
+        "console_scripts": [
+            "mtenv = mtenv.cli:main",
+            "mtenv-benchmark = mtenv.benchmarks.run:main",
+        ],
+    },
 )
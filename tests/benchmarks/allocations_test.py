@@ -0,0 +1,36 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import pytest
+
+from mtenv.benchmarks.allocations import benchmark_step_allocations
+from mtenv.benchmarks.run import main
+
+
+@pytest.mark.parametrize("env_id", ["MT-CartPole-v0", "MT-TabularMDP-v0"])
+def test_benchmark_step_allocations(env_id):
+    result = benchmark_step_allocations(env_id=env_id, num_steps=50)
+    assert result["status"] == "ok", result.get("traceback")
+    assert result["blocks_per_step"] > 0
+    assert result["peak_traced_bytes"] > 0
+
+
+def test_benchmark_step_allocations_reports_errors():
+    result = benchmark_step_allocations(
+        env_id="MT-CartPole-v0", num_steps=10, env_kwargs={"invalid_kwarg": 0}
+    )
+    assert result["status"] == "error"
+    assert "TypeError" in result["error"]
+
+
+def test_main_runs_allocations_suite(capsys):
+    main(
+        [
+            "--suite",
+            "allocations",
+            "--env-ids",
+            "MT-CartPole-v0",
+            "--num-steps",
+            "20",
+            "--no-isolation",
+        ]
+    )
+    assert "MT-CartPole-v0" in capsys.readouterr().out
@@ -0,0 +1,47 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import numpy as np
+import pytest
+
+from mtenv.benchmarks.run import main
+from mtenv.benchmarks.task_switch import (
+    benchmark_task_switch,
+    get_env_family,
+    is_same_task_state,
+)
+
+
+@pytest.mark.parametrize(
+    "env_id, family",
+    [("MT-CartPole-v0", "control"), ("MT-TabularMDP-v0", "tabular_mdp")],
+)
+def test_benchmark_task_switch(env_id, family):
+    assert get_env_family(env_id) == family
+    result = benchmark_task_switch(env_id=env_id, num_task_switches=10)
+    assert result["status"] == "ok", result.get("traceback")
+    assert result["family"] == family
+    num_switches = result["same_task_latency_ms"]["count"] + result[
+        "new_task_latency_ms"
+    ].get("count", 0)
+    assert num_switches == 20
+
+
+def test_is_same_task_state():
+    assert is_same_task_state([0], [0])
+    assert not is_same_task_state([0], [1])
+    assert is_same_task_state(np.ones(3), np.ones(3))
+    assert not is_same_task_state({"a": 1}, {"a": 2})
+
+
+def test_main_runs_task_switch_suite(capsys):
+    main(
+        [
+            "--suite",
+            "task_switch",
+            "--env-ids",
+            "MT-CartPole-v0",
+            "--num-task-switches",
+            "5",
+            "--no-isolation",
+        ]
+    )
+    assert "control" in capsys.readouterr().out
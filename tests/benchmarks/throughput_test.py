@@ -0,0 +1,94 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import json
+import os
+import time
+
+import pytest
+
+from mtenv.benchmarks.run import main, select_env_ids
+from mtenv.benchmarks.throughput import (
+    MODES,
+    benchmark_env,
+    benchmark_env_in_subprocess,
+    summarize,
+)
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_benchmark_env(mode):
+    result = benchmark_env(
+        env_id="MT-CartPole-v0",
+        mode=mode,
+        num_envs=2,
+        num_steps=50,
+        num_resets=2,
+        num_task_switches=3,
+    )
+    assert result["status"] == "ok", result.get("traceback")
+    assert result["vector_env"] in ("SyncVectorMTEnv", "SubprocVectorMTEnv")
+    assert result["steps_per_sec"] > 0
+    assert result["resets_per_sec"] > 0
+    assert set(result["task_switch_latency_ms"]) == {"mean", "p50", "p99", "max"}
+
+
+def test_summarize_results_without_timings():
+    result = benchmark_env(
+        env_id="MT-CartPole-v0",
+        mode="single",
+        num_envs=1,
+        num_steps=0,
+        num_resets=0,
+        num_task_switches=0,
+    )
+    assert result["status"] == "ok", result.get("traceback")
+    assert result["resets_per_sec"] is None
+    assert "n/a" in summarize([result])
+
+
+def test_benchmark_env_reports_errors():
+    result = benchmark_env(env_id="MT-CartPole-v0", mode="invalid")
+    assert result["status"] == "error"
+    assert "ValueError" in result["error"]
+
+
+def crash(**kwargs):
+    os._exit(3)
+
+
+def test_benchmark_env_in_subprocess_reports_crashes():
+    start = time.perf_counter()
+    result = benchmark_env_in_subprocess(
+        timeout=600.0, benchmark_fn=crash, env_id="MT-CartPole-v0"
+    )
+    # The crash is reported without waiting for the timeout.
+    assert time.perf_counter() - start < 60.0
+    assert result["status"] == "error"
+    assert "exited with code 3" in result["error"]
+
+
+def test_select_env_ids():
+    assert select_env_ids(["MT-CartPole*"]) == ["MT-CartPole-v0"]
+    assert select_env_ids(["does-not-exist"]) == []
+
+
+def test_main_writes_json_report(tmp_path):
+    output = tmp_path / "report.json"
+    main(
+        [
+            "--env-ids",
+            "MT-CartPole-v0",
+            "--modes",
+            "single",
+            "--num-steps",
+            "20",
+            "--num-resets",
+            "2",
+            "--num-task-switches",
+            "2",
+            "--output",
+            str(output),
+        ]
+    )
+    report = json.loads(output.read_text())
+    assert set(report) == {"metadata", "config", "results"}
+    assert [result["status"] for result in report["results"]] == ["ok"]
@@ -0,0 +1,92 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import numpy as np
+import pytest
+from gym import spaces
+
+from mtenv.envs.bandit.bandit import (
+    BatchedBandit,
+    MTBanditEnv,
+    get_finite_task_observations,
+)
+from tests.utils.utils import validate_mtenv
+
+
+@pytest.mark.parametrize("n_arms", [1, 3])
+def test_bandit_env(n_arms):
+    validate_mtenv(env=MTBanditEnv(n_arms=n_arms, episode_length=5))
+
+
+def test_batched_bandit_rewards_follow_arm_probabilities():
+    num_envs = 3
+    bandit = BatchedBandit(num_envs=num_envs, n_arms=2, episode_length=2)
+    bandit.seed(1)
+    bandit.set_task_state(np.array([[0.0, 1.0], [1.0, 0.0], [0.5, 0.5]]))
+    assert bandit.reset().shape == (num_envs, 1)
+    _, rewards, dones = bandit.step(np.array([1, 0, 0]))
+    assert rewards[:2].tolist() == [1.0, 1.0]
+    assert not dones.any()
+    _, rewards, dones = bandit.step(np.array([0, 1, 0]))
+    assert rewards[:2].tolist() == [0.0, 0.0]
+    assert dones.all()
+
+    bandit.reset(indices=[1])
+    assert bandit.step_count.tolist() == [2, 0, 2]
+    rewards = np.stack(
+        [bandit.step(np.zeros(num_envs, dtype=int))[1] for _ in range(2000)]
+    )
+    assert abs(rewards[:, 2].mean() - 0.5) < 0.05
+
+
+def test_batched_bandit_task_obs_is_a_read_only_view():
+    bandit = BatchedBandit(num_envs=2, n_arms=3)
+    bandit.seed_task(1)
+    task_obs = bandit.task_obs
+    task_states = bandit.sample_task_state(indices=[1])
+    assert task_states.shape == (1, 3)
+    bandit.set_task_state(task_states, indices=[1])
+    np.testing.assert_array_equal(task_obs[1], task_states[0])
+    np.testing.assert_array_equal(task_obs[0], np.zeros(3))
+    with pytest.raises(ValueError):
+        task_obs[0, 0] = 1.0
+
+
+def test_bandit_env_task_obs_follows_the_task_state():
+    env = MTBanditEnv(n_arms=2)
+    env.seed(1)
+    env.seed_task(1)
+    obs = env.reset()
+    previous_task_obs = obs["task_obs"].copy()
+    env.set_task_state(np.array([0.25, 0.75]))
+    # The previous observations are not changed by the new task state.
+    np.testing.assert_array_equal(obs["task_obs"], previous_task_obs)
+    np.testing.assert_array_equal(env.reset()["task_obs"], [0.25, 0.75])
+    np.testing.assert_array_equal(env.get_task_obs(), [0.25, 0.75])
+    assert not env.get_task_obs().flags.writeable
+    assert env.get_task_state().tolist() == [0.25, 0.75]
+
+
+def test_bandit_with_no_arm_raises():
+    with pytest.raises(ValueError):
+        BatchedBandit(num_envs=1, n_arms=0)
+
+
+def test_finite_task_observations_match_sampled_tasks():
+    space = spaces.Box(low=0.0, high=1.0, shape=(4,))
+    space.seed(0)
+    expected = np.asarray([space.sample() for _ in range(3)])
+    task_observations = get_finite_task_observations(n_tasks=3, n_arms=4)
+    np.testing.assert_array_equal(task_observations, expected)
+    assert get_finite_task_observations(n_tasks=3, n_arms=4) is task_observations
+    assert not task_observations.flags.writeable
+
+
+def test_finite_task_observations_are_memory_mapped(tmp_path):
+    task_observations = get_finite_task_observations(
+        n_tasks=5, n_arms=2, seed=1, cache_dir=str(tmp_path)
+    )
+    assert isinstance(task_observations, np.memmap)
+    assert not task_observations.flags.writeable
+    assert len(list(tmp_path.iterdir())) == 1
+    np.testing.assert_array_equal(
+        task_observations, get_finite_task_observations(n_tasks=5, n_arms=2, seed=1)
+    )
@@ -0,0 +1,95 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import numpy as np
+import pytest
+
+from mtenv.envs.mpte.headless_two_goal_maze_env import (
+    AGENT_RADIUS,
+    BatchedTwoGoalMaze,
+    HeadlessTwoGoalMazeEnv,
+    get_wall_segments,
+    intersect_circles_segments,
+)
+
+
+def test_walls_enclose_the_maze():
+    walls = get_wall_segments(size_x=3, size_y=3)
+    assert walls.shape == (12, 2, 2)
+    points = np.array([[0.0, 0.0], [3.5, 0.0], [0.0, -3.5], [3.7, 0.0], [3.2, 3.2]])
+    assert intersect_circles_segments(points, AGENT_RADIUS, walls).tolist() == [
+        False,
+        False,
+        False,
+        True,
+        True,
+    ]
+
+
+def test_batched_maze_matches_single_envs():
+    num_envs = 4
+    maze = BatchedTwoGoalMaze(num_envs=num_envs, size_x=3, size_y=3)
+    maze.seed(list(range(num_envs)))
+    maze.seed_task(list(range(num_envs)))
+    envs = [HeadlessTwoGoalMazeEnv(size_x=3, size_y=3) for _ in range(num_envs)]
+    for index, env in enumerate(envs):
+        env.seed(index)
+        env.seed_task(index)
+
+    batch_obs = maze.reset()
+    for index, env in enumerate(envs):
+        np.testing.assert_array_equal(batch_obs[index], env.reset()["env_obs"]["obs"])
+    rng = np.random.RandomState(0)
+    for _ in range(100):
+        actions = rng.randint(3, size=num_envs)
+        batch_obs, rewards, dones = maze.step(actions)
+        for index, env in enumerate(envs):
+            obs, reward, done, _ = env.step(actions[index])
+            np.testing.assert_array_equal(batch_obs[index], obs["env_obs"]["obs"])
+            assert reward == rewards[index]
+            assert done == dones[index]
+            if done:
+                env.reset()
+        done_indices = np.flatnonzero(dones)
+        if len(done_indices) > 0:
+            maze.reset(done_indices)
+
+
+def test_single_env_episode():
+    env = HeadlessTwoGoalMazeEnv(size_x=3, size_y=3)
+    env.seed(1)
+    env.seed_task(2)
+    obs = env.reset()
+    assert obs["env_obs"]["obs"].dtype == np.float32
+    assert obs["task_obs"] == [float(env.get_task_state()[0])]
+    done = False
+    total_reward = 0.0
+    while not done:
+        obs, reward, done, _ = env.step(env.action_space.sample())
+        total_reward += reward
+    assert total_reward in (-1.0, 1.0)
+    assert obs["env_obs"]["total_reward"][0] == total_reward
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_headless_env_matches_miniworld_env(seed):
+    pytest.importorskip("gym_miniworld")
+    from mtenv.envs.mpte.two_goal_maze_env import TwoGoalMazeEnv
+
+    expected_env = TwoGoalMazeEnv(size_x=3, size_y=3, obs_type="xy")
+    env = HeadlessTwoGoalMazeEnv(size_x=3, size_y=3)
+    for _env in (expected_env, env):
+        _env.seed(seed)
+        _env.seed_task(seed)
+    expected_obs, obs = expected_env.reset(), env.reset()
+    rng = np.random.RandomState(seed)
+    for _ in range(300):
+        np.testing.assert_allclose(
+            obs["env_obs"]["obs"], expected_obs["env_obs"]["obs"], atol=1e-5
+        )
+        assert obs["task_obs"] == expected_obs["task_obs"]
+        action = rng.randint(3)
+        expected_obs, expected_reward, expected_done, _ = expected_env.step(action)
+        obs, reward, done, _ = env.step(action)
+        assert reward == expected_reward
+        assert done == expected_done
+        if done:
+            expected_obs, obs = expected_env.reset(), env.reset()
@@ -0,0 +1,122 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import numpy as np
+import pytest
+
+from mtenv.envs.control.cartpole import MTCartPole
+from mtenv.envs.replay import ReplayMTEnv
+from mtenv.wrappers.ntasks_id import NTasksId as NTasksIdWrapper
+from mtenv.wrappers.record_trajectories import (
+    RecordTrajectories as RecordTrajectoriesWrapper,
+)
+
+
+def record_episodes(root_dir, num_episodes, chunk_size):
+    """Record episodes (the last one is interrupted) and return them, as
+    `(first obs, [(action, obs, reward, done), ...])`, grouped by task."""
+    env = RecordTrajectoriesWrapper(
+        NTasksIdWrapper(MTCartPole(), n_tasks=3),
+        root_dir=root_dir,
+        chunk_size=chunk_size,
+    )
+    env.seed(1)
+    env.seed_task(2)
+    env.action_space.seed(3)
+    episodes = {}
+    for index in range(num_episodes):
+        env.reset_task_state()
+        first_obs = env.reset()
+        steps = []
+        for _ in range(10 if index == num_episodes - 1 else 500):
+            action = env.action_space.sample()
+            obs, reward, done, _ = env.step(action)
+            steps.append((action, obs, reward, done))
+            if done:
+                break
+        episodes.setdefault(env.get_task_state(), []).append((first_obs, steps))
+    env.close()
+    return episodes
+
+
+@pytest.mark.parametrize("chunk_size", [16, 4096])
+def test_replay_mtenv_replays_the_recorded_episodes(tmp_path, chunk_size):
+    episodes = record_episodes(str(tmp_path), num_episodes=6, chunk_size=chunk_size)
+    env = ReplayMTEnv(root_dir=str(tmp_path), check_actions=True)
+    env.seed(1)
+    assert sorted(env.task_states) == sorted(episodes)
+    for task_state, task_episodes in episodes.items():
+        env.set_task_state(task_state)
+        assert env.get_num_episodes() == len(task_episodes)
+        for first_obs, steps in task_episodes:
+            obs = env.reset()
+            np.testing.assert_array_equal(obs["env_obs"], first_obs["env_obs"])
+            assert obs["task_obs"] == task_state == env.get_task_obs()
+            for action, recorded_obs, recorded_reward, recorded_done in steps:
+                obs, reward, done, info = env.step(action)
+                assert info["recorded_action"] == action
+                assert reward == recorded_reward
+                # Including the terminal observation of the episode.
+                np.testing.assert_array_equal(obs["env_obs"], recorded_obs["env_obs"])
+            assert done
+            assert info.get("TimeLimit.truncated", False) != recorded_done
+
+
+def test_replay_mtenv_without_recorded_next_obs(tmp_path):
+    episodes = record_episodes(str(tmp_path), num_episodes=2, chunk_size=4096)
+    # Trajectories recorded without the observations returned by `step`.
+    for path in tmp_path.glob("task_*/chunk_*/next_obs.*.npy"):
+        path.unlink()
+    env = ReplayMTEnv(root_dir=str(tmp_path))
+    env.seed(1)
+    task_state, task_episodes = next(iter(episodes.items()))
+    env.set_task_state(task_state)
+    _, steps = task_episodes[0]
+    env.reset()
+    for index, (action, recorded_obs, _, _) in enumerate(steps):
+        obs, _, done, _ = env.step(action)
+        if index + 1 < len(steps):
+            np.testing.assert_array_equal(obs["env_obs"], recorded_obs["env_obs"])
+    # The last step returns the last recorded observation.
+    assert done
+    np.testing.assert_array_equal(obs["env_obs"], steps[-2][1]["env_obs"])
+
+
+def test_replay_mtenv_checks_actions_and_task_states(tmp_path):
+    episodes = record_episodes(str(tmp_path), num_episodes=2, chunk_size=8)
+    env = ReplayMTEnv(root_dir=str(tmp_path), check_actions=True)
+    env.seed(1)
+    task_state, task_episodes = next(iter(episodes.items()))
+    env.set_task_state(task_state)
+    env.reset()
+    action = task_episodes[0][1][0][0]
+    with pytest.raises(ValueError):
+        env.step(1 - action)
+    with pytest.raises(ValueError):
+        env.set_task_state(-1)
+
+
+def test_replay_mtenv_skips_tasks_without_transitions(tmp_path):
+    env = RecordTrajectoriesWrapper(
+        NTasksIdWrapper(MTCartPole(), n_tasks=3), root_dir=str(tmp_path)
+    )
+    env.seed(1)
+    env.seed_task(2)
+    # The tasks set without stepping are recorded without transitions.
+    env.reset_task_state()
+    env.set_task_state(0)
+    env.set_task_state(1)
+    env.reset()
+    env.step(env.action_space.sample())
+    env.close()
+
+    env = ReplayMTEnv(root_dir=str(tmp_path))
+    env.seed(1)
+    env.seed_task(2)
+    assert {0, 1}.issubset(env.task_states)
+    for task_state in env.task_states:
+        if task_state != 1:
+            with pytest.raises(ValueError):
+                env.set_task_state(task_state)
+    assert {env.sample_task_state() for _ in range(10)} == {1}
+    # numpy scalars identify the same task as the recorded python ints.
+    env.set_task_state(np.int64(1))
+    assert env.get_num_episodes() == 1
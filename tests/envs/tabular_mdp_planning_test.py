@@ -0,0 +1,96 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import numpy as np
+import pytest
+
+from mtenv.envs.tabular_mdp.planning import (
+    OptimalQValueCache,
+    policy_evaluation,
+    stack_task_states,
+    value_iteration,
+)
+from mtenv.envs.tabular_mdp.tmdp import SparseUniformTMDP, UniformTMDP
+
+
+def sample_task_states(env, num_tasks):
+    env.seed_task(1)
+    return [env.sample_task_state() for _ in range(num_tasks)]
+
+
+def value_iteration_loop(t_reward, t_transitions, discount, num_iterations=2000):
+    n_states, n_actions = t_reward.shape
+    q_values = np.zeros((n_states, n_actions))
+    for _ in range(num_iterations):
+        values = q_values.max(axis=1)
+        for state in range(n_states):
+            for action in range(n_actions):
+                q_values[state, action] = t_reward[state, action] + discount * sum(
+                    t_transitions[state, action, next_state] * values[next_state]
+                    for next_state in range(n_states)
+                )
+    return q_values
+
+
+def test_value_iteration_matches_loop():
+    task_states = sample_task_states(UniformTMDP(n_states=4, n_actions=3), 3)
+    q_values = value_iteration(*stack_task_states(task_states)[:2], discount=0.9)
+    assert q_values.shape == (3, 4, 3)
+    for task_q_values, (t_reward, t_transitions) in zip(q_values, task_states):
+        np.testing.assert_allclose(
+            task_q_values,
+            value_iteration_loop(t_reward, t_transitions, discount=0.9),
+            atol=1e-6,
+        )
+
+
+def test_optimal_policy_evaluation_matches_value_iteration():
+    task_states = sample_task_states(UniformTMDP(n_states=5, n_actions=2), 2)
+    rewards, transitions, _ = stack_task_states(task_states)
+    q_values = value_iteration(rewards, transitions, discount=0.95)
+    policy = np.eye(2)[q_values.argmax(axis=2)]
+    np.testing.assert_allclose(
+        policy_evaluation(rewards, transitions, policy, discount=0.95),
+        q_values.max(axis=2),
+        atol=1e-6,
+    )
+
+
+def test_sparse_planning_matches_dense_planning():
+    env = SparseUniformTMDP(n_states=5, n_actions=2, n_successors=2)
+    rewards, probabilities, successors = stack_task_states(sample_task_states(env, 3))
+    transitions = np.zeros(rewards.shape + (5,))
+    np.put_along_axis(transitions, successors, probabilities, axis=3)
+    policy = np.full((5, 2), 0.5)
+    for kwargs in [{}, {"successors": successors}]:
+        _transitions = probabilities if kwargs else transitions
+        np.testing.assert_allclose(
+            value_iteration(rewards, _transitions, discount=0.9, **kwargs),
+            value_iteration(rewards, transitions, discount=0.9),
+        )
+        np.testing.assert_allclose(
+            policy_evaluation(rewards, _transitions, policy, discount=0.9, **kwargs),
+            policy_evaluation(rewards, transitions, policy, discount=0.9),
+        )
+
+
+def test_optimal_q_value_cache():
+    task_states = sample_task_states(UniformTMDP(n_states=3, n_actions=2), 3)
+    cache = OptimalQValueCache(discount=0.9)
+    cache.update({0: task_states[0], 1: task_states[1]})
+    q_values = cache[0]
+    cache.update({0: task_states[2], 2: task_states[2]})
+    assert len(cache) == 3 and 2 in cache
+    assert cache[0] is q_values
+    np.testing.assert_allclose(
+        cache[2], value_iteration_loop(*task_states[2], discount=0.9), atol=1e-6
+    )
+    assert cache.regret(2, state=1, discounted_return=0.0) == pytest.approx(
+        cache[2][1].max()
+    )
+
+
+def test_stack_task_states_with_mixed_tasks():
+    dense_task_state = sample_task_states(UniformTMDP(n_states=3, n_actions=2), 1)[0]
+    sparse_env = SparseUniformTMDP(n_states=3, n_actions=2, n_successors=2)
+    sparse_task_state = sample_task_states(sparse_env, 1)[0]
+    with pytest.raises(ValueError):
+        stack_task_states([dense_task_state, sparse_task_state])
@@ -0,0 +1,61 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import numpy as np
+import pytest
+
+from mtenv.envs.tabular_mdp.tmdp import SparseUniformTMDP, UniformTMDP
+
+
+def test_sparse_tmdp_with_all_successors_matches_dense_tmdp():
+    dense_env = UniformTMDP(n_states=4, n_actions=3)
+    sparse_env = SparseUniformTMDP(n_states=4, n_actions=3, n_successors=4)
+    dense_env.seed_task(3)
+    sparse_env.seed_task(3)
+    t_reward, t_transitions = dense_env.sample_task_state()
+    sparse_reward, successors, probabilities = sparse_env.sample_task_state()
+    np.testing.assert_array_equal(sparse_reward, t_reward)
+    np.testing.assert_allclose(
+        probabilities, np.take_along_axis(t_transitions, successors, axis=2)
+    )
+
+
+@pytest.mark.parametrize("n_successors", [1, 3])
+def test_sparse_tmdp_transitions(n_successors):
+    env = SparseUniformTMDP(n_states=10, n_actions=2, n_successors=n_successors)
+    env.seed(1)
+    env.seed_task(2)
+    env.reset_task_state()
+    _, successors, probabilities = env.get_task_state()
+    assert successors.shape == probabilities.shape == (10, 2, n_successors)
+    np.testing.assert_allclose(probabilities.sum(axis=2), 1.0)
+    assert env.get_task_obs().shape == env.observation_space["task_obs"].shape
+
+    env.reset()
+    for _ in range(50):
+        state, action = env.state, env.action_space.sample()
+        env.step(action)
+        assert env.state in successors[state, action]
+
+
+def test_sparse_tmdp_generates_tasks_from_seeds():
+    env = SparseUniformTMDP(
+        n_states=5, n_actions=2, n_successors=2, generate_from_seed=True
+    )
+    env.seed_task(1)
+    task_state = env.sample_task_state()
+    assert isinstance(task_state, int)
+    env.set_task_state(task_state)
+    task_obs = env.get_task_obs().copy()
+
+    new_env = SparseUniformTMDP(
+        n_states=5, n_actions=2, n_successors=2, generate_from_seed=True
+    )
+    new_env.set_task_state(task_state)
+    assert new_env.get_task_state() == task_state
+    np.testing.assert_array_equal(new_env.get_task_obs(), task_obs)
+
+    # A numpy integer is a seed, while a list holds explicit transitions.
+    new_env.set_task_state(np.int64(task_state))
+    np.testing.assert_array_equal(new_env.get_task_obs(), task_obs)
+    new_env.set_task_state(list(env.make_task_state(np.random.RandomState(0))))
+    assert isinstance(new_env.get_task_state(), list)
+    assert not np.array_equal(new_env.get_task_obs(), task_obs)
@@ -0,0 +1,52 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import numpy as np
+import pytest
+
+# The pixel observations are rendered by gym_miniworld (with OpenGL).
+pytest.importorskip("gym_miniworld")
+
+from mtenv.envs.mpte.two_goal_maze_env import (  # noqa: E402
+    TwoGoalMazeEnv,
+    render_pixel_obs_batch,
+)
+
+NUM_ENVS = 3
+
+
+def make_envs(share_render_context, normalize_pixels):
+    envs = []
+    for index in range(NUM_ENVS):
+        env = TwoGoalMazeEnv(
+            size_x=3,
+            size_y=3,
+            obs_type="rgb",
+            normalize_pixels=normalize_pixels,
+            share_render_context=share_render_context,
+        )
+        env.seed(index)
+        env.seed_task(index)
+        env.reset_task_state()
+        env.reset()
+        envs.append(env)
+    return envs
+
+
+@pytest.mark.parametrize("normalize_pixels", [True, False])
+def test_render_pixel_obs_batch_matches_single_envs(normalize_pixels):
+    envs = make_envs(share_render_context=True, normalize_pixels=normalize_pixels)
+    expected_envs = make_envs(
+        share_render_context=False, normalize_pixels=normalize_pixels
+    )
+    for _ in range(3):
+        batch_obs = render_pixel_obs_batch(envs)
+        assert batch_obs.shape == (NUM_ENVS,) + envs[0].observation_space["obs"].shape
+        out = np.zeros_like(batch_obs)
+        assert render_pixel_obs_batch(envs, out=out) is out
+        for index, (env, expected_env) in enumerate(zip(envs, expected_envs)):
+            expected_obs = expected_env.render_pixel_obs()
+            np.testing.assert_array_equal(batch_obs[index], expected_obs)
+            np.testing.assert_array_equal(out[index], expected_obs)
+            np.testing.assert_array_equal(env.render_pixel_obs(), expected_obs)
+        for env, expected_env in zip(envs, expected_envs):
+            env.step(env.actions.move_forward)
+            expected_env.step(expected_env.actions.move_forward)
@@ -1,6 +1,7 @@
 # Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
 from typing import List
 
+import numpy as np
 import pytest
 
 from examples.finite_mtenv_bandit import FiniteMTBanditEnv  # noqa: E402
@@ -26,3 +27,13 @@ def test_mtenv_bandit_with_invalid_input(n_tasks, n_arms):
     with pytest.raises(Exception):
         env = FiniteMTBanditEnv(n_tasks=n_tasks, n_arms=n_arms)
         validate_mtenv(env=env)
+
+
+def test_mtenv_bandit_shares_possible_task_observations(tmp_path):
+    envs = [
+        FiniteMTBanditEnv(n_tasks=10, n_arms=3, cache_dir=str(tmp_path))
+        for _ in range(2)
+    ]
+    assert envs[0].possible_task_observations is envs[1].possible_task_observations
+    envs[0].set_task_state(4)
+    assert np.shares_memory(envs[0].task_obs, envs[0].possible_task_observations)
@@ -0,0 +1,101 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import socket
+
+import numpy as np
+import pytest
+from gym.spaces import Box, Dict, Discrete, MultiBinary, MultiDiscrete, Tuple
+
+from mtenv.remote.codec import (
+    decode,
+    encode,
+    recv_message,
+    send_message,
+    space_from_value,
+    space_to_value,
+)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        True,
+        False,
+        -3,
+        2.5,
+        "task",
+        b"\x00\x01",
+        [1, (2.0, "a"), {"b": None}],
+        {0: [True], "info": {"success": False}},
+    ],
+)
+def test_codec_round_trip(value):
+    assert decode(encode(value)) == value
+
+
+def test_codec_round_trip_of_nested_dicts():
+    value = {
+        "key": "value",
+        "env_obs": {"obs": np.arange(3), "total_reward": 1.5},
+        "kwargs": {"mode": "rgb_array", 3: ["three", {"x": "y"}]},
+    }
+    decoded = decode(encode(value))
+    assert decoded["key"] == "value"
+    assert decoded["kwargs"] == value["kwargs"]
+    np.testing.assert_array_equal(decoded["env_obs"]["obs"], np.arange(3))
+    assert decoded["env_obs"]["total_reward"] == 1.5
+
+
+def test_codec_round_trip_of_arrays():
+    arrays = [
+        np.arange(12, dtype=np.float32).reshape(3, 4),
+        np.arange(24, dtype=np.uint8).reshape(2, 3, 4)[:, ::2],
+        np.zeros((0, 3), dtype=np.int64),
+        np.array(3.0),
+    ]
+    decoded = decode(bytearray(encode({"arrays": arrays, "scalar": np.int32(7)})))
+    for array, decoded_array in zip(arrays, decoded["arrays"]):
+        assert decoded_array.dtype == array.dtype
+        np.testing.assert_array_equal(decoded_array, array)
+    # The arrays decoded from a bytearray are writable.
+    decoded["arrays"][0][0, 0] = 1.0
+    assert decoded["scalar"] == 7 and decoded["scalar"].dtype == np.int32
+
+
+@pytest.mark.parametrize(
+    "value", [object(), np.array([None]), 2**70, {"nested": [set()]}]
+)
+def test_codec_rejects_unsupported_values(value):
+    with pytest.raises(TypeError):
+        encode(value)
+
+
+def test_codec_rejects_truncated_values():
+    with pytest.raises(ValueError):
+        decode(encode([1, 2])[:-1])
+
+
+def test_recv_message_rejects_frames_above_the_max_size():
+    sender, receiver = socket.socketpair()
+    with sender, receiver:
+        value = np.zeros(64, dtype=np.uint8)
+        send_message(sender, value)
+        np.testing.assert_array_equal(recv_message(receiver), value)
+        send_message(sender, value)
+        with pytest.raises(ValueError):
+            recv_message(receiver, max_frame_size=32)
+
+
+@pytest.mark.parametrize(
+    "space",
+    [
+        Box(low=-1.0, high=2.0, shape=(3,), dtype=np.float32),
+        Discrete(4),
+        MultiDiscrete([2, 3]),
+        MultiBinary(5),
+        Dict({"env_obs": Box(low=0, high=255, shape=(2, 2), dtype=np.uint8)}),
+        Tuple([Discrete(2), Discrete(3)]),
+    ],
+)
+def test_space_round_trip(space):
+    assert space_from_value(decode(encode(space_to_value(space)))) == space
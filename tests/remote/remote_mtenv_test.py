@@ -0,0 +1,121 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import os
+import threading
+
+import numpy as np
+import pytest
+
+import mtenv
+from mtenv.cli import get_parser
+from mtenv.remote import RemoteMTEnv, RemoteVectorMTEnv, make_server
+from tests.utils.utils import validate_mtenv
+
+ENV_ID = "MT-CartPole-v0"
+
+
+@pytest.fixture(params=["tcp", "unix"])
+def address(request, tmp_path):
+    if request.param == "tcp":
+        server = make_server("127.0.0.1:0", env_ids=["MT-CartPole-*"])
+        host, port = server.server_address
+        address = f"{host}:{port}"
+    else:
+        address = f"unix:{os.path.join(tmp_path, 'mtenv.sock')}"
+        server = make_server(address, env_ids=["MT-CartPole-*"])
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield address
+    server.shutdown()
+    server.server_close()
+
+
+def test_remote_mtenv_with_valid_input(address):
+    env = RemoteMTEnv(ENV_ID, address=address)
+    validate_mtenv(env=env)
+    env.close()
+
+
+def test_remote_mtenv_matches_local_env(address):
+    env = RemoteMTEnv(ENV_ID, address=address)
+    local_env = mtenv.make(ENV_ID)
+    assert env.observation_space == local_env.observation_space
+    assert env.action_space == local_env.action_space
+    for current_env in (env, local_env):
+        current_env.seed(1)
+        current_env.seed_task(2)
+        current_env.reset_task_state()
+    np.testing.assert_array_equal(env.get_task_state(), local_env.get_task_state())
+    np.testing.assert_array_equal(env.reset()["env_obs"], local_env.reset()["env_obs"])
+    env.step_async(1)
+    obs, reward, done, _ = env.step_wait()
+    expected_obs, expected_reward, expected_done, _ = local_env.step(1)
+    np.testing.assert_array_equal(obs["env_obs"], expected_obs["env_obs"])
+    assert (reward, done) == (expected_reward, expected_done)
+
+    with pytest.raises(RuntimeError):
+        env.step(5)
+    # The environment is still usable after an error.
+    env.step(0)
+    env.close()
+
+
+def test_remote_mtenv_rejects_env_ids_which_are_not_served(address):
+    with pytest.raises(RuntimeError):
+        RemoteMTEnv("MT-Acrobat-v0", address=address)
+    with pytest.raises(ValueError):
+        RemoteMTEnv(ENV_ID)
+
+
+def test_remote_vector_mtenv_batches_the_envs(address):
+    num_envs = 3
+    with RemoteVectorMTEnv(address, env_ids=[ENV_ID] * num_envs) as venv:
+        venv.seed(list(range(num_envs)))
+        venv.seed_task(list(range(num_envs)))
+        venv.reset_task_state()
+        obs = venv.reset()
+        assert len(obs) == num_envs
+        venv.step_async([0, 1], indices=[2, 0])
+        assert venv.poll(timeout=5.0) == [2, 0]
+        _, rewards, _, _ = venv.step_wait(indices=[0, 2])
+        assert rewards == [1.0, 1.0]
+        obs, _, _, _ = venv.step([0] * num_envs)
+        for index in range(num_envs):
+            env = mtenv.make(ENV_ID)
+            env.seed(index)
+            env.seed_task(index)
+            env.reset_task_state()
+            env.reset()
+            if index != 1:
+                env.step(1 if index == 0 else 0)
+            expected_obs, _, _, _ = env.step(0)
+            np.testing.assert_array_equal(
+                obs[index]["env_obs"], expected_obs["env_obs"]
+            )
+
+
+def test_serve_command_line():
+    args = get_parser().parse_args(["serve", "--address", "unix:/tmp/mtenv.sock"])
+    assert (args.command, args.address, args.env_ids) == (
+        "serve",
+        "unix:/tmp/mtenv.sock",
+        ["*"],
+    )
+
+
+def test_make_server_only_replaces_sockets(tmp_path):
+    path = os.path.join(tmp_path, "mtenv.sock")
+    for _ in range(2):
+        # The (stale) socket of the first server is replaced.
+        server = make_server(f"unix:{path}")
+        server.server_close()
+    path = os.path.join(tmp_path, "file")
+    with open(path, "w") as f:
+        f.write("data")
+    with pytest.raises(FileExistsError):
+        make_server(f"unix:{path}")
+    assert os.path.isfile(path)
+
+
+def test_serve_command_line_requires_a_command():
+    with pytest.raises(SystemExit):
+        get_parser().parse_args([])
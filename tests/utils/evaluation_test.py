@@ -0,0 +1,38 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import numpy as np
+
+from mtenv.envs.control.cartpole import MTCartPole
+from mtenv.utils.evaluation import evaluate_task_states, run_episodes
+from mtenv.wrappers.ntasks_id import NTasksId as NTasksIdWrapper
+
+
+def make_env():
+    env = NTasksIdWrapper(MTCartPole(), n_tasks=3)
+    env.seed(1)
+    env.seed_task(2)
+    env.reset_task_state()
+    return env
+
+
+def policy(obs):
+    return int(obs["env_obs"][2] > 0)
+
+
+def test_run_episodes_summarizes_the_episodes():
+    summary = run_episodes(
+        make_env(), policy, task_state=1, num_episodes=3, success_key=None
+    )
+    assert summary["task_state"] == 1
+    assert len(summary["returns"]) == 3
+    # The reward of cartpole is 1 per step.
+    assert summary["returns"] == [float(length) for length in summary["lengths"]]
+    assert summary["return_mean"] == np.mean(summary["returns"])
+    assert summary["success_rate"] == 0.0
+
+    summary = run_episodes(make_env(), policy, task_state=1, max_episode_steps=5)
+    assert summary["lengths"] == [5]
+
+
+def test_evaluate_task_states_keeps_the_order_of_the_tasks():
+    summaries = evaluate_task_states(make_env(), policy, task_states=[2, 0, 1])
+    assert [summary["task_state"] for summary in summaries] == [2, 0, 1]
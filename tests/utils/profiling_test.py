@@ -0,0 +1,69 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import json
+
+import gym
+import numpy as np
+
+from mtenv.envs.control.cartpole import MTCartPole
+from mtenv.envs.shared.wrappers.multienv import MultiEnvWrapper
+from mtenv.utils.profiling import LatencyHistogram, Profiler, default_task_key
+from mtenv.wrappers.ntasks_id import NTasksId as NTasksIdWrapper
+from tests.utils.utils import validate_mtenv
+
+
+def test_latency_histogram_quantiles():
+    histogram = LatencyHistogram()
+    for _ in range(99):
+        histogram.add(1e-3)
+    histogram.add(1.0)
+    assert histogram.count == 100
+    assert abs(histogram.quantile(0.5) - 1e-3) / 1e-3 < 0.15
+    assert histogram.quantile(1.0) == 1.0
+
+
+def test_profiler_records_every_layer_and_task():
+    profiler = Profiler()
+    with profiler.time_construction("MT-CartPole"):
+        env = NTasksIdWrapper(MTCartPole(), n_tasks=3)
+    env = profiler.instrument(env)
+    validate_mtenv(env=env)
+
+    stats = profiler.as_dict()
+    assert set(stats["layers"]) == {"0:NTasksId", "1:MTCartPole"}
+    step_stats = stats["layers"]["0:NTasksId"]["step"]
+    assert set(step_stats).issubset({"0", "1", "2"})
+    assert sum(task_stats["count"] for task_stats in step_stats.values()) == 30
+    assert stats["construction"]["MT-CartPole"]["count"] == 1
+    assert json.loads(profiler.to_json()) == json.loads(json.dumps(stats))
+
+    profiler.enabled = False
+    env.reset()
+    assert profiler.as_dict() == stats
+
+    profiler.restore()
+    assert "step" not in vars(env)
+
+
+def test_profiler_restore_keeps_multienv_usable():
+    env = MultiEnvWrapper(
+        funcs_to_make_envs=[lambda: gym.make("CartPole-v1")] * 3,
+        initial_task_state=0,
+    )
+    funcs_to_make_envs = env._funcs_to_make_envs
+    profiler = Profiler()
+    profiler.instrument(env)
+    assert env._funcs_to_make_envs is not funcs_to_make_envs
+
+    profiler.restore()
+    assert env._funcs_to_make_envs is funcs_to_make_envs
+    env.set_task_state(2)
+    env.seed(1)
+    env.reset()
+
+
+def test_default_task_key_separates_continuous_tasks():
+    assert default_task_key(np.int64(3)) == 3
+    assert default_task_key("task") == "task"
+    assert default_task_key(np.array([0.5, 1.0])) == default_task_key([0.5, 1.0])
+    assert default_task_key([0.5, 1.0]) != default_task_key([0.5, 2.0])
+    assert default_task_key({"goal": [1, 2]}) != default_task_key({"goal": [1, 3]})
@@ -0,0 +1,26 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import numpy as np
+import pytest
+
+from mtenv.utils.streaming_stats import P2Quantiles
+
+
+@pytest.mark.parametrize("num_values", [1, 4, 5, 2000])
+def test_p2_quantiles_match_the_exact_quantiles(num_values):
+    quantiles = [0.1, 0.5, 0.9]
+    sketch = P2Quantiles(quantiles=quantiles, capacity=1)
+    sketch.grow(3)
+    rng = np.random.RandomState(0)
+    streams = [rng.normal(size=num_values), rng.exponential(size=num_values) - 3]
+    for row, values in enumerate(streams):
+        for value in values:
+            sketch.add(row, value)
+    for row, values in enumerate(streams):
+        expected = np.quantile(values, quantiles)
+        if num_values <= 5:
+            np.testing.assert_allclose(sketch.get(row), expected)
+        else:
+            np.testing.assert_allclose(sketch.get(row), expected, atol=0.05)
+    assert np.isnan(sketch.get(2)).all()
+    sketch.clear()
+    assert np.isnan(sketch.get(0)).all()
@@ -0,0 +1,59 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import numpy as np
+import pytest
+
+from mtenv.envs.control.cartpole import MTCartPole
+from mtenv.utils import seeding
+from mtenv.utils.task_sampler import (
+    PrioritizedTaskSampler,
+    SumTree,
+    UniformTaskSampler,
+)
+from mtenv.wrappers.ntasks_id import NTasksId as NTasksIdWrapper
+
+
+@pytest.mark.parametrize("capacity", [1, 5, 8, 1000])
+def test_sum_tree(capacity):
+    rng = np.random.RandomState(0)
+    tree = SumTree(capacity=capacity)
+    values = np.zeros(capacity)
+    for _ in range(5):
+        indices = rng.randint(capacity, size=3)
+        new_values = rng.uniform(size=3)
+        tree.update(indices, new_values)
+        values[indices] = new_values
+    np.testing.assert_allclose(tree.get(np.arange(capacity)), values)
+    assert tree.total == pytest.approx(values.sum())
+    cumsum = np.cumsum(values)
+    for value in rng.uniform(0, tree.total, size=100):
+        index = tree.find(value)
+        assert values[index] > 0
+        assert index == np.searchsorted(cumsum, value, side="right")
+
+
+def test_uniform_task_sampler_matches_randint():
+    sampler = UniformTaskSampler(num_tasks=7)
+    np_random_1, _ = seeding.np_random(3)
+    np_random_2, _ = seeding.np_random(3)
+    assert [sampler.sample(np_random_1) for _ in range(20)] == [
+        np_random_2.randint(7) for _ in range(20)
+    ]
+
+
+def test_prioritized_task_sampler_with_ntasks_id():
+    sampler = PrioritizedTaskSampler(num_tasks=10)
+    env = NTasksIdWrapper(MTCartPole(), n_tasks=10, task_sampler=sampler)
+    env.seed(1)
+    env.seed_task(2)
+    sampler.update([0, 1, 2, 3, 4, 5, 6], 0.0)
+    sampler.update([8, 9], [1.0, 3.0])
+    np.testing.assert_array_equal(sampler.get_priorities([7, 8, 9]), [1.0, 1.0, 3.0])
+    counts = np.bincount([env.sample_task_state() for _ in range(5000)], minlength=10)
+    assert counts[:7].sum() == 0
+    np.testing.assert_allclose(counts[7:] / 5000, [0.2, 0.2, 0.6], atol=0.03)
+
+    sampler.update(np.arange(10), 0.0)
+    with pytest.raises(ValueError):
+        env.sample_task_state()
+    with pytest.raises(ValueError):
+        NTasksIdWrapper(MTCartPole(), n_tasks=5, task_sampler=sampler)
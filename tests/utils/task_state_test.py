@@ -0,0 +1,13 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import numpy as np
+
+from mtenv.utils.task_state import canonicalize_task_state
+
+
+def test_canonicalize_task_state():
+    assert canonicalize_task_state(np.array([[1, 2], [3, 4]])) == ((1, 2), (3, 4))
+    assert canonicalize_task_state({"b": np.float32(0.5), "a": [1]}) == (
+        ("a", (1,)),
+        ("b", 0.5),
+    )
+    assert canonicalize_task_state(np.int64(3)) == 3
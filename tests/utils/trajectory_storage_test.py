@@ -0,0 +1,38 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import numpy as np
+
+from mtenv.utils.trajectory_storage import (
+    TrajectoryReader,
+    TrajectoryWriter,
+    flatten_transition,
+    task_state_key,
+)
+
+
+def test_flatten_transition():
+    columns = flatten_transition({"env_obs": {"obs": 1, "total_reward": 2}, "done": 3})
+    assert columns == {"env_obs.obs": 1, "env_obs.total_reward": 2, "done": 3}
+
+
+def test_trajectory_writer_appends_to_existing_trajectories(tmp_path):
+    for run in range(2):
+        writer = TrajectoryWriter(str(tmp_path), chunk_size=4, max_queue_size=1)
+        for index in range(10):
+            task_id = writer.get_task_id({"goal": index % 2})
+            writer.add(task_id, {"obs": {"x": np.full(3, index)}, "run": run})
+        writer.close()
+
+    reader = TrajectoryReader(str(tmp_path))
+    assert reader.task_states == [{"goal": 0}, {"goal": 1}]
+    columns = reader.load(1)
+    np.testing.assert_array_equal(columns["run"], [0] * 5 + [1] * 5)
+    np.testing.assert_array_equal(columns["obs.x"][:, 0], [1, 3, 5, 7, 9] * 2)
+    # 5 transitions per run, in chunks of (at most) 4 transitions.
+    assert len(list(reader.iter_chunks(1))) == 4
+
+
+def test_task_state_key_ignores_container_and_number_types():
+    assert task_state_key(np.int64(3)) == task_state_key(3)
+    assert task_state_key(np.array([0.5, 1.0])) == task_state_key([0.5, 1.0])
+    assert task_state_key((np.float32(0.5),)) == task_state_key([0.5])
+    assert task_state_key(3) != task_state_key(4)
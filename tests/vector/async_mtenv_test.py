@@ -0,0 +1,126 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from mtenv.envs.control.cartpole import MTCartPole
+from mtenv.vector.async_mtenv import AsyncMTEnvPool
+from mtenv.wrappers.multitask import MultiTask
+from mtenv.wrappers.ntasks_id import NTasksId as NTasksIdWrapper
+
+
+def run(coroutine):
+    # `asyncio.run` needs Python 3.7.
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+def make_env():
+    return NTasksIdWrapper(MTCartPole(), n_tasks=5)
+
+
+class CountingSlowStep(MultiTask):
+    lock = threading.Lock()
+    num_running_steps = 0
+    max_running_steps = 0
+
+    def __init__(self, env, delay):
+        super().__init__(env=env)
+        self.delay = delay
+        self.num_steps = 0
+
+    def step(self, action):
+        cls = type(self)
+        with cls.lock:
+            cls.num_running_steps += 1
+            cls.max_running_steps = max(cls.max_running_steps, cls.num_running_steps)
+        time.sleep(self.delay)
+        with cls.lock:
+            cls.num_running_steps -= 1
+        self.num_steps += 1
+        return self.env.step(action)
+
+    def get_num_steps(self):
+        return self.num_steps
+
+
+async def run_episode_start(pool, seed, actions):
+    env = await pool.make(make_env)
+    await env.seed(seed)
+    await env.seed_task(seed)
+    await env.reset_task_state()
+    observations = [await env.reset()]
+    for action in actions:
+        obs, _, _, _ = await env.step(action)
+        observations.append(obs)
+    task_state = await env.get_task_state()
+    await env.close()
+    return task_state, observations
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_async_mtenv_matches_sync_env(use_processes):
+    actions = [0, 1, 1, 0]
+
+    async def main():
+        async with AsyncMTEnvPool(num_workers=2, use_processes=use_processes) as pool:
+            return await asyncio.gather(
+                *[run_episode_start(pool, seed, actions) for seed in range(4)]
+            )
+
+    results = run(main())
+    for seed, (task_state, observations) in enumerate(results):
+        env = make_env()
+        env.seed(seed)
+        env.seed_task(seed)
+        env.reset_task_state()
+        expected_observations = [env.reset()] + [env.step(a)[0] for a in actions]
+        assert task_state == env.get_task_state()
+        for obs, expected_obs in zip(observations, expected_observations):
+            np.testing.assert_array_equal(obs["env_obs"], expected_obs["env_obs"])
+
+
+def test_async_mtenv_pool_bounds_the_pending_calls():
+    async def main():
+        async with AsyncMTEnvPool(num_workers=4, max_pending_calls=2) as pool:
+            envs = await asyncio.gather(
+                *[
+                    pool.make(lambda: CountingSlowStep(make_env(), 0.05))
+                    for _ in range(6)
+                ]
+            )
+            for env in envs:
+                await env.seed(0)
+                await env.seed_task(0)
+                await env.reset_task_state()
+                await env.reset()
+            await asyncio.gather(*[env.step(0) for env in envs])
+
+    CountingSlowStep.max_running_steps = 0
+    run(main())
+    assert CountingSlowStep.max_running_steps == 2
+
+
+def test_async_mtenv_waits_for_cancelled_calls():
+    async def main():
+        async with AsyncMTEnvPool(num_workers=2) as pool:
+            env = await pool.make(lambda: CountingSlowStep(make_env(), 0.3))
+            await env.seed(0)
+            await env.seed_task(0)
+            await env.reset_task_state()
+            await env.reset()
+            step = asyncio.ensure_future(env.step(0))
+            await asyncio.sleep(0.05)
+            step.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await step
+            # The cancelled step was running: it completes before the next
+            # call.
+            assert await env.call("get_num_steps") == 1
+            await env.close()
+            with pytest.raises(RuntimeError):
+                await env.reset()
+
+    run(main())
@@ -0,0 +1,146 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import gym
+import numpy as np
+import pytest
+
+from mtenv.envs.shared.wrappers.multienv import MultiEnvWrapper
+from mtenv.vector import (
+    LoadBalancedTaskScheduler,
+    StratifiedTaskScheduler,
+    SyncVectorMTEnv,
+)
+from mtenv.vector.scheduling import lpt_assignment
+from mtenv.wrappers.step_latency import StepLatency
+
+NUM_TASKS = 7
+
+
+def make_env():
+    return MultiEnvWrapper(
+        funcs_to_make_envs=[lambda: gym.make("CartPole-v1")] * NUM_TASKS,
+        initial_task_state=0,
+    )
+
+
+@pytest.mark.parametrize("num_envs", [1, 3, 7, 10])
+def test_every_task_is_scheduled_once_per_epoch(num_envs):
+    scheduler = StratifiedTaskScheduler(num_tasks=NUM_TASKS, num_envs=num_envs, seed=0)
+    task_ids = []
+    while len(task_ids) < 5 * NUM_TASKS:
+        task_ids.extend(scheduler.next_task_ids(num_envs))
+    for epoch in range(5):
+        epoch_task_ids = task_ids[epoch * NUM_TASKS : (epoch + 1) * NUM_TASKS]
+        assert sorted(epoch_task_ids) == list(range(NUM_TASKS))
+    assert task_ids[:NUM_TASKS] != task_ids[NUM_TASKS : 2 * NUM_TASKS]
+
+
+def test_tasks_with_similar_costs_are_co_scheduled():
+    num_envs = 3
+    step_costs = [5.0, 1.0, 9.0, 1.5, 5.5, 9.5, 0.5, 5.2, 9.1]
+    scheduler = StratifiedTaskScheduler(
+        num_tasks=len(step_costs), num_envs=num_envs, step_costs=step_costs, seed=0
+    )
+    for _ in range(4):
+        batches = [
+            {int(step_costs[task_id]) // 4 for task_id in scheduler.next_task_ids(3)}
+            for _ in range(3)
+        ]
+        assert all(len(batch) == 1 for batch in batches)
+    assert scheduler.epoch == 4
+    with pytest.raises(ValueError):
+        scheduler.set_step_costs([1.0])
+
+
+def test_scheduler_sets_the_tasks_of_the_vector_env():
+    num_envs = 3
+    scheduler = StratifiedTaskScheduler(num_tasks=NUM_TASKS, num_envs=num_envs, seed=1)
+    with SyncVectorMTEnv([make_env for _ in range(num_envs)]) as venv:
+        venv.seed(list(range(num_envs)))
+        obs = scheduler.reset(venv)
+        task_ids = venv.get_task_state()
+        assert [o["task_obs"] for o in obs] == task_ids
+        assert len(set(task_ids)) == num_envs
+
+        assert len(scheduler.reset(venv, indices=[1])) == 1
+        new_task_ids = venv.get_task_state()
+        assert new_task_ids[0] == task_ids[0] and new_task_ids[2] == task_ids[2]
+        assert new_task_ids[1] not in task_ids
+
+
+def test_lpt_assignment_balances_the_loads():
+    costs = [7.0, 5.0, 4.0, 4.0, 3.0, 3.0, 2.0, 1.0, 1.0]
+    assignment = lpt_assignment(costs, num_workers=3)
+    assert sorted(sum(assignment, [])) == list(range(len(costs)))
+    assert [len(tasks) for tasks in assignment] == [3, 3, 3]
+    loads = [sum(costs[task_id] for task_id in tasks) for tasks in assignment]
+    assert max(loads) == 11.0
+
+
+def test_lpt_assignment_balances_the_mean_costs():
+    # An expensive task should not have a worker to itself: the worker
+    # would be 10x slower per step than the other one.
+    costs = [10.0] + [1.0] * 10
+    assignment = lpt_assignment(costs, num_workers=2)
+    assert sorted(len(tasks) for tasks in assignment) == [5, 6]
+    mean_costs = [
+        np.mean([costs[task_id] for task_id in tasks]) for tasks in assignment
+    ]
+    assert max(mean_costs) / min(mean_costs) < 3.0
+
+    scheduler = LoadBalancedTaskScheduler(
+        num_tasks=len(costs), num_envs=2, step_costs=costs
+    )
+    report = scheduler.balance_report()
+    np.testing.assert_allclose(
+        report["estimated_step_latency"], sorted(mean_costs, reverse=True)
+    )
+    assert report["estimated_imbalance"] > 1.0
+
+
+def test_load_balanced_scheduler_migrates_expensive_tasks():
+    num_envs = 3
+    true_costs = np.array([8.0, 1.0, 1.0, 1.0, 8.0, 1.0, 1.0, 8.0, 1.0])
+    scheduler = LoadBalancedTaskScheduler(
+        num_tasks=len(true_costs), num_envs=num_envs, smoothing=0.5
+    )
+    report = scheduler.balance_report()
+    assert report["estimated_imbalance"] == 1.0
+    assert np.isnan(report["measured_imbalance"])
+
+    for _ in range(3 * len(true_costs)):
+        task_ids = scheduler.next_task_ids(range(num_envs))
+        scheduler.update(true_costs[task_ids])
+    # All the tasks are measured: the estimates match the true costs.
+    np.testing.assert_allclose(scheduler.get_step_costs(), true_costs)
+    assert scheduler.balance_report()["estimated_imbalance"] > 1.0
+
+    num_migrations = scheduler.rebalance()
+    assert num_migrations > 0
+    report = scheduler.balance_report()
+    assert report["estimated_imbalance"] == 1.0
+    assert sorted(len(tasks) for tasks in report["worker_tasks"]) == [3, 3, 3]
+    # A second rebalance keeps the tasks where they are.
+    assert scheduler.rebalance() == 0
+
+    scheduler.reset_stats()
+    for _ in range(len(true_costs)):
+        task_ids = scheduler.next_task_ids(range(num_envs))
+        scheduler.update(true_costs[task_ids])
+    assert scheduler.balance_report()["measured_imbalance"] == pytest.approx(1.0)
+
+
+def test_load_balanced_scheduler_with_vector_env():
+    num_envs = 2
+    scheduler = LoadBalancedTaskScheduler(num_tasks=NUM_TASKS, num_envs=num_envs)
+    with SyncVectorMTEnv(
+        [lambda: StepLatency(make_env()) for _ in range(num_envs)]
+    ) as venv:
+        venv.seed(list(range(num_envs)))
+        scheduler.reset(venv)
+        assert venv.get_task_state() == scheduler.current_task_ids
+        _, _, _, infos = venv.step([0] * num_envs)
+        scheduler.update([info["step_latency"] for info in infos])
+        report = scheduler.balance_report()
+        assert all(latency > 0.0 for latency in report["measured_step_latency"])
+    with pytest.raises(ValueError):
+        LoadBalancedTaskScheduler(num_tasks=1, num_envs=num_envs)
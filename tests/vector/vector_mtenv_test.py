@@ -0,0 +1,155 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import time
+
+import numpy as np
+import pytest
+
+from mtenv.envs.control.cartpole import MTCartPole
+from mtenv.utils.evaluation import run_episodes
+from mtenv.vector import SubprocVectorMTEnv, SyncVectorMTEnv
+from mtenv.wrappers.multitask import MultiTask
+from mtenv.wrappers.ntasks_id import NTasksId as NTasksIdWrapper
+
+
+def make_env():
+    return NTasksIdWrapper(MTCartPole(), n_tasks=5)
+
+
+class SlowStep(MultiTask):
+    def __init__(self, env, delay):
+        super().__init__(env=env)
+        self.delay = delay
+
+    def step(self, action):
+        time.sleep(self.delay)
+        return self.env.step(action)
+
+
+@pytest.mark.parametrize("vector_cls", [SyncVectorMTEnv, SubprocVectorMTEnv])
+def test_vector_mtenv_matches_individual_envs(vector_cls):
+    num_envs = 3
+    with vector_cls([make_env for _ in range(num_envs)]) as venv:
+        assert len(venv) == num_envs
+        venv.seed(list(range(num_envs)))
+        venv.seed_task(list(range(num_envs)))
+        venv.reset_task_state()
+        obs = venv.reset()
+
+        envs = [make_env() for _ in range(num_envs)]
+        for index, env in enumerate(envs):
+            env.seed(index)
+            env.seed_task(index)
+            env.reset_task_state()
+            expected_obs = env.reset()
+            np.testing.assert_array_equal(
+                obs[index]["env_obs"], expected_obs["env_obs"]
+            )
+            assert obs[index]["task_obs"] == expected_obs["task_obs"]
+
+        actions = [0, 1, 0]
+        obs, rewards, dones, _ = venv.step(actions)
+        for index, env in enumerate(envs):
+            expected_obs, expected_reward, expected_done, _ = env.step(actions[index])
+            np.testing.assert_array_equal(
+                obs[index]["env_obs"], expected_obs["env_obs"]
+            )
+            assert rewards[index] == expected_reward
+            assert dones[index] == expected_done
+
+        venv.set_task_state([4, 2], indices=[0, 2])
+        assert venv.get_task_state() == [4, envs[1].get_task_state(), 2]
+        assert len(venv.reset(indices=[1])) == 1
+    assert venv.closed
+
+
+def test_subproc_vector_mtenv_reports_worker_errors():
+    with SubprocVectorMTEnv([make_env]) as venv:
+        venv.seed_task([1])
+        venv.reset_task_state()
+        with pytest.raises(RuntimeError):
+            venv.call("set_task_state", 100)
+        # the worker is still usable after an error.
+        venv.call("set_task_state", 1)
+        assert venv.get_task_state() == [1]
+
+
+@pytest.mark.parametrize("vector_cls", [SyncVectorMTEnv, SubprocVectorMTEnv])
+def test_vector_mtenv_step_async_matches_step(vector_cls):
+    num_envs = 3
+    with vector_cls([make_env for _ in range(num_envs)]) as venv, vector_cls(
+        [make_env for _ in range(num_envs)]
+    ) as expected_venv:
+        for env in (venv, expected_venv):
+            env.seed(list(range(num_envs)))
+            env.seed_task(list(range(num_envs)))
+            env.reset_task_state()
+            env.reset()
+        venv.step_async([1, 0], indices=[2, 0])
+        with pytest.raises(RuntimeError):
+            venv.step_async([1], indices=[0])
+        venv.step_async([1], indices=[1])
+        assert sorted(venv.poll(timeout=None)) != []
+        obs, rewards, dones, _ = venv.step_wait()
+        expected_obs, expected_rewards, expected_dones, _ = expected_venv.step(
+            [0, 1, 1]
+        )
+        for index in range(num_envs):
+            np.testing.assert_array_equal(
+                obs[index]["env_obs"], expected_obs[index]["env_obs"]
+            )
+        assert (rewards, dones) == (expected_rewards, expected_dones)
+        assert venv.poll() == []
+        with pytest.raises(RuntimeError):
+            venv.step_wait(indices=[0])
+
+
+def test_subproc_vector_mtenv_polls_the_ready_envs_first():
+    delays = [1.0, 0.0]
+    with SubprocVectorMTEnv(
+        [lambda delay=delay: SlowStep(make_env(), delay) for delay in delays]
+    ) as venv:
+        venv.seed([0, 1])
+        venv.seed_task([0, 1])
+        venv.reset_task_state()
+        venv.reset()
+        start = time.perf_counter()
+        venv.step_async([0, 0])
+        # The steps run in the workers while the caller keeps working.
+        assert time.perf_counter() - start < 0.5
+        indices, (obs, _, _, _) = venv.step_wait_any()
+        assert indices == [1] and len(obs) == 1
+        with pytest.raises(RuntimeError):
+            venv.get_task_state(indices=[0])
+        assert venv.poll(timeout=0.0) == []
+        indices, _ = venv.step_wait_any(timeout=5.0)
+        assert indices == [0]
+        # A pending step is dropped on close.
+        venv.step_async([0], indices=[0])
+
+
+@pytest.mark.parametrize("vector_cls", [SyncVectorMTEnv, SubprocVectorMTEnv])
+def test_vector_mtenv_evaluates_the_tasks_in_the_envs(vector_cls):
+    num_envs = 2
+    task_states = [4, 0, 3, 1, 2]
+    with vector_cls([make_env for _ in range(num_envs)]) as venv:
+        venv.seed([0] * num_envs)
+        venv.seed_task([0] * num_envs)
+        venv.reset_task_state()
+        # The policy is a closure, serialized with cloudpickle.
+        threshold = 0.0
+        summaries = venv.evaluate(
+            lambda obs: int(obs["env_obs"][2] > threshold),
+            task_states=task_states,
+            num_episodes=2,
+        )
+    assert [summary["task_state"] for summary in summaries] == task_states
+    env = make_env()
+    env.seed(0)
+    env.seed_task(0)
+    env.reset_task_state()
+    # The first environment evaluates the tasks 4, 3 and 2 (in this order).
+    for task_state in task_states[::2]:
+        expected_summary = run_episodes(
+            env, lambda obs: int(obs["env_obs"][2] > 0.0), task_state, num_episodes=2
+        )
+        assert summaries[task_states.index(task_state)] == expected_summary
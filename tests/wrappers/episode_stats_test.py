@@ -0,0 +1,43 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import numpy as np
+
+from mtenv.envs.control.cartpole import MTCartPole
+from mtenv.wrappers.episode_stats import EpisodeStats as EpisodeStatsWrapper
+from mtenv.wrappers.ntasks_id import NTasksId as NTasksIdWrapper
+from tests.utils.utils import validate_mtenv
+
+
+def test_episode_stats_wrapper_with_valid_input():
+    validate_mtenv(env=EpisodeStatsWrapper(NTasksIdWrapper(MTCartPole(), n_tasks=3)))
+
+
+def test_episode_stats_aggregates_the_episodes_of_each_task():
+    env = EpisodeStatsWrapper(
+        NTasksIdWrapper(MTCartPole(), n_tasks=5), success_key=None, num_tasks=1
+    )
+    env.seed(1)
+    env.seed_task(2)
+    env.action_space.seed(3)
+    lengths = {}
+    for _ in range(40):
+        env.reset_task_state()
+        env.reset()
+        done, length = False, 0
+        while not done:
+            _, _, done, _ = env.step(env.action_space.sample())
+            length += 1
+        lengths.setdefault(env.get_task_state(), []).append(length)
+
+    stats = env.stats()
+    assert sorted(stats) == sorted(lengths)
+    for task_state, task_lengths in lengths.items():
+        task_stats = stats[task_state]
+        assert task_stats["episodes"] == len(task_lengths)
+        assert task_stats["length_mean"] == np.mean(task_lengths)
+        # The reward of cartpole is 1 per step.
+        assert task_stats["return_mean"] == np.mean(task_lengths)
+        assert min(task_lengths) <= task_stats["length_p50"] <= max(task_lengths)
+        assert "success_rate" not in task_stats
+
+    env.reset_stats()
+    assert all(task_stats["episodes"] == 0 for task_stats in env.stats().values())
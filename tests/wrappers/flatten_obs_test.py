@@ -0,0 +1,60 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+
+
+from typing import List
+
+import numpy as np
+import pytest
+
+from mtenv.envs.control.cartpole import MTCartPole
+from mtenv.wrappers.flatten_obs import FlattenObs as FlattenObsWrapper
+from mtenv.wrappers.ntasks_id import NTasksId as NTasksIdWrapper
+from tests.utils.utils import validate_mtenv
+
+
+def get_valid_num_tasks() -> List[int]:
+    return [1, 10, 100]
+
+
+@pytest.mark.parametrize("n_tasks", get_valid_num_tasks())
+def test_flatten_obs_wrapper_with_valid_input(n_tasks):
+    env = MTCartPole()
+    env = NTasksIdWrapper(env, n_tasks=n_tasks)
+    env = FlattenObsWrapper(env)
+    validate_mtenv(env=env)
+
+
+@pytest.mark.parametrize("n_tasks", get_valid_num_tasks())
+def test_flatten_obs_layout(n_tasks):
+    env = FlattenObsWrapper(NTasksIdWrapper(MTCartPole(), n_tasks=n_tasks))
+    env.seed(5)
+    env.seed_task(15)
+    env.reset_task_state()
+    obs = env.reset()
+    flat_obs = obs["env_obs"]
+    assert flat_obs.dtype == np.float32
+    assert flat_obs.shape == env.observation_space["env_obs"].shape == (4 + n_tasks,)
+    one_hot = flat_obs[4:]
+    assert one_hot.sum() == 1.0
+    assert one_hot[env.get_task_state()] == 1.0
+
+    batch = env.layout.flatten_batch(
+        {
+            "env_obs": np.stack([flat_obs[:4], flat_obs[:4]]),
+            "task_obs": np.array([0, n_tasks - 1]),
+        }
+    )
+    assert batch.shape == (2, 4 + n_tasks)
+    assert batch[0, 4] == batch[1, -1] == 1.0
+    assert batch[:, 4:].sum() == 2.0
+
+
+@pytest.mark.parametrize("copy", [True, False])
+def test_flatten_obs_reuses_the_buffer_only_when_asked(copy):
+    env = FlattenObsWrapper(NTasksIdWrapper(MTCartPole(), n_tasks=3), copy=copy)
+    env.seed(5)
+    env.seed_task(15)
+    env.reset_task_state()
+    obs = env.reset()
+    next_obs, _, _, _ = env.step(0)
+    assert (obs["env_obs"] is next_obs["env_obs"]) != copy
@@ -3,6 +3,7 @@
 
 from typing import List
 
+import numpy as np
 import pytest
 
 from mtenv.envs.control.cartpole import MTCartPole
@@ -31,3 +32,21 @@ def test_ntasks_id_wrapper_with_invalid_input(n_tasks):
         env = MTCartPole()
         env = NTasksIdWrapper(env, n_tasks=n_tasks)
         validate_mtenv(env=env)
+
+
+def test_ntasks_id_wrapper_step_async_defaults_to_step():
+    envs = [NTasksIdWrapper(MTCartPole(), n_tasks=3) for _ in range(2)]
+    for env in envs:
+        env.seed(1)
+        env.seed_task(2)
+        env.reset_task_state()
+        env.reset()
+    with pytest.raises(RuntimeError):
+        envs[0].step_wait()
+    envs[0].step_async(1)
+    with pytest.raises(RuntimeError):
+        envs[0].step_async(1)
+    obs, reward, done, _ = envs[0].step_wait()
+    expected_obs, expected_reward, expected_done, _ = envs[1].step(1)
+    np.testing.assert_array_equal(obs["env_obs"], expected_obs["env_obs"])
+    assert (reward, done) == (expected_reward, expected_done)
@@ -0,0 +1,43 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import numpy as np
+import pytest
+
+from mtenv.envs.control.acrobot import MTAcrobot
+from mtenv.envs.control.cartpole import MTCartPole
+from mtenv.envs.tabular_mdp.tmdp import UniformTMDP
+from mtenv.wrappers.procedural_tasks import ProceduralTasks
+from tests.utils.utils import validate_mtenv
+
+
+@pytest.mark.parametrize(
+    "env_fn", [MTCartPole, MTAcrobot, lambda: UniformTMDP(n_states=3, n_actions=2)]
+)
+def test_procedural_tasks_wrapper(env_fn):
+    validate_mtenv(env=ProceduralTasks(env_fn(), cache_size=2))
+
+    env = ProceduralTasks(env_fn(), cache_size=2)
+    env.seed_task(1)
+    env.reset_task_state()
+    task_key = env.get_task_state()
+    assert isinstance(task_key, int)
+    task_obs = np.asarray(env.get_task_obs())
+
+    # A new environment regenerates the same task from its key.
+    new_env = ProceduralTasks(env_fn(), cache_size=0)
+    new_env.set_task_state(task_key)
+    assert new_env.get_task_state() == task_key
+    np.testing.assert_array_equal(np.asarray(new_env.get_task_obs()), task_obs)
+
+
+def test_procedural_tasks_cache_is_lru():
+    env = ProceduralTasks(MTCartPole(), cache_size=2)
+    for task_key in [1, 2, 1, 3]:
+        env.set_task_state(task_key)
+    assert list(env._task_states) == [1, 3]
+    cached_task_state = env.generate_task_state(1)
+    assert env.generate_task_state(1) is cached_task_state
+
+
+def test_procedural_tasks_with_invalid_cache_size():
+    with pytest.raises(ValueError):
+        ProceduralTasks(MTCartPole(), cache_size=-1)
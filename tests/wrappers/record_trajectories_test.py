@@ -0,0 +1,102 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+import numpy as np
+import pytest
+
+from mtenv.envs.control.cartpole import MTCartPole
+from mtenv.utils.trajectory_storage import TrajectoryReader
+from mtenv.wrappers.ntasks_id import NTasksId as NTasksIdWrapper
+from mtenv.wrappers.record_trajectories import (
+    RecordTrajectories as RecordTrajectoriesWrapper,
+)
+from tests.utils.utils import validate_mtenv
+
+
+def test_record_trajectories_wrapper_with_valid_input(tmp_path):
+    env = RecordTrajectoriesWrapper(
+        NTasksIdWrapper(MTCartPole(), n_tasks=3), root_dir=str(tmp_path), chunk_size=7
+    )
+    validate_mtenv(env=env)
+    env.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 10, 1000])
+def test_record_trajectories_round_trip(tmp_path, chunk_size):
+    env = RecordTrajectoriesWrapper(
+        NTasksIdWrapper(MTCartPole(), n_tasks=2),
+        root_dir=str(tmp_path),
+        chunk_size=chunk_size,
+    )
+    env.seed(1)
+    env.seed_task(2)
+    expected = {}
+    for _ in range(4):
+        env.reset_task_state()
+        obs = env.reset()
+        transitions = expected.setdefault(env.get_task_state(), [])
+        for _ in range(30):
+            action = env.action_space.sample()
+            next_obs, reward, done, _ = env.step(action)
+            transitions.append(
+                (obs["env_obs"], action, reward, done, next_obs["env_obs"])
+            )
+            obs = next_obs
+            if done:
+                obs = env.reset()
+    env.close()
+
+    reader = TrajectoryReader(str(tmp_path))
+    assert sorted(reader.task_states) == sorted(expected)
+    for task_id, task_state in enumerate(reader.task_states):
+        columns = reader.load(task_id)
+        transitions = expected[task_state]
+        assert len(columns["reward"]) == len(transitions)
+        np.testing.assert_array_equal(
+            columns["env_obs"], np.stack([t[0] for t in transitions])
+        )
+        np.testing.assert_array_equal(columns["action"], [t[1] for t in transitions])
+        np.testing.assert_array_equal(columns["reward"], [t[2] for t in transitions])
+        np.testing.assert_array_equal(columns["done"], [t[3] for t in transitions])
+        np.testing.assert_array_equal(
+            columns["next_obs.env_obs"], np.stack([t[4] for t in transitions])
+        )
+        assert (columns["next_obs.task_obs"] == task_state).all()
+        assert (columns["task_obs"] == task_state).all()
+        for chunk in reader.iter_chunks(task_id):
+            assert isinstance(chunk["env_obs"], np.memmap)
+            assert len(chunk["reward"]) <= chunk_size
+
+
+def test_record_trajectories_closes_the_env_when_writing_fails(tmp_path, monkeypatch):
+    env = RecordTrajectoriesWrapper(
+        NTasksIdWrapper(MTCartPole(), n_tasks=3), root_dir=str(tmp_path)
+    )
+    closed = []
+    monkeypatch.setattr(env.env, "close", lambda: closed.append(True))
+
+    def fail():
+        raise RuntimeError("failed to write the trajectories.")
+
+    monkeypatch.setattr(env.writer, "close", fail)
+    with pytest.raises(RuntimeError):
+        env.close()
+    assert closed == [True]
+
+
+def test_record_trajectories_stores_the_terminal_observations(tmp_path):
+    env = RecordTrajectoriesWrapper(
+        NTasksIdWrapper(MTCartPole(), n_tasks=1), root_dir=str(tmp_path)
+    )
+    env.seed(1)
+    env.seed_task(2)
+    env.reset_task_state()
+    env.reset()
+    done = False
+    while not done:
+        obs, _, done, _ = env.step(0)
+    env.close()
+
+    columns = TrajectoryReader(str(tmp_path)).load(0)
+    assert columns["done"][-1] and not columns["done"][:-1].any()
+    np.testing.assert_array_equal(columns["next_obs.env_obs"][-1], obs["env_obs"])
+    # The terminal observation is only stored as `next_obs`.
+    assert not (columns["env_obs"] == obs["env_obs"]).all(axis=1).any()
@@ -0,0 +1,19 @@
+# Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved
+from mtenv.envs.control.cartpole import MTCartPole
+from mtenv.wrappers.ntasks_id import NTasksId as NTasksIdWrapper
+from mtenv.wrappers.step_latency import StepLatency as StepLatencyWrapper
+from tests.utils.utils import validate_mtenv
+
+
+def test_step_latency_wrapper_with_valid_input():
+    validate_mtenv(env=StepLatencyWrapper(NTasksIdWrapper(MTCartPole(), n_tasks=3)))
+
+
+def test_step_latency_is_reported_in_info():
+    env = StepLatencyWrapper(NTasksIdWrapper(MTCartPole(), n_tasks=3), info_key="t")
+    env.seed(1)
+    env.seed_task(2)
+    env.reset_task_state()
+    env.reset()
+    _, _, _, info = env.step(env.action_space.sample())
+    assert info["t"] > 0.0